@@ -0,0 +1,44 @@
+"""contact month counts
+
+Revision ID: a8c0d4e5f6b7
+Revises: f6a8b2c3d4e5
+Create Date: 2026-10-19 20:06:52.184330
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c0d4e5f6b7'
+down_revision: Union[str, None] = 'f6a8b2c3d4e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    counts = op.create_table('contact_month_counts',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'month')
+    )
+    # one read of contacts; writes made before the app maintains the counts
+    # are picked up by the periodic reconciliation
+    contacts = sa.table('contacts', sa.column('user_id'), sa.column('birthday'), sa.column('deleted_at'))
+    month = sa.cast(sa.extract('month', contacts.c.birthday), sa.Integer)
+    op.execute(counts.insert().from_select(
+        ['user_id', 'month', 'count'],
+        sa.select(contacts.c.user_id, month, sa.func.count())
+        .where(contacts.c.deleted_at.is_(None))
+        .group_by(contacts.c.user_id, month),
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('contact_month_counts')
@@ -0,0 +1,37 @@
+"""contact prefix indexes
+
+Revision ID: b9d1e5f6a7c8
+Revises: a8c0d4e5f6b7
+Create Date: 2026-10-19 21:02:17.640913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from src.database.online import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d1e5f6a7c8'
+down_revision: Union[str, None] = 'a8c0d4e5f6b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ('first_name', 'last_name', 'email')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    ops = ' text_pattern_ops' if op.get_bind().dialect.name == 'postgresql' else ''
+    for column in COLUMNS:
+        create_index_concurrently(
+            f'ix_contacts_user_id_{column}_prefix', 'contacts', ['user_id', f'lower({column}){ops}'],
+            where='deleted_at IS NULL',
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in COLUMNS:
+        drop_index_concurrently(f'ix_contacts_user_id_{column}_prefix')
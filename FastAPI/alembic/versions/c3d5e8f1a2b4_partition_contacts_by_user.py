@@ -0,0 +1,95 @@
+"""partition contacts by user
+
+Revision ID: c3d5e8f1a2b4
+Revises: b7e1c2d94a10
+Create Date: 2026-10-19 14:02:17.540331
+
+Rebuilds ``contacts`` as a table hash-partitioned on ``user_id`` (PostgreSQL
+only) and makes e-mail uniqueness per user. The rows are copied in the
+migration transaction, which holds an exclusive lock on ``contacts`` until it
+commits: run it in a maintenance window, or create ``contacts_partitioned``
+and backfill it online first for very large tables.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d5e8f1a2b4'
+down_revision: Union[str, None] = 'b7e1c2d94a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS = 16
+COLUMNS = "id, first_name, last_name, email, phone, birthday, additional_info, user_id, updated_at, deleted_at"
+
+
+def create_indexes() -> None:
+    op.create_index(op.f('ix_contacts_first_name'), 'contacts', ['first_name'], unique=False)
+    op.create_index(op.f('ix_contacts_last_name'), 'contacts', ['last_name'], unique=False)
+    op.create_index(op.f('ix_contacts_email'), 'contacts', ['email'], unique=False)
+    op.create_index('ix_contacts_user_id_updated_at', 'contacts', ['user_id', 'updated_at'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        op.drop_index('uq_contacts_email_live', table_name='contacts')
+        op.create_index(
+            'uq_contacts_user_id_email_live', 'contacts', ['user_id', 'email'], unique=True,
+            sqlite_where=sa.text('deleted_at IS NULL'),
+        )
+        return
+
+    orphans = op.get_bind().execute(sa.text("SELECT count(*) FROM contacts WHERE user_id IS NULL")).scalar()
+    if orphans:
+        raise RuntimeError(f"{orphans} contacts have no user_id and cannot be placed in a partition")
+
+    op.execute(
+        "CREATE TABLE contacts_partitioned (LIKE contacts INCLUDING DEFAULTS) PARTITION BY HASH (user_id)"
+    )
+    op.execute("ALTER TABLE contacts_partitioned ALTER COLUMN user_id SET NOT NULL")
+    op.execute("ALTER TABLE contacts_partitioned ADD PRIMARY KEY (id, user_id)")
+    for remainder in range(PARTITIONS):
+        op.execute(
+            f"CREATE TABLE contacts_p{remainder} PARTITION OF contacts_partitioned "
+            f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+        )
+    op.execute(f"INSERT INTO contacts_partitioned ({COLUMNS}) SELECT {COLUMNS} FROM contacts")
+    op.drop_table('contacts')
+    op.rename_table('contacts_partitioned', 'contacts')
+    op.create_foreign_key('contacts_user_id_fkey', 'contacts', 'users', ['user_id'], ['id'])
+    create_indexes()
+    op.create_index(
+        'uq_contacts_user_id_email_live', 'contacts', ['user_id', 'email'], unique=True,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    op.execute("ANALYZE contacts")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        op.drop_index('uq_contacts_user_id_email_live', table_name='contacts')
+        op.create_index(
+            'uq_contacts_email_live', 'contacts', ['email'], unique=True,
+            sqlite_where=sa.text('deleted_at IS NULL'),
+        )
+        return
+
+    op.execute("CREATE TABLE contacts_plain (LIKE contacts INCLUDING DEFAULTS)")
+    op.execute("ALTER TABLE contacts_plain ALTER COLUMN user_id DROP NOT NULL")
+    op.execute("ALTER TABLE contacts_plain ADD PRIMARY KEY (id)")
+    op.execute(f"INSERT INTO contacts_plain ({COLUMNS}) SELECT {COLUMNS} FROM contacts")
+    op.drop_table('contacts')
+    op.rename_table('contacts_plain', 'contacts')
+    op.create_foreign_key('contacts_user_id_fkey', 'contacts', 'users', ['user_id'], ['id'])
+    create_indexes()
+    # fails if two users now share a live e-mail, which the old schema forbade
+    op.create_index(
+        'uq_contacts_email_live', 'contacts', ['email'], unique=True,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
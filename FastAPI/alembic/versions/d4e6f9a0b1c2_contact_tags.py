@@ -0,0 +1,48 @@
+"""contact tags
+
+Revision ID: d4e6f9a0b1c2
+Revises: c3d5e8f1a2b4
+Create Date: 2026-10-19 17:21:48.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from src.database.online import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e6f9a0b1c2'
+down_revision: Union[str, None] = 'c3d5e8f1a2b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        # a constant default: no table rewrite on PostgreSQL 11+
+        op.add_column('contacts', sa.Column(
+            'tags', postgresql.ARRAY(sa.String(length=50)), server_default='{}', nullable=False
+        ))
+        create_index_concurrently('ix_contacts_tags', 'contacts', ['tags'], using='gin')
+    else:
+        op.add_column('contacts', sa.Column('tags', sa.JSON(), server_default='[]', nullable=False))
+    op.create_table('contact_tag_counts',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('tag', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'tag')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('contact_tag_counts')
+    if op.get_bind().dialect.name == 'postgresql':
+        drop_index_concurrently('ix_contacts_tags')
+    op.drop_column('contacts', 'tags')
@@ -0,0 +1,34 @@
+"""email opens
+
+Revision ID: e5f7a1b2c3d4
+Revises: d4e6f9a0b1c2
+Create Date: 2026-10-19 18:03:11.417520
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f7a1b2c3d4'
+down_revision: Union[str, None] = 'd4e6f9a0b1c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('email_opens',
+    sa.Column('username', sa.String(length=50), nullable=False),
+    sa.Column('opens', sa.Integer(), nullable=False),
+    sa.Column('first_opened_at', sa.DateTime(), nullable=False),
+    sa.Column('last_opened_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('username')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('email_opens')
@@ -0,0 +1,53 @@
+"""contact phone e164
+
+Revision ID: f6a8b2c3d4e5
+Revises: e5f7a1b2c3d4
+Create Date: 2026-10-19 19:12:40.531207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.database.online import backfill, create_index_concurrently, drop_index_concurrently
+from src.services.phones import e164_sql, to_e164
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a8b2c3d4e5'
+down_revision: Union[str, None] = 'e5f7a1b2c3d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('contacts', sa.Column('phone_e164', sa.String(length=16), nullable=True))
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        backfill(
+            'contacts', f'phone_e164 = {e164_sql()}',
+            pending='phone_e164 IS NULL AND phone IS NOT NULL', name='contacts_phone_e164',
+        )
+    else:
+        contacts = sa.table('contacts', sa.column('id'), sa.column('user_id'), sa.column('phone'),
+                            sa.column('phone_e164'))
+        rows = [
+            {'c_id': row.id, 'c_user_id': row.user_id, 'phone_e164': to_e164(row.phone)}
+            for row in bind.execute(sa.select(contacts.c.id, contacts.c.user_id, contacts.c.phone))
+        ]
+        if rows:
+            bind.execute(
+                contacts.update().where(
+                    contacts.c.id == sa.bindparam('c_id'), contacts.c.user_id == sa.bindparam('c_user_id')
+                ).values(phone_e164=sa.bindparam('phone_e164')),
+                rows,
+            )
+    create_index_concurrently('ix_contacts_user_id_phone_e164', 'contacts', ['user_id', 'phone_e164'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_index_concurrently('ix_contacts_user_id_phone_e164')
+    op.drop_column('contacts', 'phone_e164')
@@ -0,0 +1,130 @@
+"""
+Event-loop lag during concurrent avatar uploads.
+
+Drives ``PATCH /api/users/avatar`` on the real app through an in-process ASGI
+transport while a ticker task measures how late the loop wakes it up. Storage
+is a local backend with a simulated network delay, so the numbers show how
+much of the upload pipeline runs on the loop.
+
+    python -m benchmarks.avatar_upload_lag --concurrency 20 --latency 0.2
+    python -m benchmarks.avatar_upload_lag --inline   # old, blocking behaviour
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+from PIL import Image
+
+from benchmarks import harness
+from main import app
+from src.config.config import config
+from src.database.db import get_db
+from src.entity.models import Role, User
+from src.routes import users as users_routes
+from src.services import storage as storage_module
+from src.services.auth import auth_service
+from src.services.storage import LocalStorage, get_storage
+
+
+class SlowLocalStorage(LocalStorage):
+    def __init__(self, root: Path, latency: float):
+        super().__init__(root)
+        self.latency = latency
+
+    def _write(self, name: str, data: bytes) -> None:
+        time.sleep(self.latency)
+        super()._write(name, data)
+
+
+async def run_inline(func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+
+def make_image(side: int) -> bytes:
+    out = BytesIO()
+    Image.effect_noise((side, side), 64).convert("RGB").save(out, format="JPEG", quality=95)
+    return out.getvalue()
+
+
+async def measure_lag(stop: asyncio.Event, interval: float, samples: list[float]):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - started - interval)
+
+
+def override_dependencies(storage: LocalStorage):
+    user = User(id=uuid4(), email="bench@example.com", username="bench", avatar="", role=Role.user)
+
+    async def _current_user():
+        return user
+
+    async def _noop():
+        return None
+
+    async def _fake_update_avatar(email, url, db):
+        user.avatar = url
+        return user
+
+    harness.disable_rate_limiters()
+    app.dependency_overrides[get_db] = _noop
+    app.dependency_overrides[auth_service.get_current_user] = _current_user
+    app.dependency_overrides[get_storage] = lambda: storage
+    users_routes.repositories_users.update_avatar_url = _fake_update_avatar
+    auth_service.cache_user = AsyncMock()
+
+
+async def main(args):
+    config.AVATAR_ASYNC_THRESHOLD = config.AVATAR_MAX_BYTES
+    with tempfile.TemporaryDirectory() as tmp:
+        override_dependencies(SlowLocalStorage(Path(tmp), args.latency))
+        if args.inline:
+            users_routes.run_blocking = run_inline
+            storage_module.run_blocking = run_inline
+
+        payload = make_image(args.side)
+        lag: list[float] = []
+        stop = asyncio.Event()
+        async with harness.client() as client:
+            ticker = asyncio.create_task(measure_lag(stop, args.interval, lag))
+            started = time.perf_counter()
+            responses = await asyncio.gather(*[
+                client.patch(
+                    "/api/users/avatar",
+                    files={"file": ("avatar.jpg", payload, "image/jpeg")},
+                )
+                for _ in range(args.concurrency)
+            ])
+            elapsed = time.perf_counter() - started
+            stop.set()
+            await ticker
+
+    lag_ms = sorted(x * 1000 for x in lag) or [0.0]
+    result = {
+        "mode": "inline" if args.inline else "executor",
+        "concurrency": args.concurrency,
+        "upload_bytes": len(payload),
+        "statuses": sorted({r.status_code for r in responses}),
+        "elapsed_s": round(elapsed, 3),
+        "lag_ms_p50": round(statistics.median(lag_ms), 2),
+        "lag_ms_p99": round(lag_ms[int(len(lag_ms) * 0.99) - 1 if len(lag_ms) > 1 else 0], 2),
+        "lag_ms_max": round(lag_ms[-1], 2),
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated upload time, s")
+    parser.add_argument("--side", type=int, default=1600, help="source image side, px")
+    parser.add_argument("--interval", type=float, default=0.005, help="lag probe interval, s")
+    parser.add_argument("--inline", action="store_true", help="run blocking work on the loop")
+    asyncio.run(main(parser.parse_args()))
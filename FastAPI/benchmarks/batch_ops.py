@@ -0,0 +1,100 @@
+"""
+Per-item cost of the batch contact endpoints against the single-item ones.
+
+Seeds one user with ``--items`` contacts, then fetches, updates and deletes
+them one request at a time and through ``batch-get``/``batch-update``/
+``batch-delete`` in chunks of ``--batch``, reporting microseconds per item.
+
+    python -m benchmarks.batch_ops --items 1000 --batch 500
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+from benchmarks import harness
+from src.services.auth import auth_service
+
+PASSWORD = "secret1"
+
+
+def chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def seed_ids(session_maker, items: int) -> tuple[list[str], dict]:
+    accounts = await harness.seed(session_maker, 1, items, PASSWORD)
+    token = await auth_service.create_access_token({"sub": accounts[0]["email"]}, 3600)
+    async with harness.client() as client:
+        headers = {"Authorization": f"Bearer {token}"}
+        response = await client.get("/api/contacts/", params={"limit": items}, headers=headers)
+    return [contact["id"] for contact in response.json()], headers
+
+
+async def timed(calls) -> float:
+    started = time.perf_counter()
+    for call in calls:
+        response = await call()
+        assert response.status_code < 300, response.text
+    return time.perf_counter() - started
+
+
+async def main(args):
+    tmp = tempfile.TemporaryDirectory()
+    engine, session_maker = await harness.create_database(f"sqlite+aiosqlite:///{tmp.name}/bench.db")
+    harness.use_database(session_maker)
+    harness.use_fake_redis()
+    harness.disable_rate_limiters()
+
+    ids, headers = await seed_ids(session_maker, args.items * 2)
+    single_ids, batch_ids = ids[:args.items], ids[args.items:]
+    results = {}
+    async with harness.client() as client:
+        def get(contact_id):
+            return lambda: client.get(f"/api/contacts/{contact_id}", headers=headers)
+
+        def put(contact_id, i):
+            body = {"first_name": "Upd", "last_name": f"L{i}", "email": f"u{i}@bench.io",
+                    "phone": "+10000000000", "birthday": "1990-01-01"}
+            return lambda: client.put(f"/api/contacts/{contact_id}", json=body, headers=headers)
+
+        def delete(contact_id):
+            return lambda: client.delete(f"/api/contacts/{contact_id}", headers=headers)
+
+        def batch(path, body):
+            return lambda: client.post(f"/api/contacts/{path}", json=body, headers=headers)
+
+        patches = [{"id": contact_id, "last_name": f"B{i}"} for i, contact_id in enumerate(batch_ids)]
+        plans = {
+            "get": (
+                [get(c) for c in single_ids],
+                [batch("batch-get", {"ids": part}) for part in chunks(batch_ids, args.batch)],
+            ),
+            "update": (
+                [put(c, i) for i, c in enumerate(single_ids)],
+                [batch("batch-update", {"patches": part}) for part in chunks(patches, args.batch)],
+            ),
+            "delete": (
+                [delete(c) for c in single_ids],
+                [batch("batch-delete", {"ids": part}) for part in chunks(batch_ids, args.batch)],
+            ),
+        }
+        for name, (singles, batches) in plans.items():
+            single = await timed(singles)
+            batched = await timed(batches)
+            results[name] = {
+                "single_us_per_item": round(single / args.items * 1e6, 1),
+                "batch_us_per_item": round(batched / args.items * 1e6, 1),
+                "speedup": round(single / batched, 1),
+            }
+    await engine.dispose()
+    print(json.dumps({"items": args.items, "batch": args.batch, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=500)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,75 @@
+"""
+Memory per idle change-feed subscriber and fan-out latency.
+
+Opens ``--clients`` idle subscriptions on one worker's ``ChangeFeed`` (spread
+over ``--users`` users, the same objects an SSE connection holds), measures
+the Python heap they use with ``tracemalloc``, then publishes events and times
+how long until every subscriber of the target user has received them.
+
+    python -m benchmarks.change_feed --clients 10000 --users 1000
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from uuid import uuid4
+
+from fakeredis import aioredis as fake_aioredis
+
+from src.services.changes import ChangeFeed
+
+
+async def main(args):
+    feed = ChangeFeed(stream=f"bench:{uuid4().hex}")
+    await feed.init(fake_aioredis.FakeRedis(decode_responses=True))
+    users = [uuid4() for _ in range(args.users)]
+
+    async def consume(events, received: list):
+        async for event in events:
+            received.append(time.perf_counter())
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    received = [[] for _ in range(args.clients)]
+    tasks = [
+        asyncio.create_task(consume(feed.subscribe(users[i % len(users)]), received[i]))
+        for i in range(args.clients)
+    ]
+    await asyncio.sleep(0.5)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    heap = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    target = [i for i in range(args.clients) if i % len(users) == 0]
+    latencies = []
+    for _ in range(args.events):
+        started = time.perf_counter()
+        await feed.publish(users[0], "deleted", uuid4())
+        expected = len(latencies) + 1
+        while any(len(received[i]) < expected for i in target):
+            await asyncio.sleep(0.001)
+        latencies.append(max(received[i][-1] for i in target) - started)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await feed.close()
+    print(json.dumps({
+        "clients": args.clients,
+        "users": args.users,
+        "subscribers_left": feed.count,
+        "heap_bytes_per_client": round(heap / args.clients),
+        "heap_mb_total": round(heap / 1e6, 2),
+        "fanout_subscribers": len(target),
+        "fanout_ms_p50": round(sorted(latencies)[len(latencies) // 2] * 1000, 3),
+        "fanout_ms_max": round(max(latencies) * 1000, 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--events", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,98 @@
+"""
+Cold-start cost: ``-X importtime`` profile of ``import main`` and the time
+from interpreter start to the first served request.
+
+    python -m benchmarks.cold_start               # summary as JSON
+    python -m benchmarks.cold_start --write-profile
+
+``--write-profile`` stores the top entries in ``benchmarks/importtime.txt``
+so changes to the import graph show up in review.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PROFILE = Path(__file__).parent / "importtime.txt"
+
+FIRST_REQUEST = """
+import time
+started = time.perf_counter()
+import asyncio
+import httpx
+from main import app
+imported = time.perf_counter()
+
+async def first_request():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://cold") as client:
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+
+asyncio.run(first_request())
+print(imported - started, time.perf_counter() - started)
+"""
+
+
+def import_profile() -> list[tuple[int, int, str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((int(self_us), int(cumulative_us), name[1:].rstrip()))
+    return entries
+
+
+def first_request(runs: int) -> dict:
+    imports, totals = [], []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", FIRST_REQUEST], cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        imported, total = map(float, result.stdout.strip().splitlines()[-1].split())
+        imports.append(imported)
+        totals.append(total)
+    return {
+        "import_main_ms": round(statistics.median(imports) * 1000, 1),
+        "first_request_ms": round(statistics.median(totals) * 1000, 1),
+    }
+
+
+def main(args):
+    entries = import_profile()
+    total_us = sum(e[1] for e in entries if not e[2].startswith(" "))
+    packages: dict[str, int] = {}
+    for self_us, _, name in entries:
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+    heaviest = sorted(packages.items(), key=lambda e: e[1], reverse=True)[: args.top]
+    summary = {
+        "import_total_ms": round(total_us / 1000, 1),
+        **first_request(args.runs),
+        "heaviest_packages_ms": {name: round(us / 1000, 1) for name, us in heaviest},
+    }
+    print(json.dumps(summary, indent=2))
+
+    if args.write_profile:
+        lines = [f"{'cumulative [us]':>16} | {'self [us]':>10} | module"]
+        for self_us, cumulative_us, name in sorted(entries, key=lambda e: e[1], reverse=True)[: args.profile_lines]:
+            lines.append(f"{cumulative_us:>16} | {self_us:>10} | {name.strip()}")
+        PROFILE.write_text("\n".join(lines) + "\n")
+        print(f"profile written to {PROFILE}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--profile-lines", type=int, default=60)
+    parser.add_argument("--write-profile", action="store_true")
+    main(parser.parse_args())
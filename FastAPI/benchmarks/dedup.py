@@ -0,0 +1,90 @@
+"""
+Time and peak memory of duplicate detection on one large address book.
+
+Generates ``--contacts`` rows, of which ``--dup-rate`` are altered copies
+of others (retyped phone format, dotted e-mail, misspelt first name), and runs
+``find_duplicates`` on them, reporting wall time, pairs scored, groups found
+and the peak of traced allocations (measured in a separate run). ``--naive``
+also times scoring every pair of a ``--naive-sample`` prefix and
+extrapolates it to the full book.
+
+    python -m benchmarks.dedup --contacts 100000 --naive
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+from itertools import combinations
+from uuid import uuid4
+
+from src.services.dedup import Candidate, candidate_pairs, find_duplicates, score
+
+FIRST = ["John", "Mary", "Olena", "Taras", "Anna", "Petro", "Iryna", "Mark", "Sofia", "Ivan"]
+
+
+def generate(contacts: int, dup_rate: float, seed: int = 0) -> list[tuple]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(contacts):
+        if rows and rng.random() < dup_rate:
+            _, first, last, email, phone, birthday = rng.choice(rows)
+            local, _, domain = email.partition("@")
+            rows.append((
+                uuid4(), first[:-1] + "y", last, f"{local[:2]}.{local[2:]}@{domain}",
+                f"+38 ({phone[1:4]}) {phone[4:]}", birthday,
+            ))
+            continue
+        rows.append((
+            uuid4(), rng.choice(FIRST), f"Surname{rng.randrange(contacts // 3 + 1)}",
+            f"person{i}@example.com", f"0{rng.randrange(10 ** 9):09d}",
+            date(1950, 1, 1) + timedelta(days=rng.randrange(365 * 50)),
+        ))
+    return rows
+
+
+def naive_seconds(rows: list[tuple], sample: int) -> float:
+    candidates = [Candidate(*row) for row in rows[:sample]]
+    started = time.perf_counter()
+    for a, b in combinations(candidates, 2):
+        score(a, b)
+    per_pair = (time.perf_counter() - started) / (sample * (sample - 1) / 2)
+    return per_pair * len(rows) * (len(rows) - 1) / 2
+
+
+def main(args):
+    rows = generate(args.contacts, args.dup_rate)
+    pairs = len(candidate_pairs([Candidate(*row) for row in rows], args.max_block))
+
+    started = time.perf_counter()
+    groups = find_duplicates(rows, args.threshold, args.max_block)
+    elapsed = time.perf_counter() - started
+    # second run for memory: tracing slows allocation-heavy code several times
+    tracemalloc.start()
+    find_duplicates(rows, args.threshold, args.max_block)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    results = {
+        "contacts": args.contacts,
+        "seconds": round(elapsed, 3),
+        "pairs_scored": pairs,
+        "groups": len(groups),
+        "contacts_in_groups": sum(len(group["ids"]) for group in groups),
+        "peak_mb": round(peak / 2 ** 20, 1),
+    }
+    if args.naive:
+        results["naive_all_pairs_seconds"] = round(naive_seconds(rows, args.naive_sample), 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--contacts", type=int, default=100_000)
+    parser.add_argument("--dup-rate", type=float, default=0.1)
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--max-block", type=int, default=50)
+    parser.add_argument("--naive", action="store_true")
+    parser.add_argument("--naive-sample", type=int, default=1000)
+    main(parser.parse_args())
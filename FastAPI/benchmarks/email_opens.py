@@ -0,0 +1,72 @@
+"""
+Throughput of the e-mail tracking pixel and cost of flushing buffered opens.
+
+Sends ``--hits`` pixel requests for ``--users`` recipients through the app
+in-process (served from memory, counted in the buffer) and compares them with
+the previous handler, which opened a DB session and returned a
+``FileResponse`` from disk. Then times one flush of the buffer into SQLite.
+
+    python -m benchmarks.email_opens --hits 5000 --users 1000
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks import harness
+from main import app
+from src.database.db import get_db
+from src.services.opens import open_tracker
+
+legacy = APIRouter()
+
+
+@legacy.get("/legacy/check-email-open/{username}")
+async def legacy_pixel(username: str, db: AsyncSession = Depends(get_db)):
+    return FileResponse("src/static/open_check.png", media_type="image/png", content_disposition_type="inline")
+
+
+async def hammer(client, path: str, hits: int, users: int) -> dict:
+    started = time.perf_counter()
+    for i in range(hits):
+        response = await client.get(f"{path}/user{i % users}")
+        assert response.status_code == 200
+    elapsed = time.perf_counter() - started
+    return {"hits_per_second": round(hits / elapsed), "us_per_hit": round(elapsed / hits * 1e6, 1)}
+
+
+async def main(args):
+    tmp = tempfile.TemporaryDirectory()
+    engine, session_maker = await harness.create_database(f"sqlite+aiosqlite:///{tmp.name}/bench.db")
+    harness.use_database(session_maker)
+    await harness.seed(session_maker, args.users, 0)
+    app.include_router(legacy)
+    open_tracker.session_maker = session_maker
+
+    async with harness.client() as client:
+        before = await hammer(client, "/legacy/check-email-open", args.hits, args.users)
+        after = await hammer(client, "/api/auth/check-email-open", args.hits, args.users)
+
+    started = time.perf_counter()
+    written = await open_tracker.flush()
+    flush_ms = round((time.perf_counter() - started) * 1000, 1)
+    await engine.dispose()
+    print(json.dumps({
+        "hits": args.hits,
+        "users": args.users,
+        "file_response": before,
+        "buffered": after,
+        "flush": {"usernames": written, "ms": flush_ms},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hits", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,130 @@
+"""
+Shared helpers for driving the real ASGI app in-process against SQLite and
+fakeredis, so benchmarks run without Postgres or Redis.
+"""
+import statistics
+from contextlib import asynccontextmanager
+
+import httpx
+from fakeredis import aioredis as fake_aioredis
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from main import app
+from src.database.db import get_db, get_primary
+from src.entity.models import Base
+from src.services.auth import auth_service
+from src.services.limiter import RateLimiter
+
+
+def disable_rate_limiters():
+    async def _noop():
+        return None
+
+    for route in app.routes:
+        for dependency in getattr(route, "dependencies", []):
+            if isinstance(dependency.dependency, RateLimiter):
+                app.dependency_overrides[dependency.dependency] = _noop
+
+
+async def create_database(url: str = "sqlite+aiosqlite:///:memory:"):
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+
+def use_database(session_maker):
+    import src.routes.users
+    import src.services.avatars
+
+    async def _get_db():
+        async with session_maker() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_primary] = lambda: session_maker
+    src.routes.users.async_session = session_maker
+    src.services.avatars.async_session = session_maker
+
+
+def use_fake_redis():
+    auth_service.cache = fake_aioredis.FakeRedis()
+    return auth_service.cache
+
+
+def disable_emails():
+    import src.routes.auth
+
+    async def _noop(*args, **kwargs):
+        return None
+
+    src.routes.auth.send_email = _noop
+
+
+@asynccontextmanager
+async def client():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        yield c
+
+
+def percentiles(samples: list[float]) -> dict:
+    """Summarise latencies given in seconds as milliseconds."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+async def seed(session_maker, users: int, contacts: int, password: str = "secret1", batch: int = 5000):
+    """
+    Bulk-insert ``users`` accounts and ``contacts`` contacts spread evenly
+    across them. Returns the user ids and emails; every account shares
+    ``password``.
+    """
+    from datetime import date, timedelta
+    from uuid import uuid4
+
+    from sqlalchemy import insert
+
+    from src.entity.models import Contact, User
+
+    password_hash = auth_service.get_password_hash(password)
+    accounts = [
+        {"id": uuid4(), "username": f"user{i}", "email": f"user{i}@bench.io",
+         "password": password_hash, "confirmed": True}
+        for i in range(users)
+    ]
+    today = date.today()
+    async with session_maker() as db:
+        await db.execute(insert(User), accounts)
+        rows = []
+        for i in range(contacts):
+            rows.append({
+                "id": uuid4(),
+                "first_name": f"First{i % 997}",
+                "last_name": f"Last{i % 991}",
+                "email": f"s{i}@bench.io",
+                "phone": f"+380{i:09d}",
+                "phone_e164": f"+380{i:09d}",
+                "birthday": (today - timedelta(days=365 * 30 - i % 365)),
+                "user_id": accounts[i % users]["id"],
+            })
+            if len(rows) >= batch:
+                await db.execute(insert(Contact), rows)
+                rows = []
+        if rows:
+            await db.execute(insert(Contact), rows)
+        await db.commit()
+    return accounts
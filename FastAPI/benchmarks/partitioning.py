@@ -0,0 +1,129 @@
+"""
+List and search latency on hash-partitioned contacts against a plain table.
+
+Needs PostgreSQL (``--db-url``, defaults to ``DB_URL``). Builds two schemas,
+``bench_hash`` (``contacts`` partitioned as in the models) and ``bench_plain``
+(the same table and indexes without partitioning), loads ``--rows`` contacts
+spread over ``--users`` users with ``generate_series`` and runs the real
+repository ``get_contacts``/``search_contacts`` for ``--samples`` random users
+against each, reporting latency percentiles and table sizes. Loading 50M rows
+takes a while and needs roughly 25 GB of disk; ``--reuse`` skips it on
+later runs.
+
+    python -m benchmarks.partitioning --rows 50000000 --users 100000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks import harness
+from src.config.config import config
+from src.entity.models import Base, User
+from src.repository.contacts import get_contacts, search_contacts
+
+SCHEMAS = ("bench_hash", "bench_plain")
+CHUNK = 1_000_000
+
+
+def user_id(i: int) -> UUID:
+    # same derivation as the SQL below, so users can be sampled without a query
+    return UUID(int=i + 1)
+
+
+def engine_for(url: str, schema: str):
+    return create_async_engine(url, connect_args={"server_settings": {"search_path": schema}})
+
+
+async def load(url: str, rows: int, users: int):
+    engine = engine_for(url, "bench_hash")
+    async with engine.begin() as conn:
+        for schema in SCHEMAS:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {schema}"))
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text(
+            "INSERT INTO users (id, username, email, password, confirmed) "
+            "SELECT lpad(to_hex(g), 32, '0')::uuid, 'user' || g, 'user' || g || '@bench.io', 'x', true "
+            "FROM generate_series(1, :users) g"
+        ), {"users": users})
+    for start in range(0, rows, CHUNK):
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "INSERT INTO contacts (id, first_name, last_name, email, phone, birthday, user_id, updated_at) "
+                "SELECT gen_random_uuid(), 'First' || g % 997, 'Last' || g % 991, 's' || g || '@b.io', "
+                "'+380' || lpad(g::text, 9, '0'), date '1990-01-01' + g % 365, "
+                "lpad(to_hex(g % :users + 1), 32, '0')::uuid, now() "
+                "FROM generate_series(:start, :stop) g"
+            ), {"users": users, "start": start, "stop": min(start + CHUNK, rows) - 1})
+        print(f"loaded {min(start + CHUNK, rows)}/{rows}", flush=True)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE bench_plain.users (LIKE bench_hash.users INCLUDING ALL)"))
+        await conn.execute(text("INSERT INTO bench_plain.users SELECT * FROM bench_hash.users"))
+        # LIKE copies columns, keys and indexes but not the partitioning
+        await conn.execute(text("CREATE TABLE bench_plain.contacts (LIKE bench_hash.contacts INCLUDING ALL)"))
+        await conn.execute(text("INSERT INTO bench_plain.contacts SELECT * FROM bench_hash.contacts"))
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for schema in SCHEMAS:
+            await conn.execute(text(f"VACUUM ANALYZE {schema}.contacts"))
+    await engine.dispose()
+
+
+async def measure(url: str, schema: str, users: list[int], query: str) -> dict:
+    engine = engine_for(url, schema)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    results = {}
+    async with session_maker() as db:
+        size = await db.scalar(text("SELECT pg_total_relation_size(:t)"), {"t": f"{schema}.contacts"})
+        if not size:
+            # a partitioned parent has no storage of its own
+            size = await db.scalar(text(
+                "SELECT sum(pg_total_relation_size(relid)) FROM pg_partition_tree(:t)"
+            ), {"t": f"{schema}.contacts"})
+        results["total_size_mb"] = round(size / 2 ** 20)
+        for name, call in (
+            ("list", lambda user: get_contacts(db, user, 0, 100)),
+            ("search", lambda user: search_contacts(db, query, user)),
+        ):
+            samples = []
+            for i in users:
+                user = User(id=user_id(i))
+                started = time.perf_counter()
+                await call(user)
+                samples.append(time.perf_counter() - started)
+                db.expunge_all()
+            results[name] = harness.percentiles(samples)
+    await engine.dispose()
+    return results
+
+
+async def main(args):
+    if not args.db_url.startswith("postgresql"):
+        raise SystemExit("partitioning needs PostgreSQL: pass --db-url postgresql+asyncpg://...")
+    if not args.reuse:
+        await load(args.db_url, args.rows, args.users)
+    rng = random.Random(0)
+    sampled = [rng.randrange(args.users) for _ in range(args.samples)]
+    results = {}
+    for schema in SCHEMAS:
+        # warm-up pass so both layouts are measured with a warm cache
+        await measure(args.db_url, schema, sampled[:100], args.query)
+        results[schema.removeprefix("bench_")] = await measure(args.db_url, schema, sampled, args.query)
+    print(json.dumps({"rows": args.rows, "users": args.users, "samples": args.samples, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db-url", default=config.DB_URL)
+    parser.add_argument("--rows", type=int, default=50_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--query", default="Last1")
+    parser.add_argument("--reuse", action="store_true", help="keep the data from a previous run")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,71 @@
+"""
+Latency of finding a contact by phone number in one large address book.
+
+Seeds ``--contacts`` contacts for one user in SQLite and times ``--lookups``
+single-number lookups through the ``(user_id, phone_e164)`` index against the
+previous way, loading the user's phones and comparing them in Python. Then
+times one batch lookup of ``--batch`` numbers.
+
+    python -m benchmarks.phone_lookup --contacts 100000
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+
+from sqlalchemy import select
+
+from benchmarks import harness
+from src.entity.models import Contact, User
+from src.repository import contacts as repository_contacts
+from src.services.phones import to_e164
+
+
+async def scan(db, number: str, user: User) -> list:
+    rows = await db.execute(select(Contact.id, Contact.phone).where(Contact.user_id == user.id))
+    return [contact_id for contact_id, phone in rows.all() if to_e164(phone) == number]
+
+
+async def main(args):
+    tmp = tempfile.TemporaryDirectory()
+    engine, session_maker = await harness.create_database(f"sqlite+aiosqlite:///{tmp.name}/bench.db")
+    accounts = await harness.seed(session_maker, 1, args.contacts)
+    user = User(id=accounts[0]["id"])
+    rng = random.Random(0)
+    numbers = [f"+380 {rng.randrange(args.contacts):09d}" for _ in range(max(args.lookups, args.batch))]
+
+    results = {"contacts": args.contacts}
+    async with session_maker() as db:
+        samples = []
+        for number in numbers[:args.lookups]:
+            started = time.perf_counter()
+            found = await repository_contacts.get_contacts_by_phone(db, [to_e164(number)], user)
+            samples.append(time.perf_counter() - started)
+            assert len(found[to_e164(number)]) == 1
+        results["indexed"] = harness.percentiles(samples)
+
+        samples = []
+        for number in numbers[:args.scans]:
+            started = time.perf_counter()
+            assert len(await scan(db, to_e164(number), user)) == 1
+            samples.append(time.perf_counter() - started)
+        results["scan"] = harness.percentiles(samples)
+
+        started = time.perf_counter()
+        found = await repository_contacts.get_contacts_by_phone(
+            db, list(dict.fromkeys(to_e164(number) for number in numbers[:args.batch])), user
+        )
+        results["batch"] = {"numbers": args.batch, "ms": round((time.perf_counter() - started) * 1000, 2)}
+    await engine.dispose()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--contacts", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--scans", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,170 @@
+"""
+Python-side CPU per query for the hot repository statements.
+
+Compares statements built with plain ``select()`` on every call (the
+previous code) with the ``lambda_stmt`` versions in ``src.repository``:
+
+* ``statement``: building the statement and its compiled-cache key, with a
+  stub session so no database work is included;
+* ``end_to_end``: executing against in-memory SQLite, CPU time from
+  ``time.process_time``. With the default ``--rows 0`` the queried user has
+  no contacts, so row loading does not hide the statement overhead.
+
+``--profile`` prints the top cProfile entries for the end-to-end runs.
+
+    python -m benchmarks.query_compile_cost --iterations 2000 --profile
+"""
+import argparse
+import asyncio
+import cProfile
+import io
+import json
+import pstats
+import time
+from datetime import date, timedelta
+from uuid import uuid4
+
+from sqlalchemy import select
+
+from benchmarks import harness
+from src.entity.models import Contact, User
+from src.repository import contacts as repository_contacts
+from src.repository import users as repository_users
+
+
+def plain_queries(user: User, contact_id, email: str) -> dict:
+    today = date.today()
+    return {
+        "get_contacts": lambda: select(Contact).filter(Contact.user_id == user.id).offset(0).limit(100),
+        "get_contact": lambda: select(Contact).filter_by(id=contact_id, user=user),
+        "search_contacts": lambda: select(Contact).filter(
+            Contact.user_id == user.id,
+            Contact.first_name.ilike("%jo%") | Contact.last_name.ilike("%jo%") | Contact.email.ilike("%jo%"),
+        ),
+        "upcoming_birthdays": lambda: select(Contact).filter(
+            Contact.user_id == user.id, Contact.birthday.between(today, today + timedelta(days=7))
+        ),
+        "get_user_by_email": lambda: select(User).filter_by(email=email),
+    }
+
+
+def cached_queries(db, user: User, contact_id, email: str) -> dict:
+    today = date.today()
+    return {
+        "get_contacts": lambda: repository_contacts.get_contacts(db, user),
+        "get_contact": lambda: repository_contacts.get_contact(db, contact_id, user),
+        "search_contacts": lambda: repository_contacts.search_contacts(db, "jo", user),
+        "upcoming_birthdays": lambda: repository_contacts.get_contacts_with_upcoming_birthdays(
+            db, today, today + timedelta(days=7), user
+        ),
+        "get_user_by_email": lambda: repository_users.get_user_by_email(email, db),
+    }
+
+
+class _EmptyResult:
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+    def scalar_one_or_none(self):
+        return None
+
+
+class StatementOnlySession:
+    """Stands in for AsyncSession: only builds the compiled-cache key."""
+
+    async def execute(self, stmt):
+        stmt._generate_cache_key()
+        return _EmptyResult()
+
+
+async def run_statement(call, iterations: int) -> float:
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await call()
+        best = min(best, time.perf_counter() - started)
+    return best / iterations * 1e6
+
+
+async def run(call, iterations: int, profiler: cProfile.Profile | None) -> float:
+    await call()
+    if profiler:
+        profiler.enable()
+    started = time.process_time()
+    for _ in range(iterations):
+        await call()
+    elapsed = time.process_time() - started
+    if profiler:
+        profiler.disable()
+    return elapsed / iterations * 1e6
+
+
+def top_entries(profiler: cProfile.Profile, limit: int = 12) -> str:
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("tottime").print_stats(limit)
+    return out.getvalue()
+
+
+async def main(args):
+    engine, session_maker = await harness.create_database()
+    async with session_maker() as db:
+        user = User(id=uuid4(), username="bench", email="bench@example.com", password="x")
+        db.add(user)
+        contacts = [
+            Contact(
+                first_name=f"John{i}", last_name="Doe", email=f"john{i}@ex.com",
+                phone="1234567890", birthday=date(1990, 1, 1) + timedelta(days=i), user_id=user.id,
+            )
+            for i in range(args.rows)
+        ]
+        db.add_all(contacts)
+        await db.commit()
+
+        contact_id = contacts[0].id if contacts else uuid4()
+        plain = plain_queries(user, contact_id, user.email)
+        cached = cached_queries(db, user, contact_id, user.email)
+        stub_cached = cached_queries(StatementOnlySession(), user, contact_id, user.email)
+        statement, end_to_end, profiles = {}, {}, {}
+        for name in plain:
+            async def _plain_key(build=plain[name]):
+                build()._generate_cache_key()
+
+            before = await run_statement(_plain_key, args.iterations)
+            after = await run_statement(stub_cached[name], args.iterations)
+            statement[name] = {
+                "select_us": round(before, 1),
+                "lambda_stmt_us": round(after, 1),
+                "saved_us": round(before - after, 1),
+            }
+
+            profilers = {"select": cProfile.Profile(), "lambda_stmt": cProfile.Profile()} if args.profile else {}
+
+            async def _plain(build=plain[name]):
+                return (await db.execute(build())).scalars().all()
+
+            before = await run(_plain, args.iterations, profilers.get("select"))
+            after = await run(cached[name], args.iterations, profilers.get("lambda_stmt"))
+            end_to_end[name] = {
+                "select_cpu_us": round(before, 1),
+                "lambda_stmt_cpu_us": round(after, 1),
+                "saved_cpu_us": round(before - after, 1),
+            }
+            for variant, profiler in profilers.items():
+                profiles[f"{name}/{variant}"] = top_entries(profiler)
+    await engine.dispose()
+
+    print(json.dumps({"statement": statement, "end_to_end": end_to_end}, indent=2))
+    for key, text in profiles.items():
+        print(f"\n==== {key}\n{text}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=0, help="contacts seeded for the user")
+    parser.add_argument("--profile", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,96 @@
+"""
+Per-request overhead of the rate limiter dependency.
+
+Compares ``fastapi_limiter.depends.RateLimiter`` with ``src.services.limiter``
+(with and without local token leasing) by calling each dependency directly.
+Uses fakeredis with an optional simulated round trip unless ``--redis-url``
+points at a real server.
+
+    python -m benchmarks.rate_limiter_overhead --calls 2000 --rtt-ms 0.3
+"""
+import argparse
+import asyncio
+import json
+import time
+from uuid import uuid4
+
+import redis.asyncio as redis
+from fakeredis import aioredis as fake_aioredis
+from fastapi_limiter import FastAPILimiter
+from fastapi_limiter.depends import RateLimiter as FastAPIRateLimiter
+from starlette.requests import Request
+from starlette.responses import Response
+
+from benchmarks import harness
+from main import app
+from src.entity.models import User
+from src.services.limiter import RateLimiter, limiter
+
+
+def make_client(args):
+    if args.redis_url:
+        return redis.from_url(args.redis_url)
+    client = fake_aioredis.FakeRedis()
+    if args.rtt_ms:
+        execute_command = client.execute_command
+
+        async def _delayed(*a, **kw):
+            await asyncio.sleep(args.rtt_ms / 1000)
+            return await execute_command(*a, **kw)
+
+        client.execute_command = _delayed
+    return client
+
+
+def make_request() -> Request:
+    route = next(r for r in app.routes if getattr(r, "path", None) == "/api/contacts/")
+    return Request({
+        "type": "http",
+        "method": "POST",
+        "path": "/api/contacts/",
+        "headers": [],
+        "client": ("127.0.0.1", 12345),
+        "app": app,
+        "route": route,
+    })
+
+
+async def measure(call, calls: int) -> dict:
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - started)
+    return harness.percentiles(samples)
+
+
+async def main(args):
+    client = make_client(args)
+    await FastAPILimiter.init(client)
+    await limiter.init(client, prefix=f"bench-{uuid4().hex[:8]}")
+    request, response, user = make_request(), Response(), User(id=uuid4())
+    times = args.calls * 10
+
+    baseline = FastAPIRateLimiter(times=times, seconds=60)
+    sliding = RateLimiter(times=times, seconds=60)
+    leased = RateLimiter(times=times, seconds=60, lease=args.lease)
+
+    results = {
+        "fastapi_limiter": await measure(lambda: baseline(request, response), args.calls),
+        "sliding_window": await measure(lambda: sliding(request, response, user), args.calls),
+        f"sliding_window_lease_{args.lease}": await measure(
+            lambda: leased(request, response, user), args.calls
+        ),
+    }
+    await FastAPILimiter.close()
+    await limiter.close()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--lease", type=int, default=50)
+    parser.add_argument("--rtt-ms", type=float, default=0.3, help="simulated Redis round trip")
+    parser.add_argument("--redis-url", default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,52 @@
+"""
+Latency of ``POST /api/auth/signup``.
+
+Runs signups against SQLite through the real app and reports the request
+latency next to the cost of the password hash alone, which should be the
+bulk of it.
+
+    python -m benchmarks.signup_latency --requests 50
+"""
+import argparse
+import asyncio
+import json
+import time
+from uuid import uuid4
+
+from benchmarks import harness
+from src.services.auth import auth_service
+
+
+async def main(args):
+    engine, session_maker = await harness.create_database(args.db_url)
+    harness.use_database(session_maker)
+    harness.use_fake_redis()
+    harness.disable_emails()
+
+    hash_times = []
+    for _ in range(min(args.requests, 20)):
+        started = time.perf_counter()
+        auth_service.get_password_hash("secret1")
+        hash_times.append(time.perf_counter() - started)
+
+    latencies = []
+    async with harness.client() as client:
+        for _ in range(args.requests):
+            body = {"username": "bench", "email": f"{uuid4().hex[:12]}@example.com", "password": "secret1"}
+            started = time.perf_counter()
+            response = await client.post("/api/auth/signup", json=body)
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 201, response.text
+    await engine.dispose()
+
+    print(json.dumps({
+        "signup": harness.percentiles(latencies),
+        "password_hash": harness.percentiles(hash_times),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--db-url", default="sqlite+aiosqlite:///:memory:")
+    asyncio.run(main(parser.parse_args()))
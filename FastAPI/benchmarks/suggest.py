@@ -0,0 +1,110 @@
+"""
+Latency of typeahead suggestions for one large address book.
+
+Seeds ``--contacts`` contacts for one user in SQLite and replays keystrokes:
+every prefix of ``--words`` random names and e-mails, asking for the top
+``--limit``. Times the prefix-index query, the warm in-process index (with
+the freshness check it costs per request) and the previous way, a
+case-insensitive LIKE over the three columns. Also reports how long the
+index takes to build and how much memory it holds.
+
+    python -m benchmarks.suggest --contacts 100000
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+
+from fastapi import BackgroundTasks
+from sqlalchemy import select
+
+from benchmarks import harness
+from src.entity.models import Contact, User
+from src.repository import contacts as repository_contacts
+from src.services import suggest
+from src.services.suggest import SuggestCache, SuggestIndex
+
+
+async def like_scan(db, user: User, prefix: str, limit: int) -> list:
+    pattern = f"{prefix}%"
+    result = await db.execute(
+        select(Contact.id, Contact.first_name, Contact.last_name, Contact.email)
+        .where(
+            Contact.user_id == user.id,
+            Contact.deleted_at.is_(None),
+            Contact.first_name.ilike(pattern) | Contact.last_name.ilike(pattern) | Contact.email.ilike(pattern),
+        )
+        .order_by(Contact.first_name)
+        .limit(limit)
+    )
+    return result.all()
+
+
+async def main(args):
+    tmp = tempfile.TemporaryDirectory()
+    engine, session_maker = await harness.create_database(f"sqlite+aiosqlite:///{tmp.name}/bench.db")
+    accounts = await harness.seed(session_maker, 1, args.contacts)
+    user = User(id=accounts[0]["id"])
+    rng = random.Random(0)
+    words = [
+        rng.choice([f"first{rng.randrange(997)}", f"last{rng.randrange(991)}", f"s{rng.randrange(args.contacts)}@"])
+        for _ in range(args.words)
+    ]
+    prefixes = [word[:end] for word in words for end in range(1, len(word) + 1)]
+
+    results = {"contacts": args.contacts, "keystrokes": len(prefixes)}
+    async with session_maker() as db:
+        samples = []
+        for prefix in prefixes:
+            started = time.perf_counter()
+            await repository_contacts.suggest_contacts(db, user, prefix, args.limit)
+            samples.append(time.perf_counter() - started)
+        results["indexed"] = harness.percentiles(samples)
+
+        started = time.perf_counter()
+        stamp = await repository_contacts.get_contacts_stamp(db, user)
+        rows = await repository_contacts.get_suggest_rows(db, user, args.contacts)
+        loaded = time.perf_counter()
+        index = SuggestIndex(stamp, rows)
+        results["build"] = {
+            "load_ms": round((loaded - started) * 1000, 1),
+            "sort_ms": round((time.perf_counter() - loaded) * 1000, 1),
+        }
+        del rows, index
+        tracemalloc.start()
+        index = SuggestIndex(stamp, await repository_contacts.get_suggest_rows(db, user, args.contacts))
+        results["build"]["mb"] = round(tracemalloc.get_traced_memory()[0] / 2 ** 20, 1)
+        tracemalloc.stop()
+
+        suggest.cache = SuggestCache(1, args.contacts)
+        suggest.cache.put(user.id, index)
+        background = BackgroundTasks()
+        samples = []
+        for prefix in prefixes:
+            started = time.perf_counter()
+            found = await suggest.suggest(db, user, prefix, args.limit, background)
+            samples.append(time.perf_counter() - started)
+            assert found == index.lookup(prefix, args.limit)
+        assert not background.tasks
+        results["cached"] = harness.percentiles(samples)
+
+        samples = []
+        for prefix in prefixes[:args.scans]:
+            started = time.perf_counter()
+            await like_scan(db, user, prefix, args.limit)
+            samples.append(time.perf_counter() - started)
+        results["like_scan"] = harness.percentiles(samples)
+    await engine.dispose()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--contacts", type=int, default=100_000)
+    parser.add_argument("--words", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--scans", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,198 @@
+"""
+Load-test suite for the Contacts API.
+
+Seeds a database (a temporary SQLite file by default, or ``--db-url``) with
+``--contacts`` contacts across ``--users`` users, then drives the real app
+through login, list, search, birthdays, create and update scenarios. Results
+(throughput and latency percentiles per scenario) are written to JSON and,
+when a baseline exists, compared against it.
+
+    python -m benchmarks.suite --contacts 10000 --users 10
+    python -m benchmarks.suite --contacts 10000 --users 10 --write-baseline
+    python -m benchmarks.suite --contacts 1000000 --users 1000 --db-url postgresql+asyncpg://...
+
+The exit status is 1 when a scenario regresses past ``--tolerance``.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from benchmarks import harness
+from src.services.limiter import limiter
+
+BASELINE = Path(__file__).parent / "baseline.json"
+PASSWORD = "secret1"
+
+
+async def login(client, email: str) -> dict:
+    response = await client.post("/api/auth/login", data={"username": email, "password": PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def scenarios(accounts: list[dict], headers: list[dict]):
+    counter = itertools.count()
+    created: list[tuple[dict, str]] = []
+
+    def auth():
+        i = next(counter)
+        return i, headers[i % len(headers)]
+
+    async def login_scenario(client):
+        i = next(counter)
+        return await client.post(
+            "/api/auth/login",
+            data={"username": accounts[i % len(accounts)]["email"], "password": PASSWORD},
+        )
+
+    async def list_scenario(client):
+        _, h = auth()
+        return await client.get("/api/contacts/", params={"limit": 50}, headers=h)
+
+    async def search_scenario(client):
+        i, h = auth()
+        return await client.get("/api/contacts/search/", params={"query": f"Last{i % 991}"}, headers=h)
+
+    async def birthdays_scenario(client):
+        _, h = auth()
+        return await client.get("/api/contacts/upcoming_birthdays/", headers=h)
+
+    def contact_body(i: int) -> dict:
+        return {
+            "first_name": "Bench", "last_name": f"Created{i}", "email": f"b{i}@bench.io",
+            "phone": f"+1{i:010d}", "birthday": str(date(1990, 1, 1)),
+        }
+
+    async def create_scenario(client):
+        i, h = auth()
+        response = await client.post("/api/contacts/", json=contact_body(i), headers=h)
+        if response.status_code == 200:
+            created.append((h, response.json()["id"]))
+        return response
+
+    async def update_scenario(client):
+        i = next(counter)
+        h, contact_id = created[i % len(created)]
+        return await client.put(f"/api/contacts/{contact_id}", json=contact_body(i), headers=h)
+
+    return {
+        "login": login_scenario,
+        "list": list_scenario,
+        "search": search_scenario,
+        "birthdays": birthdays_scenario,
+        "create": create_scenario,
+        "update": update_scenario,
+    }
+
+
+async def run_scenario(client, call, requests: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await call(client)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    elapsed = time.perf_counter() - started
+    return {
+        "throughput_rps": round(requests / elapsed, 1),
+        "errors": errors,
+        **harness.percentiles(latencies),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    if baseline.get("params") != results["params"]:
+        print("baseline was recorded with different parameters, skipping comparison", file=sys.stderr)
+        return []
+    failures = []
+    for name, current in results["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            failures.append(f"{name}: p95 {current['p95_ms']}ms > baseline {previous['p95_ms']}ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            failures.append(
+                f"{name}: throughput {current['throughput_rps']}rps < baseline {previous['throughput_rps']}rps"
+            )
+        if current["errors"] > previous["errors"]:
+            failures.append(f"{name}: {current['errors']} errors, baseline {previous['errors']}")
+    return failures
+
+
+async def main(args) -> int:
+    if args.db_url is None:
+        tmp = tempfile.TemporaryDirectory()
+        args.db_url = f"sqlite+aiosqlite:///{tmp.name}/bench.db"
+    engine, session_maker = await harness.create_database(args.db_url)
+    harness.use_database(session_maker)
+    redis = harness.use_fake_redis()
+    await limiter.init(redis)
+    harness.disable_rate_limiters()
+    harness.disable_emails()
+
+    started = time.perf_counter()
+    accounts = await harness.seed(session_maker, args.users, args.contacts, PASSWORD)
+    seed_seconds = round(time.perf_counter() - started, 2)
+
+    selected = args.scenarios.split(",")
+    results = {"params": {
+        "contacts": args.contacts, "users": args.users, "requests": args.requests,
+        "concurrency": args.concurrency, "db": args.db_url.split(":", 1)[0],
+    }}
+    async with harness.client() as client:
+        headers = [await login(client, a["email"]) for a in accounts[: min(len(accounts), 20)]]
+        all_scenarios = scenarios(accounts, headers)
+        measured = {}
+        for name in selected:
+            requests = min(args.requests, args.login_requests) if name == "login" else args.requests
+            measured[name] = await run_scenario(client, all_scenarios[name], requests, args.concurrency)
+            print(name, json.dumps(measured[name]), file=sys.stderr)
+    await limiter.close()
+    await engine.dispose()
+
+    results["scenarios"] = measured
+    results["meta"] = {"python": platform.python_version(), "machine": platform.machine(), "seed_s": seed_seconds}
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(f"results written to {args.output}", file=sys.stderr)
+
+    if args.write_baseline:
+        BASELINE.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"baseline written to {BASELINE}", file=sys.stderr)
+        return 0
+    if not BASELINE.exists():
+        return 0
+    failures = compare(results, json.loads(BASELINE.read_text()), args.tolerance)
+    for failure in failures:
+        print("REGRESSION", failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--contacts", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=300, help="requests per scenario")
+    parser.add_argument("--login-requests", type=int, default=20, help="logins are bcrypt bound")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--scenarios", default="login,list,search,birthdays,create,update")
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--write-baseline", action="store_true")
+    sys.exit(asyncio.run(main(parser.parse_args())))
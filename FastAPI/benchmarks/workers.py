@@ -0,0 +1,130 @@
+"""
+Requests/sec on the contacts list endpoint with 1 worker versus N workers.
+
+Seeds a temporary SQLite file, then starts ``serve.py`` once per worker count
+and drives ``GET /api/contacts/`` over real HTTP with ``--concurrency``
+in-flight requests. Each server is stopped with SIGTERM, so the run also
+checks that workers drain and exit cleanly.
+
+    python -m benchmarks.workers --workers 1,4 --requests 2000 --concurrency 64
+
+The load generator runs on the same machine; with fewer cores than workers
+plus one, the numbers mostly measure contention.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks import harness
+from src.services.auth import auth_service
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_ready(base_url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/metrics")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} did not start")
+
+
+async def drive(base_url: str, headers: list[dict], requests: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def one(i: int):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(
+                    "/api/contacts/", params={"limit": 50}, headers=headers[i % len(headers)]
+                )
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors += 1
+
+        await asyncio.gather(*[one(i) for i in range(min(requests, 100))])
+        latencies.clear()
+        errors = 0
+        started = time.perf_counter()
+        await asyncio.gather(*[one(i) for i in range(requests)])
+        elapsed = time.perf_counter() - started
+    return {"throughput_rps": round(requests / elapsed, 1), "errors": errors, **harness.percentiles(latencies)}
+
+
+async def run_workers(workers: int, db_url: str, headers: list[dict], args) -> dict:
+    port = free_port()
+    env = {**os.environ, "DB_URL": db_url}
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--app", "benchmarks.workers_app:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        await wait_ready(base_url)
+        result = await drive(base_url, headers, args.requests, args.concurrency)
+    finally:
+        started = time.perf_counter()
+        server.send_signal(signal.SIGTERM)
+        code = server.wait(timeout=60)
+        # uvicorn re-raises SIGTERM after a single-process graceful shutdown
+        result_shutdown = {
+            "clean_exit": code in (0, -signal.SIGTERM),
+            "shutdown_s": round(time.perf_counter() - started, 2),
+        }
+    return {**result, **result_shutdown}
+
+
+async def main(args):
+    tmp = tempfile.TemporaryDirectory()
+    db_url = f"sqlite+aiosqlite:///{tmp.name}/bench.db"
+    engine, session_maker = await harness.create_database(db_url)
+    accounts = await harness.seed(session_maker, args.users, args.contacts)
+    await engine.dispose()
+    headers = [
+        {"Authorization": f"Bearer {await auth_service.create_access_token({'sub': a['email']}, 3600)}"}
+        for a in accounts
+    ]
+
+    results = {"params": {"requests": args.requests, "concurrency": args.concurrency,
+                          "contacts": args.contacts, "cpus": os.cpu_count()}}
+    for workers in [int(w) for w in args.workers.split(",")]:
+        results[f"workers_{workers}"] = await run_workers(workers, db_url, headers, args)
+        print(workers, json.dumps(results[f"workers_{workers}"]), file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--contacts", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
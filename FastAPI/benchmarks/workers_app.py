@@ -0,0 +1,13 @@
+"""
+ASGI target for ``benchmarks.workers``: the real app with a per-worker
+fakeredis cache, rate limiters and e-mails disabled. The database comes from
+``DB_URL`` as usual.
+"""
+from benchmarks import harness
+from main import app
+
+harness.use_fake_redis()
+harness.disable_rate_limiters()
+harness.disable_emails()
+
+__all__ = ["app"]
@@ -0,0 +1,26 @@
+"""
+Build step: write precompressed variants of the static assets.
+
+    python compress_static.py
+
+Creates ``.gz`` (and ``.br`` when ``brotli`` is installed) next to each text
+asset in ``src/static``; the app serves them to clients that accept the
+encoding. Run it again after changing an asset: variants older than their
+source are ignored.
+"""
+import argparse
+
+from src.services.static import STATIC_DIR, precompress
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--directory", default=str(STATIC_DIR))
+    parser.add_argument("--min-size", type=int, default=256)
+    args = parser.parse_args(argv)
+    for path in precompress(args.directory, args.min_size):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
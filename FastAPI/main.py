@@ -1,28 +1,44 @@
+import hashlib
 import re
 from ipaddress import ip_address
 from typing import Callable
 from pathlib import Path
 from contextlib import asynccontextmanager
+from functools import lru_cache
 
-import redis.asyncio as redis
 from fastapi import FastAPI, Depends, HTTPException, Request, status
-from fastapi.responses import JSONResponse, HTMLResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import JSONResponse, HTMLResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi_limiter import FastAPILimiter
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.db import get_db
+from src.database.db import async_session, get_db, init_engine, dispose_engine
 from src.routes import auth, users
 from src.config.config import config
+from src.services.limiter import limiter
+from src.services.changes import change_feed
+from src.services.compaction import TombstoneCompactor
+from src.services.reconcile import ContactCountReconciler
+from src.services.opens import open_tracker
+from src.services import metrics
+from src.services.query_stats import QueryStatsMiddleware
+from src.services.static import CompressionMiddleware, PrecompressedStaticFiles, static_url
+from src.services.loop_monitor import LoopMonitor
+from src.services.breaker import GuardedRedis
 
 from src.routes import contacts as contact_routes
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    monitor = LoopMonitor(
+        interval=config.LOOP_MONITOR_INTERVAL,
+        threshold=config.LOOP_BLOCKING_THRESHOLD,
+        debug=config.DEBUG,
+    )
+    monitor.start()
+    init_engine()
+
     redis_kwargs = {
         "host": config.REDIS_DOMAIN,
         "port": config.REDIS_PORT,
@@ -37,19 +53,43 @@ async def lifespan(app: FastAPI):
 
     print("Redis connection params:", redis_kwargs)
 
-    r = redis.Redis(**redis_kwargs)
-    await FastAPILimiter.init(r)
-    print("FastAPILimiter ініціалізовано")
+    # per-command timeouts behind the shared Redis breaker
+    r = GuardedRedis(**redis_kwargs)
+    await limiter.init(r)
+    print("Limiter ініціалізовано")
+    await change_feed.init(r)
+    compactor = TombstoneCompactor(async_session, config.CHANGES_COMPACT_INTERVAL, r)
+    compactor.start()
+    reconciler = ContactCountReconciler(
+        async_session, config.CONTACT_COUNTS_RECONCILE_INTERVAL, r, config.CONTACT_COUNTS_RECONCILE_BATCH
+    )
+    reconciler.start()
+    open_tracker.init(async_session)
 
     yield
 
+    await open_tracker.close()
+    await reconciler.stop()
+    await compactor.stop()
+    await change_feed.close()
+    await limiter.close()
     await r.close()
+    await dispose_engine()
+    await monitor.stop()
+    metrics.mark_process_dead()
 
 
 app = FastAPI(title="Contacts API", lifespan=lifespan)
 
 origins = ["*"]
 
+# added first so it is innermost: it has to see the route's own single-chunk
+# body to apply the size threshold, and CORS and the "http" middlewares below
+# all wrap it (the latter re-stream every response)
+app.add_middleware(
+    CompressionMiddleware, minimum_size=config.COMPRESS_MIN_SIZE, compresslevel=config.COMPRESS_LEVEL
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -76,10 +116,14 @@ async def user_agent_ban_middleware(request: Request, call_next: Callable):
     return response
 
 
-BASE_DIR = Path("__file__")
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+
+
+BASE_DIR = Path(__file__).resolve().parent
 static_dir = BASE_DIR / "src" / "static"
 if static_dir.exists():
-    app.mount("/static", StaticFiles(directory=static_dir), name="static")
+    app.mount("/static", PrecompressedStaticFiles(directory=static_dir), name="static")
 
 
 app.include_router(auth.router, prefix="/api")
@@ -87,14 +131,34 @@ app.include_router(users.router, prefix="/api")
 app.include_router(contact_routes.router, prefix="/api")
 
 
-templates = Jinja2Templates(directory=BASE_DIR / "src" / "templates")
+@lru_cache
+def get_templates():
+    from fastapi.templating import Jinja2Templates
+
+    templates = Jinja2Templates(directory=BASE_DIR / "src" / "templates")
+    templates.env.globals["static_url"] = static_url
+    return templates
+
+
+@lru_cache
+def render_page(name: str, **context) -> tuple[bytes, str]:
+    """Render a template whose context does not depend on the request, once per process."""
+    body = get_templates().get_template(name).render(**context).encode()
+    return body, f'"{hashlib.md5(body).hexdigest()}"'
 
 
 @app.get("/", response_class=HTMLResponse)
-def index(request: Request):
-    return templates.TemplateResponse(
-        "index.html", {"request": request, "our": "Build group WebPython #16"}
-    )
+async def index(request: Request):
+    body, etag = render_page("index.html", our="Build group WebPython #16")
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return HTMLResponse(body, headers=headers)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 
 @app.get("/api/healthchecker")
@@ -0,0 +1,83 @@
+"""
+Production launcher: runs the app in several uvicorn worker processes.
+
+    python serve.py --workers 4 --port 8000
+
+uvloop and httptools are used when installed (``uvicorn[standard]``). The
+parent process binds the socket and resolves the configuration, then uvicorn
+spawns the workers: each is a fresh interpreter that gets the socket, the
+configuration and the environment (``PROMETHEUS_MULTIPROC_DIR`` included) and
+imports the app (``--app``) itself, so nothing the parent set up at module
+level is inherited. On SIGTERM each worker stops accepting connections, lets
+in-flight requests finish (up to ``--graceful-timeout`` seconds) and then runs
+the ``lifespan`` shutdown, which closes Redis and disposes the DB engine.
+"""
+import argparse
+import os
+import tempfile
+from importlib.util import find_spec
+from pathlib import Path
+
+from src.config.config import config
+
+
+def prepare_multiprocess_dir(workers: int) -> str | None:
+    """
+    Point ``PROMETHEUS_MULTIPROC_DIR`` at an empty directory shared by all
+    workers, so ``/metrics`` aggregates across them. Stale files from a
+    previous run are removed.
+    """
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory is None:
+        if workers <= 1:
+            return None
+        directory = tempfile.mkdtemp(prefix="contacts-metrics-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    for stale in path.glob("*.db"):
+        stale.unlink()
+    return directory
+
+
+def uvicorn_options(args) -> dict:
+    workers = args.workers or os.cpu_count() or 1
+    return {
+        "host": args.host,
+        "port": args.port,
+        "workers": workers,
+        "loop": "uvloop" if find_spec("uvloop") else "asyncio",
+        "http": "httptools" if find_spec("httptools") else "h11",
+        "timeout_keep_alive": args.keepalive,
+        "timeout_graceful_shutdown": args.graceful_timeout,
+        "backlog": args.backlog,
+        "proxy_headers": True,
+        "access_log": args.access_log,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--app", default="main:app")
+    parser.add_argument("--host", default=config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=config.SERVER_WORKERS, help="0 means one per CPU")
+    parser.add_argument("--keepalive", type=int, default=config.SERVER_KEEPALIVE)
+    parser.add_argument("--graceful-timeout", type=int, default=config.SERVER_GRACEFUL_TIMEOUT)
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--access-log", action="store_true")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    options = uvicorn_options(args)
+    prepare_multiprocess_dir(options["workers"])
+    print(
+        f"Starting {options['workers']} worker(s) on {args.host}:{args.port} "
+        f"(loop={options['loop']}, http={options['http']})"
+    )
+    uvicorn.run(args.app, **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,164 @@
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import math
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+
 from src.config.config import config
+from src.database.replicas import ReplicaRouter
+from src.services.breaker import HALF_OPEN, CircuitOpenError, db_breaker
+from src.services.metrics import instrument_pool
+from src.services.query_stats import instrument_engine
 
 DATABASE_URL = config.DB_URL
 
-engine = create_async_engine(DATABASE_URL, echo=True)
-async_session = async_sessionmaker(engine, expire_on_commit=False)
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+def engine_options(url: str) -> dict:
+    options = {"echo": config.DB_ECHO, "query_cache_size": config.DB_QUERY_CACHE_SIZE}
+    if url.startswith("postgresql+asyncpg"):
+        # fail fast instead of queueing behind a stalled server
+        options["pool_timeout"] = config.DB_POOL_TIMEOUT
+        options["connect_args"] = {
+            "timeout": config.DB_CONNECT_TIMEOUT,
+            "command_timeout": config.DB_COMMAND_TIMEOUT,
+            "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": {
+                "application_name": config.DB_APPLICATION_NAME,
+                "jit": "on" if config.DB_JIT else "off",
+                "statement_timeout": str(config.DB_STATEMENT_TIMEOUT_MS),
+            },
+        }
+    return options
+
+
+def replica_urls() -> list[str]:
+    return [url.strip() for url in config.DB_REPLICA_URLS.split(",") if url.strip()]
+
+
+engine: AsyncEngine | None = None
+async_session = async_sessionmaker(expire_on_commit=False)
+replica_engines: list[AsyncEngine] = []
+replicas = ReplicaRouter(retry_after=config.DB_REPLICA_RETRY_SECONDS, sticky_ms=config.DB_READ_STICKY_MS)
+
+
+def init_engine() -> AsyncEngine:
+    """
+    Create the engine on first use (or from ``lifespan``) rather than at
+    import, so importing the app does not load the DB driver.
+    """
+    global engine
+    if engine is None:
+        engine = create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+        instrument_pool(engine)
+        instrument_engine(engine)
+        async_session.configure(bind=engine)
+        for url in replica_urls():
+            replica = create_async_engine(url, pool_pre_ping=True, **engine_options(url))
+            instrument_engine(replica)
+            replica_engines.append(replica)
+            replicas.add(async_sessionmaker(replica, expire_on_commit=False))
+    return engine
+
+
+async def dispose_engine() -> None:
+    global engine
+    if engine is not None:
+        await engine.dispose()
+        engine = None
+        async_session.configure(bind=None)
+    for replica in replica_engines:
+        await replica.dispose()
+    replica_engines.clear()
+    replicas.clear()
+
+
+# connection-level trouble, as opposed to errors in a query; not bare
+# ``OSError``, which would count Redis timeouts and refusals raised inside a
+# request's session against the database
+DB_FAILURES = (OperationalError, InterfaceError, PoolTimeoutError)
+
+
+def is_connection_error(err: BaseException) -> bool:
+    return isinstance(err, DB_FAILURES) or isinstance(err, DBAPIError) and err.connection_invalidated
+
+
+def unavailable(err: CircuitOpenError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Database unavailable",
+        headers={"Retry-After": str(max(1, math.ceil(err.retry_after)))},
+    )
+
+
+@asynccontextmanager
+async def primary_session() -> AsyncIterator[AsyncSession]:
+    """
+    Session on the primary, behind ``db_breaker``: while the database is
+    failing, callers get a 503 at once instead of waiting for the pool and
+    connect timeouts; the first session after ``DB_BREAKER_RESET`` seconds
+    probes it with ``SELECT 1``.
+    """
+    init_engine()
+    try:
+        db_breaker.check()
+    except CircuitOpenError as err:
+        raise unavailable(err)
     async with async_session() as session:
         try:
+            if db_breaker.state == HALF_OPEN:
+                try:
+                    await session.execute(text("SELECT 1"))
+                except Exception as err:
+                    if not is_connection_error(err):
+                        raise
+                    print(err)
+                    db_breaker.failure()
+                    raise unavailable(CircuitOpenError(db_breaker.name, db_breaker.retry_after))
+                db_breaker.success()
             yield session
+        except Exception as err:
+            if is_connection_error(err):
+                db_breaker.failure()
+            raise
+        else:
+            db_breaker.success()
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """Primary session for a request; see ``primary_session``."""
+    async with primary_session() as session:
+        yield session
+
+
+def get_primary():
+    """
+    Dependency that opens nothing: the ``primary_session`` factory, for code
+    that needs the primary only on some paths (a user-cache miss, a sticky
+    read), so requests that never touch it are not failed by its breaker.
+    """
+    return primary_session
+
+
+@asynccontextmanager
+async def read_session(primary=primary_session) -> AsyncIterator[AsyncSession]:
+    """A healthy replica's session, or ``primary()`` when there is none."""
+    async with replicas.session() as session:
+        if session is not None:
+            yield session
+            return
+    async with primary() as session:
+        yield session
+
+
+async def get_replica_db(primary=Depends(get_primary)) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Read-only session on a healthy replica, or the primary when no replica is
+    configured or reachable. Not sticky: use
+    ``src.database.routing.get_read_db`` for a user's own data.
+    """
+    async with read_session(primary) as session:
+        yield session
@@ -0,0 +1,214 @@
+"""
+Helpers for migrations that must not lock a busy table.
+
+``create_index_concurrently`` builds an index with ``CREATE INDEX
+CONCURRENTLY`` outside the migration transaction (partition by partition on a
+partitioned table); ``backfill`` updates rows in short keyset-ordered batches,
+each committed on its own, pausing between them and recording its position so
+an interrupted run picks up where it stopped. On other dialects (SQLite in
+tests) they fall back to the plain statements.
+
+Called from a migration without ``connection``, they use alembic's
+``op.get_bind()`` inside ``autocommit_block()``::
+
+    def upgrade() -> None:
+        op.add_column('contacts', sa.Column('country', sa.String(2), nullable=True))
+        backfill('contacts', "country = 'UA'", pending="country IS NULL", name='contacts_country')
+        create_index_concurrently('ix_contacts_country', 'contacts', ['country'])
+"""
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+PROGRESS_TABLE = "online_migrations"
+# PostgreSQL truncates identifiers to 63 bytes
+MAX_IDENTIFIER = 63
+
+
+@contextmanager
+def autocommit(connection: Connection | None = None):
+    """The given connection as is, or alembic's connection outside the migration transaction."""
+    if connection is not None:
+        yield connection
+        return
+    from alembic import op
+
+    with op.get_context().autocommit_block():
+        yield op.get_bind()
+
+
+def index_sql(name: str, table: str, columns: list[str], unique: bool = False, using: str | None = None,
+              where: str | None = None, concurrently: bool = False, only: bool = False) -> str:
+    return "".join((
+        "CREATE ",
+        "UNIQUE " if unique else "",
+        "INDEX ",
+        "CONCURRENTLY " if concurrently else "",
+        f"IF NOT EXISTS {name} ON ",
+        "ONLY " if only else "",
+        table,
+        f" USING {using}" if using else "",
+        f" ({', '.join(columns)})",
+        f" WHERE {where}" if where else "",
+    ))
+
+
+def _index_valid(connection: Connection, name: str) -> bool | None:
+    """``None`` when the index does not exist."""
+    return connection.execute(text(
+        "SELECT i.indisvalid FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid WHERE c.relname = :name"
+    ), {"name": name}).scalar()
+
+
+def _partitions(connection: Connection, table: str) -> list[str] | None:
+    """Partition names of a partitioned table, ``None`` for a plain one."""
+    kind = connection.execute(text("SELECT relkind FROM pg_class WHERE relname = :table"), {"table": table}).scalar()
+    if kind != "p":
+        return None
+    return list(connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :table ORDER BY c.relname"
+    ), {"table": table}).scalars())
+
+
+def _build_concurrently(connection: Connection, name: str, table: str, columns: list[str], **options) -> None:
+    # a failed CONCURRENTLY build leaves an INVALID index behind; IF NOT EXISTS would keep it
+    if _index_valid(connection, name) is False:
+        print(f"Dropping invalid index {name}")
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    connection.execute(text(index_sql(name, table, columns, concurrently=True, **options)))
+
+
+def create_index_concurrently(name: str, table: str, columns: list[str], *, unique: bool = False,
+                              using: str | None = None, where: str | None = None,
+                              connection: Connection | None = None) -> None:
+    """
+    Build an index without blocking writes. Safe to re-run after a failure.
+
+    A partitioned table cannot be indexed concurrently, so the parent index is
+    created ``ON ONLY`` the parent (invalid, no data), each partition is indexed
+    concurrently and attached; the parent turns valid with the last one.
+    """
+    options = {"unique": unique, "using": using, "where": where}
+    with autocommit(connection) as connection:
+        if connection.dialect.name != "postgresql":
+            connection.execute(text(index_sql(name, table, columns, **options)))
+            return
+        partitions = _partitions(connection, table)
+        if partitions is None:
+            _build_concurrently(connection, name, table, columns, **options)
+            return
+        connection.execute(text(index_sql(name, table, columns, only=True, **options)))
+        for partition in partitions:
+            child = f"{name}_{partition}"[:MAX_IDENTIFIER]
+            print(f"Indexing {partition}")
+            _build_concurrently(connection, child, partition, columns, **options)
+            # a no-op when already attached
+            connection.execute(text(f"ALTER INDEX {name} ATTACH PARTITION {child}"))
+
+
+def drop_index_concurrently(name: str, connection: Connection | None = None) -> None:
+    with autocommit(connection) as connection:
+        if connection.dialect.name != "postgresql":
+            connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            return
+        kind = connection.execute(text("SELECT relkind FROM pg_class WHERE relname = :name"), {"name": name}).scalar()
+        # partitioned indexes cannot be dropped concurrently; dropping one drops its children
+        concurrently = "" if kind == "I" else "CONCURRENTLY "
+        connection.execute(text(f"DROP INDEX {concurrently}IF EXISTS {name}"))
+
+
+def _ensure_progress_table(connection: Connection) -> None:
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} ("
+        "name VARCHAR(100) PRIMARY KEY, last_key VARCHAR(255), rows_done BIGINT NOT NULL, "
+        "finished BOOLEAN NOT NULL)"
+    ))
+
+
+def _load_progress(connection: Connection, name: str) -> tuple[str | None, int, bool]:
+    row = connection.execute(
+        text(f"SELECT last_key, rows_done, finished FROM {PROGRESS_TABLE} WHERE name = :name"), {"name": name}
+    ).first()
+    return (row[0], row[1], bool(row[2])) if row else (None, 0, False)
+
+
+def _save_progress(connection: Connection, name: str, last_key, rows_done: int, finished: bool = False) -> None:
+    values = {"name": name, "last_key": None if last_key is None else str(last_key), "rows_done": rows_done,
+              "finished": finished}
+    updated = connection.execute(text(
+        f"UPDATE {PROGRESS_TABLE} SET last_key = :last_key, rows_done = :rows_done, finished = :finished "
+        "WHERE name = :name"
+    ), values)
+    if not updated.rowcount:
+        connection.execute(text(
+            f"INSERT INTO {PROGRESS_TABLE} (name, last_key, rows_done, finished) "
+            "VALUES (:name, :last_key, :rows_done, :finished)"
+        ), values)
+
+
+def backfill(table: str, assignments: str, *, pending: str, name: str, key: str = "id", batch_size: int = 1000,
+             pause: float = 0.1, params: dict | None = None, connection: Connection | None = None,
+             report=print) -> int:
+    """
+    ``UPDATE table SET assignments WHERE pending`` in batches of ``batch_size``
+    rows ordered by ``key`` (unique and indexed), each in its own transaction,
+    sleeping ``pause`` seconds between batches. Returns the rows updated.
+
+    ``pending`` must turn false for a row once it is done (``col IS NULL`` for
+    ``col = ...``), which makes a re-run of a half-finished batch harmless. The last key of every batch is
+    stored under ``name`` in ``online_migrations``, so a restarted backfill
+    skips the rows already behind it; a finished one returns at once.
+    ``report`` receives a progress line per batch.
+    """
+    params = params or {}
+    with autocommit(connection) as connection:
+        # a connection handed in outside alembic's autocommit block: commit each batch ourselves
+        managed = connection.get_execution_options().get("isolation_level") != "AUTOCOMMIT"
+
+        def commit():
+            if managed and connection.in_transaction():
+                connection.commit()
+
+        def statements(resumed: bool):
+            after = f" AND {key} > :after" if resumed else ""
+            return (
+                text(f"SELECT {key} FROM {table} WHERE ({pending}){after} ORDER BY {key} LIMIT :batch_size"),
+                text(f"UPDATE {table} SET {assignments} WHERE ({pending}){after} AND {key} <= :upto"),
+            )
+
+        _ensure_progress_table(connection)
+        last_key, rows_done, finished = _load_progress(connection, name)
+        commit()
+        if finished:
+            report(f"{name}: already done ({rows_done} rows)")
+            return 0
+        if last_key is not None:
+            report(f"{name}: resuming after {key}={last_key} ({rows_done} rows done)")
+
+        updated = 0
+        started = time.monotonic()
+        while True:
+            select, update = statements(last_key is not None)
+            bounds = {**params, "batch_size": batch_size, "after": last_key}
+            keys = connection.execute(select, bounds).scalars().all()
+            if not keys:
+                break
+            count = connection.execute(update, {**bounds, "upto": keys[-1]}).rowcount
+            updated += count
+            rows_done += count
+            last_key = keys[-1]
+            _save_progress(connection, name, last_key, rows_done)
+            commit()
+            elapsed = time.monotonic() - started
+            report(f"{name}: {rows_done} rows, {key}={last_key}, {updated / elapsed if elapsed else 0:.0f} rows/s")
+            if len(keys) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+        _save_progress(connection, name, last_key, rows_done, finished=True)
+        commit()
+        report(f"{name}: done, {rows_done} rows")
+        return updated
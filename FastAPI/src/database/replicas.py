@@ -0,0 +1,93 @@
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class ReplicaRouter:
+    """
+    Round-robin over read-replica session factories. A replica that fails is
+    skipped for ``retry_after`` seconds; with no healthy replica left,
+    ``session`` yields the ``fallback`` passed in by the caller (``None`` by
+    default, for callers that open the primary only when needed).
+
+    ``stick``/``is_sticky`` keep a short per-key window during which reads
+    should go to the primary, so a user sees their own writes.
+    """
+
+    def __init__(self, retry_after: float = 30.0, sticky_ms: int = 5000, max_sticky: int = 10_000):
+        self.retry_after = retry_after
+        self.sticky_ms = sticky_ms
+        self.max_sticky = max_sticky
+        self.session_makers: list[async_sessionmaker] = []
+        self.down_until: list[float] = []
+        self.sticky: dict[str, float] = {}
+        self._next = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.session_makers)
+
+    def add(self, session_maker: async_sessionmaker) -> None:
+        self.session_makers.append(session_maker)
+        self.down_until.append(0.0)
+
+    def clear(self) -> None:
+        self.session_makers.clear()
+        self.down_until.clear()
+        self.sticky.clear()
+
+    def stick(self, key: str) -> None:
+        now = time.monotonic()
+        if len(self.sticky) >= self.max_sticky:
+            self.sticky = {k: until for k, until in self.sticky.items() if until > now}
+        self.sticky[key] = now + self.sticky_ms / 1000
+
+    def is_sticky(self, key: str) -> bool:
+        until = self.sticky.get(key)
+        if until is None:
+            return False
+        if until < time.monotonic():
+            del self.sticky[key]
+            return False
+        return True
+
+    def mark_down(self, index: int) -> None:
+        self.down_until[index] = time.monotonic() + self.retry_after
+
+    def candidates(self) -> list[int]:
+        """Healthy replica indexes, starting from the next one in turn."""
+        count = len(self.session_makers)
+        if not count:
+            return []
+        start = self._next % count
+        self._next = start + 1
+        now = time.monotonic()
+        order = [(start + offset) % count for offset in range(count)]
+        return [index for index in order if self.down_until[index] <= now]
+
+    @asynccontextmanager
+    async def session(self, fallback: AsyncSession | None = None) -> AsyncIterator[AsyncSession | None]:
+        for index in self.candidates():
+            session = self.session_makers[index]()
+            try:
+                await session.connection()
+            except (DBAPIError, OSError) as err:
+                print(f"Replica {index} unavailable: {err}")
+                self.mark_down(index)
+                await session.close()
+                continue
+            session.info["replica"] = index
+            try:
+                yield session
+            except DBAPIError as err:
+                if err.connection_invalidated or isinstance(err, (OperationalError, InterfaceError)):
+                    print(f"Replica {index} failed: {err}")
+                    self.mark_down(index)
+                raise
+            finally:
+                await session.close()
+            return
+        yield fallback
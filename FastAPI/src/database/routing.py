@@ -0,0 +1,55 @@
+"""
+Per-user read routing: reads go to a replica unless the user wrote recently,
+in which case they stay on the primary for ``DB_READ_STICKY_MS``.
+
+The sticky window is kept in-process and mirrored in Redis next to the user
+cache entry, so it holds when the next request lands on another worker and
+costs no round trip of its own: ``get_current_user`` fetches both at once.
+"""
+from fastapi import Depends, Request
+from redis.exceptions import RedisError
+
+from src.config.config import config
+from src.database.db import get_primary, read_session, replicas
+from src.entity.models import User
+from src.services.auth import STICKY_PREFIX, auth_service
+
+
+async def stick(user: User) -> None:
+    key = str(user.email)
+    replicas.stick(key)
+    try:
+        await auth_service.cache.set(STICKY_PREFIX + key, 1, px=config.DB_READ_STICKY_MS)
+    except (RedisError, OSError) as err:
+        print(err)
+
+
+def is_sticky(request: Request, user: User) -> bool:
+    # no marker when get_current_user did not run (overridden): stay on the primary
+    return replicas.is_sticky(str(user.email)) or getattr(request.state, "read_sticky", True)
+
+
+async def get_read_db(
+    request: Request, user: User = Depends(auth_service.get_current_user), primary=Depends(get_primary)
+):
+    """
+    A replica session for the user's reads, or the primary when they wrote
+    recently. The primary is opened only then, so its breaker does not fail
+    reads a replica can serve.
+    """
+    if not replicas.enabled or is_sticky(request, user):
+        async with primary() as session:
+            yield session
+        return
+    async with read_session(primary) as session:
+        yield session
+
+
+async def read_your_writes(user: User = Depends(auth_service.get_current_user)):
+    """Route dependency for writes: pins the user's reads to the primary."""
+    if not replicas.enabled:
+        yield
+        return
+    await stick(user)
+    yield
+    await stick(user)
@@ -1,12 +1,19 @@
 import enum
 import uuid
-from datetime import date
-from sqlalchemy.dialects.postgresql import UUID
+from datetime import date, datetime
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from typing import Optional
-from sqlalchemy import  Boolean, String, Date, DateTime, func, Enum,ForeignKey
+from sqlalchemy import  Boolean, DDL, Integer, JSON, String, Date, DateTime, event, func, Enum,ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase,relationship
 
 
+# contacts is hash-partitioned by user_id on PostgreSQL; every query is scoped
+# to one user, so it only ever touches one partition
+CONTACT_PARTITIONS = 16
+
+# a text[] with a GIN index on PostgreSQL; SQLite stores the list as JSON
+Tags = ARRAY(String(50)).with_variant(JSON(), "sqlite")
+
 
 class Base(DeclarativeBase):
     pass
@@ -17,13 +24,88 @@ class Contact(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     first_name: Mapped[str] = mapped_column(String(20), index=True)
     last_name: Mapped[str] = mapped_column(String(20), index=True)
-    email: Mapped[str] = mapped_column(String(20), unique=True, index=True)
+    email: Mapped[str] = mapped_column(String(20), index=True)
     phone: Mapped[str] = mapped_column(String(15))
+    # ``phone`` in E.164, set on every write; None when it is not a usable number
+    phone_e164: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
     birthday: Mapped[Date] = mapped_column(Date)
     additional_info: Mapped[Optional[str]] = mapped_column(String(250), nullable=True)
 
-    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
+    # part of the primary key: a partitioned table's keys must include the partition key
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('users.id'), primary_key=True)
     user: Mapped["User"] = relationship("User", backref="contacts", lazy="joined")
+    # set by the app (naive UTC) rather than now(): microsecond resolution on
+    # every backend, and the same clock the sync watermarks are compared with
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, server_default=func.now()
+    )
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    tags: Mapped[list[str]] = mapped_column(Tags, default=list)
+
+    __table_args__ = (
+        Index("ix_contacts_user_id_updated_at", "user_id", "updated_at"),
+        Index("ix_contacts_user_id_phone_e164", "user_id", "phone_e164"),
+        # typeahead: prefix ranges on lowercased names and e-mail; text_pattern_ops
+        # makes them usable whatever the database collation
+        *(
+            Index(
+                f"ix_contacts_user_id_{column}_prefix", "user_id", func.lower(text(column)).label(f"{column}_lower"),
+                postgresql_ops={f"{column}_lower": "text_pattern_ops"},
+                postgresql_where=text("deleted_at IS NULL"), sqlite_where=text("deleted_at IS NULL"),
+            )
+            for column in ("first_name", "last_name", "email")
+        ),
+        Index("ix_contacts_tags", "tags", postgresql_using="gin").ddl_if(dialect="postgresql"),
+        # deleted rows are kept as tombstones for delta sync; only live rows own
+        # an e-mail, and only within their user's address book
+        Index(
+            "uq_contacts_user_id_email_live", "user_id", "email", unique=True,
+            postgresql_where=text("deleted_at IS NULL"), sqlite_where=text("deleted_at IS NULL"),
+        ),
+        {"postgresql_partition_by": "HASH (user_id)"},
+    )
+
+
+for _remainder in range(CONTACT_PARTITIONS):
+    event.listen(
+        Contact.__table__,
+        "after_create",
+        DDL(
+            f"CREATE TABLE contacts_p{_remainder} PARTITION OF contacts "
+            f"FOR VALUES WITH (MODULUS {CONTACT_PARTITIONS}, REMAINDER {_remainder})"
+        ).execute_if(dialect="postgresql"),
+    )
+
+class ContactTagCount(Base):
+    """Live contacts per tag, kept up to date by the writes that change tags."""
+    __tablename__ = "contact_tag_counts"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('users.id'), primary_key=True)
+    tag: Mapped[str] = mapped_column(String(50), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class ContactMonthCount(Base):
+    """
+    Live contacts per birth month (1-12); their sum is the contact count.
+    Kept up to date by the writes, corrected by ``ContactCountReconciler``.
+    """
+    __tablename__ = "contact_month_counts"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('users.id'), primary_key=True)
+    month: Mapped[int] = mapped_column(Integer, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class EmailOpen(Base):
+    """Tracking-pixel hits per username, flushed in batches by ``OpenTracker``."""
+    __tablename__ = "email_opens"
+
+    username: Mapped[str] = mapped_column(String(50), primary_key=True)
+    opens: Mapped[int] = mapped_column(Integer, default=0)
+    first_opened_at: Mapped[datetime] = mapped_column(DateTime)
+    last_opened_at: Mapped[datetime] = mapped_column(DateTime)
+
 
 class Role(enum.Enum):
     admin: str = "admin"
@@ -1,28 +1,44 @@
+from collections import Counter
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import (
+    Integer, and_, cast, delete, extract, func, lambda_stmt, literal, or_, select, text, tuple_, union_all, update
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from datetime import date
+from datetime import date, datetime, timedelta
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import noload
 from uuid import UUID
 
-from src.entity.models import Contact, User
-from src.schemas.contacts import ContactCreate
+from src.config.config import config
+from src.entity.models import Contact, ContactMonthCount, ContactTagCount, User
+from src.schemas.contacts import ContactCreate, ContactOut, ContactPatch
+from src.services.changes import change_feed
+from src.services.phones import to_e164
 
 
 async def create_contact(
     db: AsyncSession, contact: ContactCreate, user: User
 ) -> Contact:
-    stmt = select(Contact).filter(Contact.email == contact.email)
+    email = contact.email
+    user_id = user.id
+    stmt = lambda_stmt(
+        lambda: select(Contact).where(
+            Contact.user_id == user_id, Contact.email == email, Contact.deleted_at.is_(None)
+        )
+    )
     result = await db.execute(stmt)
     existing = result.scalar_one_or_none()
 
     if existing:
         raise HTTPException(status_code=400, detail="Email already exists")
 
-    new_contact = Contact(**contact.model_dump(), user_id=user.id)
+    new_contact = Contact(**contact.model_dump(), phone_e164=to_e164(contact.phone), user_id=user.id)
     db.add(new_contact)
     try:
+        await apply_tag_delta(db, user.id, tag_delta((), new_contact.tags))
+        await apply_month_delta(db, user.id, month_delta(None, new_contact.birthday))
         await db.commit()
         await db.refresh(new_contact)
     except IntegrityError:
@@ -31,19 +47,109 @@ async def create_contact(
             status_code=400, detail="Failed to create contact. Integrity error."
         )
 
+    await publish_change(user, "created", new_contact)
     return new_contact
 
 
+def tag_delta(before, after) -> Counter:
+    delta = Counter()
+    for tag in set(after or ()) - set(before or ()):
+        delta[tag] += 1
+    for tag in set(before or ()) - set(after or ()):
+        delta[tag] -= 1
+    return delta
+
+
+def month_delta(before: date | None, after: date | None) -> Counter:
+    """Change in per-birth-month counts when a contact's birthday goes from ``before`` to ``after``."""
+    delta = Counter()
+    if before is not None:
+        delta[before.month] -= 1
+    if after is not None:
+        delta[after.month] += 1
+    return delta
+
+
+async def _apply_count_delta(db: AsyncSession, model, key: str, user_id: UUID, delta: Counter) -> None:
+    rows = [{"user_id": user_id, key: value, "count": count} for value, count in delta.items() if count]
+    if not rows:
+        return
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    table = model.__table__
+    stmt = dialect.insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c[key]], set_={"count": table.c.count + stmt.excluded.count}
+    )
+    await db.execute(stmt, rows)
+
+
+async def apply_tag_delta(db: AsyncSession, user_id: UUID, delta: Counter) -> None:
+    """Add ``delta`` to the user's per-tag counts in one upsert; a no-op when nothing changed."""
+    await _apply_count_delta(db, ContactTagCount, "tag", user_id, delta)
+
+
+async def apply_month_delta(db: AsyncSession, user_id: UUID, delta: Counter) -> None:
+    """Add ``delta`` to the user's per-birth-month counts in one upsert; a no-op when nothing changed."""
+    await _apply_count_delta(db, ContactMonthCount, "month", user_id, delta)
+
+
+def _change(op: str, contact: Contact) -> tuple[str, UUID, dict | None]:
+    data = None
+    if op != "deleted":
+        data = ContactOut.model_validate(contact, from_attributes=True).model_dump(mode="json")
+    return op, contact.id, data
+
+
+async def publish_change(user: User, op: str, contact: Contact) -> None:
+    if change_feed.redis is None:
+        return
+    await change_feed.publish(user.id, *_change(op, contact))
+
+
+def _tagged(db: AsyncSession, tags: List[str]):
+    """Contacts carrying every tag in ``tags``."""
+    if db.get_bind().dialect.name == "postgresql":
+        # tags @> ARRAY[...]: answered by the GIN index on contacts.tags
+        return Contact.tags.contains(tags)
+    each = func.json_each(Contact.tags).table_valued("value")
+    matched = select(func.count(each.c.value.distinct())).where(each.c.value.in_(tags)).scalar_subquery()
+    return matched == len(tags)
+
+
 async def get_contacts(
-    db: AsyncSession, user: User, skip: int = 0, limit: int = 100
+    db: AsyncSession, user: User, skip: int = 0, limit: int = 100, tags: List[str] | None = None
 ) -> List[Contact]:
-    stmt = select(Contact).filter(Contact.user_id == user.id).offset(skip).limit(limit)
+    user_id = user.id
+    if tags:
+        stmt = (
+            select(Contact)
+            .where(Contact.user_id == user_id, Contact.deleted_at.is_(None), _tagged(db, tags))
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await db.execute(stmt)
+        return result.scalars().all()
+    stmt = lambda_stmt(
+        lambda: select(Contact)
+        .where(Contact.user_id == user_id, Contact.deleted_at.is_(None))
+        .offset(skip)
+        .limit(limit)
+    )
     result = await db.execute(stmt)
     return result.scalars().all()
 
 
+def _contact_by_id(contact_id: UUID, user: User):
+    user_id = user.id
+    return lambda_stmt(
+        lambda: select(Contact).where(
+            Contact.id == contact_id, Contact.user_id == user_id, Contact.deleted_at.is_(None)
+        )
+    )
+
+
 async def get_contact(db: AsyncSession, contact_id: UUID, user: User) -> Contact | None:
-    stmt = select(Contact).filter_by(id=contact_id, user=user)
+    stmt = _contact_by_id(contact_id, user)
     result = await db.execute(stmt)
     return result.scalar_one_or_none()
 
@@ -51,45 +157,496 @@ async def get_contact(db: AsyncSession, contact_id: UUID, user: User) -> Contact
 async def update_contact(
     db: AsyncSession, contact_id: UUID, contact: ContactCreate, user: User
 ) -> Contact | None:
-    stmt = select(Contact).filter_by(id=contact_id, user=user)
+    stmt = _contact_by_id(contact_id, user)
     result = await db.execute(stmt)
     db_contact = result.scalar_one_or_none()
     if db_contact:
-        for field, value in contact.model_dump().items():
+        fields = contact.model_dump()
+        if fields["tags"] is None:
+            del fields["tags"]
+        else:
+            await apply_tag_delta(db, user.id, tag_delta(db_contact.tags, fields["tags"]))
+        await apply_month_delta(db, user.id, month_delta(db_contact.birthday, fields["birthday"]))
+        for field, value in fields.items():
             setattr(db_contact, field, value)
+        db_contact.phone_e164 = to_e164(db_contact.phone)
         await db.commit()
         await db.refresh(db_contact)
+        await publish_change(user, "updated", db_contact)
     return db_contact
 
 
 async def delete_contact(db: AsyncSession, contact_id: UUID, user: User) -> dict:
-    stmt = select(Contact).filter_by(id=contact_id, user=user)
+    stmt = _contact_by_id(contact_id, user)
     result = await db.execute(stmt)
     db_contact = result.scalar_one_or_none()
     if db_contact:
-        await db.delete(db_contact)
+        db_contact.deleted_at = datetime.utcnow()
+        await apply_tag_delta(db, user.id, tag_delta(db_contact.tags, ()))
+        await apply_month_delta(db, user.id, month_delta(db_contact.birthday, None))
         await db.commit()
+        await publish_change(user, "deleted", db_contact)
         return {"ok": True}
     return {"ok": False, "error": "Not found"}
 
 
 async def search_contacts(db: AsyncSession, query: str, user: User) -> List[Contact]:
-    stmt = select(Contact).filter(
-        Contact.first_name.ilike(f"%{query}%")
-        | Contact.last_name.ilike(f"%{query}%")
-        | Contact.email.ilike(f"%{query}%"),
-        user=user,
+    pattern = f"%{query}%"
+    user_id = user.id
+    stmt = lambda_stmt(
+        lambda: select(Contact).where(
+            Contact.user_id == user_id,
+            Contact.deleted_at.is_(None),
+            Contact.first_name.ilike(pattern)
+            | Contact.last_name.ilike(pattern)
+            | Contact.email.ilike(pattern),
+        )
     )
     result = await db.execute(stmt)
     return result.scalars().all()
 
 
+def _prefix_range(db: AsyncSession, column: str, prefix: str):
+    """``lower(column)`` starts with ``prefix``, as a range the prefix index can answer, and its ordering."""
+    key = func.lower(getattr(Contact, column))
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    if db.get_bind().dialect.name == "postgresql":
+        # the operators of text_pattern_ops: byte order, parameters welcome
+        # (LIKE 'p%' only uses the index when the pattern is a literal)
+        in_range = and_(key.op("~>=~", is_comparison=True)(prefix), key.op("~<~", is_comparison=True)(upper))
+        return key, in_range, text(f"lower({column}) USING ~<~")
+    return key, and_(key >= prefix, key < upper), key
+
+
+async def suggest_contacts(db: AsyncSession, user: User, prefix: str, limit: int = 10) -> List[tuple]:
+    """
+    Up to ``limit`` ``(id, first_name, last_name, email)`` rows whose first
+    name, last name or e-mail starts with the lowercase ``prefix``: name
+    matches first, each group in alphabetical order of the matched field. One
+    UNION ALL of three index range scans reading at most ``limit`` rows each.
+    """
+    parts = []
+    for rank, column in ((0, "first_name"), (0, "last_name"), (1, "email")):
+        key, in_range, ordering = _prefix_range(db, column, prefix)
+        part = (
+            select(
+                Contact.id, Contact.first_name, Contact.last_name, Contact.email,
+                literal(rank).label("rank"), key.label("key"),
+            )
+            .where(Contact.user_id == user.id, Contact.deleted_at.is_(None), in_range)
+            .order_by(ordering)
+            .limit(limit)
+        )
+        parts.append(select(part.subquery()))
+    result = await db.execute(union_all(*parts))
+    found, seen = [], set()
+    for row in sorted(result.all(), key=lambda row: (row.rank, row.key)):
+        if row.id not in seen:
+            seen.add(row.id)
+            found.append(tuple(row[:4]))
+            if len(found) == limit:
+                break
+    return found
+
+
+async def get_suggest_rows(db: AsyncSession, user: User, limit: int) -> List[tuple]:
+    """``(id, first_name, last_name, email)`` of up to ``limit`` live contacts, for the typeahead cache."""
+    user_id = user.id
+    stmt = lambda_stmt(
+        lambda: select(Contact.id, Contact.first_name, Contact.last_name, Contact.email)
+        .where(Contact.user_id == user_id, Contact.deleted_at.is_(None))
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return [tuple(row) for row in result.all()]
+
+
+async def get_contacts_stamp(db: AsyncSession, user: User) -> datetime | None:
+    """Latest ``updated_at`` of the user's contacts, tombstones included: changes with every write."""
+    user_id = user.id
+    stmt = lambda_stmt(lambda: select(func.max(Contact.updated_at)).where(Contact.user_id == user_id))
+    return await db.scalar(stmt)
+
+
 async def get_contacts_with_upcoming_birthdays(
     db: AsyncSession, start_date: date, end_date: date, user: User
 ) -> List[Contact]:
-    stmt = select(Contact).filter(
-        Contact.user_id == user.id, Contact.birthday.between(start_date, end_date)
+    user_id = user.id
+    stmt = lambda_stmt(
+        lambda: select(Contact).where(
+            Contact.user_id == user_id,
+            Contact.deleted_at.is_(None),
+            Contact.birthday.between(start_date, end_date),
+        )
     )
 
     result = await db.execute(stmt)
     return result.scalars().all()
+
+
+async def get_contacts_by_ids(db: AsyncSession, ids: List[UUID], user: User) -> dict[UUID, Contact]:
+    user_id = user.id
+    stmt = lambda_stmt(
+        lambda: select(Contact).where(
+            Contact.id.in_(ids), Contact.user_id == user_id, Contact.deleted_at.is_(None)
+        )
+    )
+    result = await db.execute(stmt)
+    return {contact.id: contact for contact in result.scalars().all()}
+
+
+async def get_contacts_by_phone(db: AsyncSession, numbers: List[str], user: User) -> dict[str, List[Contact]]:
+    """Live contacts per E.164 number, from the (user_id, phone_e164) index."""
+    user_id = user.id
+    stmt = lambda_stmt(
+        lambda: select(Contact)
+        .where(Contact.user_id == user_id, Contact.phone_e164.in_(numbers), Contact.deleted_at.is_(None))
+        # the owner is the caller: skip the joined load of Contact.user
+        .options(noload(Contact.user))
+    )
+    result = await db.execute(stmt)
+    found = {number: [] for number in numbers}
+    for contact in result.scalars().all():
+        found[contact.phone_e164].append(contact)
+    return found
+
+
+async def count_contacts(db: AsyncSession, user: User) -> int:
+    user_id = user.id
+    stmt = lambda_stmt(
+        lambda: select(func.count()).select_from(Contact).where(
+            Contact.user_id == user_id, Contact.deleted_at.is_(None)
+        )
+    )
+    return await db.scalar(stmt)
+
+
+async def get_dedup_rows(db: AsyncSession, user: User):
+    """The columns duplicate detection compares, for every live contact of the user."""
+    user_id = user.id
+    stmt = lambda_stmt(
+        lambda: select(
+            Contact.id, Contact.first_name, Contact.last_name, Contact.email, Contact.phone, Contact.birthday
+        ).where(Contact.user_id == user_id, Contact.deleted_at.is_(None))
+    )
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def merge_contacts(db: AsyncSession, primary_id: UUID, duplicate_ids: List[UUID], user: User) -> Contact:
+    """
+    Keep ``primary_id`` and delete the duplicates. The primary's fields win;
+    an empty ``additional_info`` is taken from the first duplicate that has
+    one, and the primary gets the union of all tags.
+    """
+    duplicate_ids = [contact_id for contact_id in dict.fromkeys(duplicate_ids) if contact_id != primary_id]
+    if not duplicate_ids:
+        raise HTTPException(status_code=422, detail="Nothing to merge")
+    found = await get_contacts_by_ids(db, [primary_id, *duplicate_ids], user)
+    if len(found) != len(duplicate_ids) + 1:
+        raise HTTPException(status_code=404, detail="Contact not found")
+
+    primary = found[primary_id]
+    duplicates = [found[contact_id] for contact_id in duplicate_ids]
+    if not primary.additional_info:
+        primary.additional_info = next(
+            (duplicate.additional_info for duplicate in duplicates if duplicate.additional_info), None
+        )
+    tags = list(primary.tags)
+    delta, months = Counter(), Counter()
+    for duplicate in duplicates:
+        delta.update(tag_delta(duplicate.tags, ()))
+        months.update(month_delta(duplicate.birthday, None))
+        tags.extend(duplicate.tags)
+    tags = list(dict.fromkeys(tags))
+    delta.update(tag_delta(primary.tags, tags))
+    primary.tags = tags
+    now = datetime.utcnow()
+    for duplicate in duplicates:
+        duplicate.deleted_at = now
+    # the primary counts as changed for delta sync even when nothing was copied
+    primary.updated_at = now
+    await apply_tag_delta(db, user.id, delta)
+    await apply_month_delta(db, user.id, months)
+    await db.commit()
+
+    if change_feed.redis is not None:
+        events = [_change("updated", primary)] + [_change("deleted", duplicate) for duplicate in duplicates]
+        await change_feed.publish_many(user.id, events)
+    return primary
+
+
+def _item(contact_id: UUID, status: str, contact: Contact | None = None) -> dict:
+    return {"id": contact_id, "status": status, "contact": contact}
+
+
+async def batch_get_contacts(db: AsyncSession, ids: List[UUID], user: User) -> List[dict]:
+    found = await get_contacts_by_ids(db, ids, user)
+    return [
+        _item(contact_id, "ok", found[contact_id]) if contact_id in found else _item(contact_id, "not_found")
+        for contact_id in ids
+    ]
+
+
+async def batch_update_contacts(db: AsyncSession, patches: List[ContactPatch], user: User) -> List[dict]:
+    """
+    Apply partial updates to the user's contacts: one SELECT for the rows, one
+    for e-mail collisions (only when e-mails change) and a single executemany
+    UPDATE by primary key (id, user_id) that writes every column of the
+    changed rows.
+    """
+    found = await get_contacts_by_ids(db, [patch.id for patch in patches], user)
+
+    emails = {
+        patch.email for patch in patches
+        if patch.id in found and patch.email is not None and patch.email != found[patch.id].email
+    }
+    owners = {}
+    if emails:
+        result = await db.execute(
+            select(Contact.email, Contact.id).where(
+                Contact.user_id == user.id, Contact.email.in_(emails), Contact.deleted_at.is_(None)
+            )
+        )
+        owners = dict(result.all())
+
+    rows: dict[UUID, dict] = {}
+    delta, months = Counter(), Counter()
+    results = []
+    for patch in patches:
+        contact = found.get(patch.id)
+        if contact is None:
+            results.append(_item(patch.id, "not_found"))
+            continue
+        row = rows.get(patch.id) or {
+            field: getattr(contact, field) for field in ContactOut.model_fields
+        }
+        row["user_id"] = contact.user_id
+        changes = patch.changes()
+        email = changes.get("email")
+        if email is not None and owners.get(email, contact.id) != contact.id:
+            results.append(_item(patch.id, "conflict"))
+            continue
+        if email is not None:
+            owners.pop(row["email"], None)
+            owners[email] = contact.id
+        if "tags" in changes:
+            delta.update(tag_delta(row["tags"], changes["tags"]))
+        if "birthday" in changes:
+            months.update(month_delta(row["birthday"], changes["birthday"]))
+        row.update(changes)
+        row["phone_e164"] = to_e164(row["phone"])
+        rows[patch.id] = row
+        results.append(_item(patch.id, "updated", row))
+
+    if rows:
+        user_id = user.id
+        try:
+            await db.execute(
+                update(Contact).where(Contact.user_id == user_id),
+                list(rows.values()),
+                execution_options={"synchronize_session": None},
+            )
+            await apply_tag_delta(db, user_id, delta)
+            await apply_month_delta(db, user_id, months)
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(status_code=409, detail="Batch update conflicts with existing contacts")
+        if change_feed.redis is not None:
+            events = [("updated", contact_id, ContactOut(**row).model_dump(mode="json")) for contact_id, row in rows.items()]
+            await change_feed.publish_many(user_id, events)
+    return results
+
+
+async def batch_delete_contacts(db: AsyncSession, ids: List[UUID], user: User) -> List[dict]:
+    user_id = user.id
+    stmt = (
+        update(Contact)
+        .where(Contact.id.in_(ids), Contact.user_id == user_id, Contact.deleted_at.is_(None))
+        .values(deleted_at=datetime.utcnow())
+        .returning(Contact.id, Contact.tags, Contact.birthday)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    deleted, delta, months = set(), Counter(), Counter()
+    for contact_id, tags, birthday in result.all():
+        deleted.add(contact_id)
+        delta.update(tag_delta(tags, ()))
+        months.update(month_delta(birthday, None))
+    await apply_tag_delta(db, user_id, delta)
+    await apply_month_delta(db, user_id, months)
+    await db.commit()
+    await change_feed.publish_many(user_id, [("deleted", contact_id, None) for contact_id in deleted])
+    return [_item(contact_id, "deleted" if contact_id in deleted else "not_found") for contact_id in ids]
+
+
+async def tag_contacts(
+    db: AsyncSession, ids: List[UUID], tags: List[str], user: User, remove: bool = False
+) -> List[dict]:
+    """
+    Add ``tags`` to (or with ``remove``, take them off) the user's contacts:
+    one SELECT, one executemany UPDATE of the rows that change (flushed by
+    the session) and one upsert of the tag counts.
+    """
+    found = await get_contacts_by_ids(db, ids, user)
+    changed, delta = [], Counter()
+    for contact in found.values():
+        if remove:
+            new_tags = [tag for tag in contact.tags if tag not in tags]
+        else:
+            new_tags = list(dict.fromkeys([*contact.tags, *tags]))
+        if new_tags != contact.tags:
+            delta.update(tag_delta(contact.tags, new_tags))
+            contact.tags = new_tags
+            changed.append(contact)
+
+    if changed:
+        await apply_tag_delta(db, user.id, delta)
+        await db.commit()
+        if change_feed.redis is not None:
+            await change_feed.publish_many(user.id, [_change("updated", contact) for contact in changed])
+    return [
+        _item(contact_id, "updated", found[contact_id]) if contact_id in found else _item(contact_id, "not_found")
+        for contact_id in ids
+    ]
+
+
+async def get_tag_counts(db: AsyncSession, user: User) -> List[ContactTagCount]:
+    user_id = user.id
+    stmt = lambda_stmt(
+        lambda: select(ContactTagCount)
+        .where(ContactTagCount.user_id == user_id, ContactTagCount.count > 0)
+        .order_by(ContactTagCount.tag)
+    )
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+
+async def get_month_counts(db: AsyncSession, user: User) -> dict[int, int]:
+    """Live contacts per birth month: at most 12 rows, however large the address book."""
+    user_id = user.id
+    stmt = lambda_stmt(
+        lambda: select(ContactMonthCount.month, ContactMonthCount.count).where(ContactMonthCount.user_id == user_id)
+    )
+    result = await db.execute(stmt)
+    return dict(result.all())
+
+
+async def reconcile_month_counts(db: AsyncSession, after: UUID | None = None, batch: int = 500) -> tuple[UUID | None, int]:
+    """
+    Recount the per-month counts of up to ``batch`` users with ids after
+    ``after`` from their live contacts and add the differences. The
+    differences come from one statement, so the recount and the stored counts
+    are read from the same snapshot; applying differences rather than the
+    recount keeps increments committed in the meantime. Returns the last user
+    id seen (``None`` when done) and the number of counts corrected.
+    """
+    users = select(User.id).order_by(User.id).limit(batch)
+    if after is not None:
+        users = users.where(User.id > after)
+    user_ids = (await db.execute(users)).scalars().all()
+    if not user_ids:
+        return None, 0
+
+    month = cast(extract("month", Contact.birthday), Integer)
+    counts = union_all(
+        select(Contact.user_id, month.label("month"), func.count().label("count"))
+        .where(Contact.user_id.in_(user_ids), Contact.deleted_at.is_(None))
+        .group_by(Contact.user_id, month),
+        select(ContactMonthCount.user_id, ContactMonthCount.month, -ContactMonthCount.count)
+        .where(ContactMonthCount.user_id.in_(user_ids)),
+    ).subquery()
+    difference = func.sum(counts.c.count)
+    drift = await db.execute(
+        select(counts.c.user_id, counts.c.month, difference)
+        .group_by(counts.c.user_id, counts.c.month)
+        .having(difference != 0)
+    )
+    deltas: dict[UUID, Counter] = {}
+    for user_id, month_number, count in drift.all():
+        deltas.setdefault(user_id, Counter())[int(month_number)] += int(count)
+
+    corrected = 0
+    for user_id, delta in deltas.items():
+        corrected += len(delta)
+        await apply_month_delta(db, user_id, delta)
+    await db.commit()
+    return (user_ids[-1] if len(user_ids) == batch else None), corrected
+
+
+def encode_watermark(updated_at: datetime, contact_id: UUID) -> str:
+    return f"{updated_at.isoformat()}_{contact_id}"
+
+
+def decode_watermark(watermark: str) -> tuple[datetime, UUID]:
+    stamp, _, contact_id = watermark.partition("_")
+    return datetime.fromisoformat(stamp), UUID(contact_id)
+
+
+async def get_contact_changes(
+    db: AsyncSession, user: User, since: tuple[datetime, UUID] | None, limit: int
+) -> dict:
+    """
+    Contacts changed after the ``(updated_at, id)`` cursor ``since``, oldest
+    first, tombstones included; without ``since`` a snapshot of live rows.
+
+    The returned watermark does not move past rows younger than
+    ``CHANGES_SETTLE_SECONDS``: a transaction that commits late with an
+    earlier timestamp is then still picked up by the next sync, at the price
+    of sending recent rows twice.
+    """
+    now = datetime.utcnow()
+    if since is not None and since[0] < now - timedelta(days=config.CHANGES_TOMBSTONE_TTL_DAYS):
+        raise HTTPException(status_code=410, detail="Watermark expired, fetch a new snapshot")
+
+    stmt = select(Contact).where(Contact.user_id == user.id)
+    if since is None:
+        stmt = stmt.where(Contact.deleted_at.is_(None))
+    else:
+        stamp, contact_id = since
+        stmt = stmt.where(
+            or_(Contact.updated_at > stamp, and_(Contact.updated_at == stamp, Contact.id > contact_id))
+        )
+    result = await db.execute(stmt.order_by(Contact.updated_at, Contact.id).limit(limit + 1))
+    rows = result.scalars().all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if has_more:
+        cursor = (rows[-1].updated_at, rows[-1].id)
+    else:
+        settled = now - timedelta(seconds=config.CHANGES_SETTLE_SECONDS)
+        cursor = since or (settled, UUID(int=0))
+        for row in rows:
+            if row.updated_at > settled:
+                break
+            cursor = (row.updated_at, row.id)
+
+    return {
+        "changed": [row for row in rows if row.deleted_at is None],
+        "deleted": [row.id for row in rows if row.deleted_at is not None],
+        "watermark": encode_watermark(*cursor),
+        "has_more": has_more,
+    }
+
+
+async def compact_tombstones(db: AsyncSession, batch: int = 1000) -> int:
+    """
+    Hard-delete tombstones older than the sync TTL, ``batch`` rows per
+    transaction. The only cross-user query on contacts: it scans every
+    partition, then deletes by the full primary key.
+    """
+    older_than = datetime.utcnow() - timedelta(days=config.CHANGES_TOMBSTONE_TTL_DAYS)
+    total = 0
+    while True:
+        expired = select(Contact.id, Contact.user_id).where(Contact.deleted_at < older_than).limit(batch)
+        result = await db.execute(
+            delete(Contact)
+            .where(tuple_(Contact.id, Contact.user_id).in_(expired))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        total += result.rowcount
+        if result.rowcount < batch:
+            return total
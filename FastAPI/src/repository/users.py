@@ -1,32 +1,37 @@
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import func, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from libgravatar import Gravatar
 
 from src.database.db import get_db
-from src.entity.models import User
+from src.entity.models import EmailOpen, User
 from src.schemas.user import UserSchema
 
 
 async def get_user_by_email(email: str, db: AsyncSession = Depends(get_db)):
-    stmt = select(User).filter_by(email=email)
+    stmt = lambda_stmt(lambda: select(User).where(User.email == email))
     user = await db.execute(stmt)
     user = user.scalar_one_or_none()
     return user
 
 
-async def create_user(body: UserSchema, db: AsyncSession = Depends(get_db)):
-    avatar = None
-    try:
-        g = Gravatar(body.email)
-        avatar = g.get_image()
-    except Exception as err:
-        print(err)
-
-    new_user = User(**body.model_dump(), avatar=avatar)
-    db.add(new_user)
+async def create_user(body: UserSchema, db: AsyncSession = Depends(get_db)) -> User | None:
+    """
+    Insert a user in a single round trip. Returns ``None`` when the email is
+    already taken instead of raising ``IntegrityError``.
+    """
+    if db.bind.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    stmt = (
+        insert(User)
+        .values(**body.model_dump())
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
+    )
+    result = await db.execute(stmt)
+    new_user = result.scalar_one_or_none()
     await db.commit()
-    await db.refresh(new_user)
     return new_user
 
 
@@ -48,9 +53,41 @@ async def update_avatar_url(email: str, url: str | None, db: AsyncSession) -> Us
     return user
 
 async def update_user_password(email: str, hashed_password: str, db):
-    query = select(User).where(User.email == email)
+    query = lambda_stmt(lambda: select(User).where(User.email == email))
     result = await db.execute(query)
     user = result.scalar_one_or_none()
     if user:
         user.password = hashed_password
-        await db.commit()
\ No newline at end of file
+        await db.commit()
+
+async def add_email_opens(opens: dict[str, list], db: AsyncSession) -> int:
+    """
+    Add buffered ``{username: [count, first_at, last_at]}`` hits to
+    ``email_opens`` in one upsert. Usernames that no account has are
+    dropped. Returns the number of usernames written.
+    """
+    result = await db.execute(select(User.username).where(User.username.in_(list(opens))).distinct())
+    rows = [
+        {"username": username, "opens": opens[username][0],
+         "first_opened_at": opens[username][1], "last_opened_at": opens[username][2]}
+        for username in result.scalars().all()
+    ]
+    if rows:
+        if db.bind.dialect.name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(EmailOpen.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[EmailOpen.username],
+            set_={"opens": EmailOpen.opens + stmt.excluded.opens, "last_opened_at": stmt.excluded.last_opened_at},
+        )
+        await db.execute(stmt, rows)
+    await db.commit()
+    return len(rows)
+
+
+async def get_email_open_stats(db: AsyncSession, limit: int = 100) -> dict:
+    total = await db.scalar(select(func.coalesce(func.sum(EmailOpen.opens), 0)))
+    result = await db.execute(select(EmailOpen).order_by(EmailOpen.opens.desc()).limit(limit))
+    return {"total_opens": total, "users": result.scalars().all()}
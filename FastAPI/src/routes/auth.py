@@ -1,13 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Request, Response,BackgroundTasks,Form
+from fastapi import APIRouter, HTTPException, Depends, Query, status, Request, Response,BackgroundTasks,Form
 from fastapi.security import OAuth2PasswordRequestForm, HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import HTMLResponse
 
 from src.database.db import get_db
 from src.repository import users as repositories_users
-from src.schemas.user import RequestEmail, ResetPasswordSchema, UserSchema, TokenSchema, UserResponse
+from src.entity.models import Role
+from src.schemas.user import EmailOpenStats, RequestEmail, ResetPasswordSchema, UserSchema, TokenSchema, UserResponse
 from src.services.auth import auth_service
-from src.services.email import send_email, send_reset_password_email
+from src.services.avatars import enrich_user_avatar
+from src.services.email import queue_email, send_email, send_reset_password_email
+from src.services.opens import PIXEL, PIXEL_HEADERS, open_tracker
+from src.services.roles import RoleAccess
 
 router = APIRouter(prefix='/auth', tags=['auth'])
 get_refresh_token = HTTPBearer()
@@ -15,12 +19,13 @@ get_refresh_token = HTTPBearer()
 
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def signup(body: UserSchema,bt: BackgroundTasks, request: Request, db: AsyncSession = Depends(get_db)):
-    exist_user = await repositories_users.get_user_by_email(body.email, db)
-    if exist_user:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Account already exists")
     body.password = auth_service.get_password_hash(body.password)
     new_user = await repositories_users.create_user(body, db)
-    bt.add_task(send_email, new_user.email, new_user.username, str(request.base_url))
+    if new_user is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Account already exists")
+    await auth_service.cache_user(new_user.email, new_user)
+    bt.add_task(enrich_user_avatar, new_user.email)
+    queue_email(bt, send_email, new_user.email, new_user.username, str(request.base_url))
     return new_user
 
 
@@ -35,7 +40,7 @@ async def login(body: OAuth2PasswordRequestForm = Depends(), db: AsyncSession =
     refresh_token = await auth_service.create_refresh_token(data={"sub": user.email})
     await repositories_users.update_token(user, refresh_token, db)
 
-    auth_service.cache_user(user.email, user)
+    await auth_service.cache_user(user.email, user)
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 
@@ -57,11 +62,19 @@ async def refresh_token(credentials: HTTPAuthorizationCredentials = Depends(get_
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 @router.get('/check-email-open/{username}')
-async def request_email(username: str, response: Response, db: AsyncSession = Depends(get_db)):
-    print('--------------------------------')
-    print(f'{username} зберігаємо що він відкрив email в БД')
-    print('--------------------------------')
-    return FileResponse("src/static/open_check.png", media_type="image/png", content_disposition_type="inline")
+async def request_email(username: str):
+    open_tracker.record(username)
+    return Response(PIXEL, media_type="image/png", headers=PIXEL_HEADERS)
+
+
+@router.get(
+    '/email-opens',
+    response_model=EmailOpenStats,
+    dependencies=[Depends(RoleAccess([Role.admin, Role.moderator]))],
+)
+async def email_open_stats(limit: int = Query(100, ge=1, le=1000), db: AsyncSession = Depends(get_db)):
+    """Recorded e-mail opens, most opened first. Counts lag by up to ``EMAIL_OPENS_FLUSH_INTERVAL``."""
+    return await repositories_users.get_email_open_stats(db, limit)
 
 @router.get("/confirmed_email/{token}", response_class=HTMLResponse)
 async def confirm_email(token: str, db: AsyncSession = Depends(get_db)):
@@ -1,20 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime, timedelta
 from uuid import UUID
 
 from src.database.db import get_db
+from src.database.routing import get_read_db, read_your_writes
 from src.repository import contacts as crud
-from src.schemas.contacts import ContactCreate, ContactUpdate, ContactOut
+from src.schemas.contacts import (
+    BatchItem, ContactChanges, ContactCreate, ContactIds, ContactMerge, ContactOut, ContactPatches,
+    ContactStats, ContactSuggestion, ContactTagging, ContactUpdate, DuplicateReport, PhoneLookup, PhoneMatch, TagCount,
+)
+from src.config.config import config
 from src.services.auth import auth_service
+from src.services import dedup, suggest
+from src.services.changes import change_feed, sse
+from src.services.phones import to_e164
 from src.entity.models import User
-from fastapi_limiter.depends import RateLimiter
+from src.services.limiter import RateLimiter
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
 
-@router.post("/", response_model=ContactOut,dependencies=[Depends(RateLimiter(times=5, seconds=60))])
+@router.post(
+    "/",
+    response_model=ContactOut,
+    dependencies=[Depends(RateLimiter(times=5, seconds=60)), Depends(read_your_writes)],
+)
 async def create_contact(
     body: ContactCreate,
     db: AsyncSession = Depends(get_db),
@@ -28,16 +41,191 @@ async def create_contact(
 async def read_contacts(
     skip: int = 0,
     limit: int = 100,
+    tag: List[str] = Query([], description="Only contacts carrying every given tag"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    tags = list(dict.fromkeys(t.strip().lower() for t in tag if t.strip()))
+    return await crud.get_contacts(db=db, user=current_user, skip=skip, limit=limit, tags=tags)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_changes(
+    last_event_id: str | None = Header(None),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    """
+    Server-Sent Events feed of the user's contact changes. Reconnecting
+    clients resume via ``Last-Event-ID``; ``event: reset`` means the missed
+    changes are gone and the client must refetch its contacts.
+    """
+    if change_feed.count >= config.CHANGE_FEED_MAX_CLIENTS:
+        raise HTTPException(status_code=503, detail="Too many change feed subscribers")
+    events = change_feed.subscribe(current_user.id, last_event_id)
+    return StreamingResponse(
+        sse(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/changes", response_model=ContactChanges)
+async def get_contact_changes(
+    since: str | None = None,
+    limit: int = Query(config.CHANGES_PAGE_LIMIT, ge=1, le=config.CHANGES_PAGE_LIMIT),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    """
+    Delta sync: contacts changed or deleted after ``since`` and the watermark
+    to pass next time. Without ``since`` returns a snapshot; keep calling
+    while ``has_more`` is true.
+    """
+    cursor = None
+    if since is not None:
+        try:
+            cursor = crud.decode_watermark(since)
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Invalid watermark")
+    return await crud.get_contact_changes(db=db, user=current_user, since=cursor, limit=limit)
+
+
+@router.get("/tags", response_model=List[TagCount])
+async def read_tag_counts(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    """The user's tags with the number of contacts carrying each."""
+    return await crud.get_tag_counts(db=db, user=current_user)
+
+
+@router.get("/stats", response_model=ContactStats)
+async def read_contact_stats(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    """Contact and birthday counts from the per-month counters: one small read, no scan."""
+    counts = await crud.get_month_counts(db=db, user=current_user)
+    by_month = [max(counts.get(month, 0), 0) for month in range(1, 13)]
+    return {
+        "total": sum(by_month),
+        "birthdays_this_month": by_month[datetime.utcnow().month - 1],
+        "birthdays_by_month": by_month,
+    }
+
+
+@router.get("/suggest", response_model=List[ContactSuggestion])
+async def suggest_contacts(
+    background_tasks: BackgroundTasks,
+    prefix: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(10, ge=1, le=20),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    """Typeahead: contacts whose first name, last name or e-mail starts with ``prefix``, names first."""
+    rows = await suggest.suggest(db, current_user, prefix, limit, background_tasks)
+    return [
+        {"id": contact_id, "first_name": first_name, "last_name": last_name, "email": email}
+        for contact_id, first_name, last_name, email in rows
+    ]
+
+
+@router.post("/tags/add", response_model=List[BatchItem], dependencies=[Depends(read_your_writes)])
+async def add_tags(
+    body: ContactTagging,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(auth_service.get_current_user)
 ):
-    return await crud.get_contacts(db=db, user=current_user, skip=skip, limit=limit)
+    return await crud.tag_contacts(db=db, ids=list(dict.fromkeys(body.ids)), tags=body.tags, user=current_user)
+
+
+@router.post("/tags/remove", response_model=List[BatchItem], dependencies=[Depends(read_your_writes)])
+async def remove_tags(
+    body: ContactTagging,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    return await crud.tag_contacts(
+        db=db, ids=list(dict.fromkeys(body.ids)), tags=body.tags, user=current_user, remove=True
+    )
+
+
+@router.get("/duplicates", response_model=DuplicateReport)
+async def find_duplicates(
+    response: Response,
+    background_tasks: BackgroundTasks,
+    refresh: bool = False,
+    background: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    """
+    Groups of contacts that look like the same person. Books larger than
+    ``DEDUP_SYNC_LIMIT`` (or ``background=true``) are analysed in a
+    background job: the call returns ``202`` with ``status: pending`` and
+    the report once it is ready. Reports are cached for ``DEDUP_RESULT_TTL``
+    seconds; ``refresh=true`` recomputes.
+    """
+    report = None if refresh else await dedup.cached_report(current_user.id)
+    if report is not None:
+        return report
+    if background or await crud.count_contacts(db, current_user) > config.DEDUP_SYNC_LIMIT:
+        if await dedup.claim_job(current_user.id):
+            background_tasks.add_task(dedup.run_job, current_user.id)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"status": "pending"}
+    report = await dedup.analyse(db, current_user)
+    await dedup.store_report(current_user.id, report)
+    return report
+
+
+@router.post("/merge", response_model=ContactOut, dependencies=[Depends(read_your_writes)])
+async def merge_contacts(
+    body: ContactMerge,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    contact = await crud.merge_contacts(
+        db=db, primary_id=body.primary, duplicate_ids=body.duplicates, user=current_user
+    )
+    await dedup.forget_report(current_user.id)
+    return contact
+
+
+@router.get("/by-phone/{number}", response_model=List[ContactOut])
+async def read_contacts_by_phone(
+    number: str,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    """Contacts with this phone number in any format, e.g. for caller ID."""
+    e164 = to_e164(number)
+    if e164 is None:
+        raise HTTPException(status_code=422, detail="Invalid phone number")
+    found = await crud.get_contacts_by_phone(db=db, numbers=[e164], user=current_user)
+    return found[e164]
+
+
+@router.post("/by-phone", response_model=List[PhoneMatch])
+async def batch_read_contacts_by_phone(
+    body: PhoneLookup,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    """Up to ``BATCH_LIMIT`` numbers in one query; numbers that are not valid come back with ``e164: null``."""
+    normalized = [(number, to_e164(number)) for number in body.numbers]
+    numbers = list(dict.fromkeys(e164 for _, e164 in normalized if e164 is not None))
+    found = await crud.get_contacts_by_phone(db=db, numbers=numbers, user=current_user) if numbers else {}
+    return [
+        {"number": number, "e164": e164, "contacts": found.get(e164, [])}
+        for number, e164 in normalized
+    ]
 
 
 @router.get("/{contact_id}", response_model=ContactOut)
 async def read_contact(
     contact_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(auth_service.get_current_user)
 ):
     contact = await crud.get_contact(db=db, contact_id=contact_id, user=current_user)
@@ -46,7 +234,7 @@ async def read_contact(
     return contact
 
 
-@router.put("/{contact_id}", response_model=ContactOut)
+@router.put("/{contact_id}", response_model=ContactOut, dependencies=[Depends(read_your_writes)])
 async def update_contact(
     contact_id: UUID,
     body: ContactUpdate,
@@ -59,7 +247,9 @@ async def update_contact(
     return contact
 
 
-@router.delete("/{contact_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/{contact_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(read_your_writes)]
+)
 async def delete_contact(
     contact_id: UUID,
     db: AsyncSession = Depends(get_db),
@@ -71,10 +261,37 @@ async def delete_contact(
     return
 
 
+@router.post("/batch-get", response_model=List[BatchItem])
+async def batch_get_contacts(
+    body: ContactIds,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    return await crud.batch_get_contacts(db=db, ids=list(dict.fromkeys(body.ids)), user=current_user)
+
+
+@router.post("/batch-update", response_model=List[BatchItem], dependencies=[Depends(read_your_writes)])
+async def batch_update_contacts(
+    body: ContactPatches,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    return await crud.batch_update_contacts(db=db, patches=body.patches, user=current_user)
+
+
+@router.post("/batch-delete", response_model=List[BatchItem], dependencies=[Depends(read_your_writes)])
+async def batch_delete_contacts(
+    body: ContactIds,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    return await crud.batch_delete_contacts(db=db, ids=list(dict.fromkeys(body.ids)), user=current_user)
+
+
 @router.get("/search/", response_model=List[ContactOut])
 async def search_contacts(
     query: str = Query(..., min_length=1),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(auth_service.get_current_user)
 ):
     return await crud.search_contacts(db=db, query=query, user=current_user)
@@ -82,7 +299,7 @@ async def search_contacts(
 
 @router.get("/upcoming_birthdays/", response_model=List[ContactOut])
 async def get_upcoming_birthdays(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(auth_service.get_current_user)
 ):
     today = datetime.today().date()
@@ -1,34 +1,60 @@
-import pickle
-
-import cloudinary
-import cloudinary.uploader
 from fastapi import (
     APIRouter,
+    BackgroundTasks,
     HTTPException,
     Depends,
+    Response,
     status,
     Path,
     Query,
     UploadFile,
     File,
 )
-from fastapi_limiter.depends import RateLimiter
+from src.services.limiter import RateLimiter
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.db import get_db
+from src.database.db import get_db, async_session
 from src.entity.models import User
 from src.schemas.user import UserResponse
 from src.services.auth import auth_service
+from src.services.images import InvalidImageError, prepare_avatar, validate_image
+from src.services.storage import AvatarStorage, get_storage, run_blocking
 from src.config.config import config
 from src.repository import users as repositories_users
 
 router = APIRouter(prefix="/users", tags=["users"])
-cloudinary.config(
-    cloud_name=config.CLD_NAME,
-    api_key=config.CLD_API_KEY,
-    api_secret=config.CLD_API_SECRET,
-    secure=True,
-)
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+async def read_upload(file: UploadFile, max_bytes: int) -> bytes:
+    chunks = []
+    size = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="File is too large",
+            )
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def store_avatar(email: str, data: bytes, storage: AvatarStorage, db: AsyncSession) -> User:
+    avatar = await run_blocking(prepare_avatar, data)
+    url = await storage.save(email, avatar)
+    user = await repositories_users.update_avatar_url(email, url, db)
+    await auth_service.cache_user(user.email, user)
+    return user
+
+
+async def store_avatar_background(email: str, data: bytes, storage: AvatarStorage) -> None:
+    try:
+        async with async_session() as db:
+            await store_avatar(email, data, storage, db)
+    except Exception as err:
+        print(err)
 
 
 @router.get(
@@ -44,19 +70,23 @@ async def get_current_user(user: User = Depends(auth_service.get_current_user)):
     "/avatar",
     response_model=UserResponse,
     dependencies=[Depends(RateLimiter(times=1, seconds=20))],
+    responses={202: {"model": UserResponse}},
 )
-async def get_current_user(
+async def update_avatar(
+    response: Response,
+    bt: BackgroundTasks,
     file: UploadFile = File(),
     user: User = Depends(auth_service.get_current_user),
     db: AsyncSession = Depends(get_db),
+    storage: AvatarStorage = Depends(get_storage),
 ):
-    public_id = f"Web16/{user.email}"
-    res = cloudinary.uploader.upload(file.file, public_id=public_id, owerite=True)
-    print(res)
-    res_url = cloudinary.CloudinaryImage(public_id).build_url(
-        width=250, height=250, crop="fill", version=res.get("version")
-    )
-    user = await repositories_users.update_avatar_url(user.email, res_url, db)
-    auth_service.cache.set(user.email, pickle.dumps(user))
-    auth_service.cache.expire(user.email, 300)
-    return user
\ No newline at end of file
+    data = await read_upload(file, config.AVATAR_MAX_BYTES)
+    try:
+        if len(data) > config.AVATAR_ASYNC_THRESHOLD:
+            await run_blocking(validate_image, data)
+            bt.add_task(store_avatar_background, user.email, data, storage)
+            response.status_code = status.HTTP_202_ACCEPTED
+            return user
+        return await store_avatar(user.email, data, storage, db)
+    except InvalidImageError as err:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(err))
@@ -1,7 +1,13 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from pydantic import AfterValidator, BaseModel, EmailStr, Field, StringConstraints
+from typing import Annotated, List, Optional
 from datetime import date
 from uuid import UUID
+
+TAG_LIMIT = 20
+
+Tag = Annotated[str, StringConstraints(strip_whitespace=True, to_lower=True, min_length=1, max_length=50)]
+Tags = Annotated[List[Tag], AfterValidator(lambda tags: list(dict.fromkeys(tags))), Field(max_length=TAG_LIMIT)]
+
 class ContactBase(BaseModel):
     first_name: str = Field(..., max_length=100)
     last_name: str = Field(..., max_length=100)
@@ -11,14 +17,107 @@ class ContactBase(BaseModel):
     additional_info: Optional[str] = None
 
 class ContactCreate(ContactBase):
-    pass
+    tags: Tags = []
 
 class ContactUpdate(ContactBase):
-    pass
+    # omitted or null keeps the current tags
+    tags: Optional[Tags] = None
 
 class ContactOut(ContactBase):
     id: UUID
+    tags: List[str] = []
 
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+
+BATCH_LIMIT = 1000
+
+
+class ContactPatch(BaseModel):
+    id: UUID
+    first_name: Optional[str] = Field(None, max_length=100)
+    last_name: Optional[str] = Field(None, max_length=100)
+    email: Optional[EmailStr] = None
+    phone: Optional[str] = Field(None, max_length=20)
+    birthday: Optional[date] = None
+    additional_info: Optional[str] = None
+    tags: Optional[Tags] = None
+
+    def changes(self) -> dict:
+        """Fields the client sent; ``null`` only clears ``additional_info``."""
+        changes = self.model_dump(exclude_unset=True, exclude={"id"})
+        return {k: v for k, v in changes.items() if v is not None or k == "additional_info"}
+
+
+class ContactIds(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, max_length=BATCH_LIMIT)
+
+
+class ContactPatches(BaseModel):
+    patches: List[ContactPatch] = Field(..., min_length=1, max_length=BATCH_LIMIT)
+
+
+class BatchItem(BaseModel):
+    id: UUID
+    status: str
+    contact: Optional[ContactOut] = None
+
+
+class ContactChanges(BaseModel):
+    changed: List[ContactOut]
+    deleted: List[UUID]
+    watermark: str
+    has_more: bool
+
+
+class ContactMerge(BaseModel):
+    primary: UUID
+    duplicates: List[UUID] = Field(..., min_length=1, max_length=BATCH_LIMIT)
+
+
+class DuplicateGroup(BaseModel):
+    score: float
+    reasons: List[str]
+    contacts: List[ContactOut]
+
+
+class DuplicateReport(BaseModel):
+    status: str
+    contacts_scanned: int = 0
+    groups: List[DuplicateGroup] = []
+
+
+class ContactTagging(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, max_length=BATCH_LIMIT)
+    tags: Tags = Field(..., min_length=1)
+
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+
+class ContactStats(BaseModel):
+    total: int
+    birthdays_this_month: int
+    # index 0 is January
+    birthdays_by_month: List[int]
+
+
+class ContactSuggestion(BaseModel):
+    id: UUID
+    first_name: str
+    last_name: str
+    email: str
+
+
+class PhoneLookup(BaseModel):
+    numbers: List[Annotated[str, StringConstraints(max_length=32)]] = Field(..., min_length=1, max_length=BATCH_LIMIT)
+
+
+class PhoneMatch(BaseModel):
+    number: str
+    e164: Optional[str] = None
+    contacts: List[ContactOut] = []
@@ -1,3 +1,6 @@
+from datetime import datetime
+from typing import List
+
 from pydantic import BaseModel, EmailStr, Field
 from uuid import UUID
 
@@ -14,7 +17,7 @@ class UserResponse(BaseModel):
     id: UUID
     username: str
     email: EmailStr
-    avatar: str
+    avatar: str | None = None
     role: Role
 
     class Config:
@@ -31,4 +34,18 @@ class RequestEmail(BaseModel):
 
 class ResetPasswordSchema(BaseModel):
     token: str = Field(..., description="Token from email")
-    new_password: str = Field(..., min_length=6, max_length=100)
\ No newline at end of file
+    new_password: str = Field(..., min_length=6, max_length=100)
+
+class EmailOpenOut(BaseModel):
+    username: str
+    opens: int
+    first_opened_at: datetime
+    last_opened_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class EmailOpenStats(BaseModel):
+    total_opens: int
+    users: List[EmailOpenOut]
@@ -1,38 +1,72 @@
+import asyncio
 import pickle
 from datetime import datetime, timedelta
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
-from passlib.context import CryptContext
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
-import redis.asyncio as redis
+from redis.exceptions import RedisError
 
-from src.database.db import get_db
+from src.database.db import get_primary, read_session
 from src.repository import users as repository_users
 from src.config.config import config
+from src.services.breaker import GuardedRedis
+from src.services.metrics import AUTH_DB_FALLBACK, USER_CACHE
+
+# per-user read-your-writes marker, set by ``src.database.routing.stick``; kept
+# next to the user entry so one MGET answers both
+STICKY_PREFIX = "db:sticky:"
 
 
 class Auth:
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
     SECRET_KEY = config.SECRET_KEY_JWT
     ALGORITHM = config.ALGORITHM
 
-    cache = redis.Redis(
-        host=config.REDIS_DOMAIN,
-        port=config.REDIS_PORT,
-        db=0,
-        decode_responses=False,
-        **(
-            {"password": config.REDIS_PASSWORD}
-            if config.REDIS_PASSWORD and config.REDIS_PASSWORD.strip().lower() != "none"
-            else {}
-        )
-    )
+    _pwd_context = None
+    _cache = None
+    _db_fallback = None
+
+    @property
+    def pwd_context(self):
+        if self._pwd_context is None:
+            from passlib.context import CryptContext
+
+            self._pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        return self._pwd_context
+
+    @property
+    def db_fallback(self):
+        """Caps user lookups that go to the database because Redis is unavailable."""
+        if self._db_fallback is None:
+            self._db_fallback = asyncio.Semaphore(config.AUTH_DB_FALLBACK_CONCURRENCY)
+        return self._db_fallback
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            self._cache = GuardedRedis(
+                host=config.REDIS_DOMAIN,
+                port=config.REDIS_PORT,
+                db=0,
+                decode_responses=False,
+                **(
+                    {"password": config.REDIS_PASSWORD}
+                    if config.REDIS_PASSWORD and config.REDIS_PASSWORD.strip().lower() != "none"
+                    else {}
+                )
+            )
+        return self._cache
+
+    @cache.setter
+    def cache(self, client):
+        self._cache = client
+
     async def cache_user(self, email: str, user_obj):
-        await self.cache.set(email, pickle.dumps(user_obj))
-        await self.cache.expire(email, 300)
+        try:
+            await self.cache.set(email, pickle.dumps(user_obj), ex=300)
+        except (RedisError, OSError) as err:
+            print(err)
 
     def verify_password(self, plain_password, hashed_password):
         return self.pwd_context.verify(plain_password, hashed_password)
@@ -73,8 +107,13 @@ class Auth:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate credentials')
 
     async def get_current_user(
-        self, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
+        self, request: Request, token: str = Depends(oauth2_scheme), primary=Depends(get_primary)
     ):
+        """
+        The token's user, from the Redis cache or the database. Also records in
+        ``request.state.read_sticky`` whether the user wrote recently, for
+        ``get_read_db``.
+        """
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -95,20 +134,64 @@ class Auth:
 
         user_hash = str(email)
 
-        user = await self.cache.get(user_hash)
+        try:
+            user, sticky = await self.cache.mget(user_hash, STICKY_PREFIX + user_hash)
+        except (RedisError, OSError) as err:
+            print(err)
+            USER_CACHE.labels("error").inc()
+            # cannot tell whether the user just wrote: keep their reads on the primary
+            request.state.read_sticky = True
+            user = await self._user_from_db_capped(email, primary)
+            if user is None:
+                raise credentials_exception
+            return user
 
+        request.state.read_sticky = sticky is not None
         if user is None:
+            USER_CACHE.labels("miss").inc()
             print("User from database")
-            user = await repository_users.get_user_by_email(email, db)
+            user = await self._user_from_db(email, primary)
             if user is None:
                 raise credentials_exception
-            await self.cache.set(user_hash, pickle.dumps(user))
-            await self.cache.expire(user_hash, 300)
+            await self.cache_user(user_hash, user)
         else:
+            USER_CACHE.labels("hit").inc()
             print("User from cache")
             user = pickle.loads(user)
         return user
 
+    async def _user_from_db(self, email: str, primary):
+        async with read_session(primary) as read_db:
+            user = await repository_users.get_user_by_email(email, read_db)
+            from_replica = "replica" in read_db.info
+        if user is None and from_replica:
+            # the replica may not have caught up with a fresh signup yet
+            async with primary() as db:
+                user = await repository_users.get_user_by_email(email, db)
+        return user
+
+    async def _user_from_db_capped(self, email: str, primary):
+        """
+        The lookup every request needs while Redis is down: at most
+        ``AUTH_DB_FALLBACK_CONCURRENCY`` at once per worker, so the database
+        is not hit by the whole request rate; the rest wait up to
+        ``AUTH_DB_FALLBACK_WAIT`` seconds, then get a 503.
+        """
+        try:
+            await asyncio.wait_for(self.db_fallback.acquire(), config.AUTH_DB_FALLBACK_WAIT)
+        except TimeoutError:
+            AUTH_DB_FALLBACK.labels("shed").inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Service temporarily unavailable",
+                headers={"Retry-After": "1"},
+            )
+        AUTH_DB_FALLBACK.labels("admitted").inc()
+        try:
+            return await self._user_from_db(email, primary)
+        finally:
+            self.db_fallback.release()
+
     def create_email_token(self, data: dict):
         to_encode = data.copy()
         expire = datetime.utcnow() + timedelta(days=1)
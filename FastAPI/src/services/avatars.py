@@ -0,0 +1,81 @@
+import asyncio
+import http.client
+import time
+import urllib.request
+from functools import lru_cache
+
+from libgravatar import Gravatar
+
+from src.config.config import config
+from src.database.db import async_session
+from src.repository import users as repository_users
+from src.services.auth import auth_service
+
+_missing: dict[str, float] = {}
+
+
+@lru_cache(maxsize=10_000)
+def gravatar_url(email: str) -> str | None:
+    try:
+        return Gravatar(email).get_image()
+    except Exception as err:
+        print(err)
+        return None
+
+
+def _is_missing(email: str) -> bool:
+    expires = _missing.get(email)
+    if expires is None:
+        return False
+    if expires < time.monotonic():
+        del _missing[email]
+        return False
+    return True
+
+
+def _remember_missing(email: str) -> None:
+    if len(_missing) >= config.GRAVATAR_NEGATIVE_CACHE_SIZE:
+        _missing.pop(next(iter(_missing)))
+    _missing[email] = time.monotonic() + config.GRAVATAR_NEGATIVE_TTL
+
+
+def _gravatar_exists(url: str) -> bool:
+    request = urllib.request.Request(f"{url}?d=404", method="HEAD")
+    try:
+        with urllib.request.urlopen(request, timeout=config.GRAVATAR_TIMEOUT) as response:
+            return response.status == 200
+    # URLError and socket timeouts are OSErrors; a garbled reply raises HTTPException
+    except (OSError, http.client.HTTPException):
+        return False
+
+
+async def resolve_avatar(email: str) -> str | None:
+    if _is_missing(email):
+        return None
+    url = gravatar_url(email)
+    if url is not None and config.GRAVATAR_VERIFY:
+        if not await asyncio.to_thread(_gravatar_exists, url):
+            url = None
+    if url is None:
+        _remember_missing(email)
+    return url
+
+
+async def enrich_user_avatar(email: str) -> None:
+    """
+    Background step run after signup: resolve the Gravatar URL and store it
+    unless the user has already uploaded an avatar of their own.
+    """
+    try:
+        url = await resolve_avatar(email)
+        if url is None:
+            return
+        async with async_session() as db:
+            user = await repository_users.get_user_by_email(email, db)
+            if user is not None and user.avatar is None:
+                user.avatar = url
+                await db.commit()
+                # signup cached the user without an avatar
+                await auth_service.cache_user(email, user)
+    except Exception as err:
+        print(err)
@@ -0,0 +1,155 @@
+"""
+Circuit breakers and per-call timeouts for Redis and the database.
+
+A breaker opens after ``failure_threshold`` consecutive failures and then
+refuses calls for ``reset_timeout`` seconds, so a dead or stalled dependency
+costs a request nothing instead of a timeout each. After that one probe call
+is let through: success closes the breaker, failure opens it again.
+
+Refusals raise ``CircuitOpenError`` and timeouts ``TimeoutError``; both are
+``OSError`` subclasses, which every Redis call site already catches next to
+``RedisError``.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+from src.config.config import config
+from src.services.metrics import BREAKER_FAILURES, BREAKER_REJECTIONS, BREAKER_STATE
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(ConnectionError):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit breaker is open")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 5.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = 0.0
+        BREAKER_STATE.labels(name).set(0)
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            print(f"{self.name} circuit breaker {self.state} -> {state}")
+            self.state = state
+        BREAKER_STATE.labels(self.name).set(_STATE_VALUES[state])
+
+    @property
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if self.state == CLOSED:
+            return True
+        # one probe at a time; a probe that never reported back is replaced
+        if self.state == OPEN and now - self.opened_at >= self.reset_timeout or (
+            self.state == HALF_OPEN and now - self.probe_started >= self.reset_timeout
+        ):
+            self._set_state(HALF_OPEN)
+            self.probe_started = now
+            return True
+        BREAKER_REJECTIONS.labels(self.name).inc()
+        return False
+
+    def check(self) -> None:
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after)
+
+    def success(self) -> None:
+        self.failures = 0
+        if self.state != CLOSED:
+            self._set_state(CLOSED)
+
+    def failure(self) -> None:
+        BREAKER_FAILURES.labels(self.name).inc()
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+    def reset(self) -> None:
+        self.failures = 0
+        self._set_state(CLOSED)
+
+    @asynccontextmanager
+    async def guard(self, timeout: float | None, failures: tuple = (OSError,)):
+        """Run the block under ``timeout`` seconds, counting ``failures`` and timeouts against the breaker."""
+        self.check()
+        try:
+            async with asyncio.timeout(timeout):
+                yield
+        except failures:
+            self.failure()
+            raise
+        self.success()
+
+
+redis_breaker = CircuitBreaker("redis", config.REDIS_BREAKER_FAILURES, config.REDIS_BREAKER_RESET)
+db_breaker = CircuitBreaker("db", config.DB_BREAKER_FAILURES, config.DB_BREAKER_RESET)
+
+REDIS_FAILURES = (RedisConnectionError, RedisTimeoutError, OSError)
+
+
+class GuardedRedis(redis.Redis):
+    """
+    ``redis.asyncio.Redis`` whose every command runs under ``timeout`` seconds
+    and ``breaker``. Blocking reads (``XREAD BLOCK``) get their block time on
+    top. A pipeline's ``execute`` is guarded as one command.
+    """
+
+    def __init__(self, *args, breaker: CircuitBreaker = redis_breaker, timeout: float | None = None, **kwargs):
+        kwargs.setdefault("socket_connect_timeout", config.REDIS_TIMEOUT)
+        super().__init__(*args, **kwargs)
+        self.breaker = breaker
+        self.timeout = config.REDIS_TIMEOUT if timeout is None else timeout
+
+    async def execute_command(self, *args, **options):
+        timeout = self.timeout
+        for index, arg in enumerate(args[:-1]):
+            if arg in (b"BLOCK", "BLOCK"):
+                block = int(args[index + 1])
+                # BLOCK 0 waits forever
+                timeout = timeout + block / 1000 if block else None
+                break
+        async with self.breaker.guard(timeout, REDIS_FAILURES):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> "GuardedPipeline":
+        return GuardedPipeline(
+            self.connection_pool,
+            self.response_callbacks,
+            transaction,
+            shard_hint,
+            breaker=self.breaker,
+            timeout=self.timeout,
+        )
+
+
+class GuardedPipeline(Pipeline):
+    """Pipeline of a ``GuardedRedis``: the round trip in ``execute`` runs under its timeout and breaker."""
+
+    def __init__(self, *args, breaker: CircuitBreaker, timeout: float, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.breaker = breaker
+        self.timeout = timeout
+
+    async def execute(self, raise_on_error: bool = True):
+        async with self.breaker.guard(self.timeout, REDIS_FAILURES):
+            return await super().execute(raise_on_error)
@@ -0,0 +1,227 @@
+import asyncio
+import json
+from typing import AsyncIterator
+
+from redis.exceptions import RedisError
+
+from src.config.config import config
+
+
+HEARTBEAT = ("", "")
+# entries per XRANGE while replaying a reconnecting client's backlog
+BACKLOG_PAGE = 500
+
+
+def parse_id(event_id: str) -> tuple[int, int]:
+    ms, _, seq = event_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+class Subscriber:
+    __slots__ = ("queue",)
+
+    def __init__(self, size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=size)
+
+    def ping(self) -> None:
+        if self.queue.empty():
+            self.queue.put_nowait(HEARTBEAT)
+
+    def push(self, item) -> None:
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # too slow to keep up: drop what is buffered and tell the client
+            # to resync instead of letting the buffer grow
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class ChangeFeed:
+    """
+    Contact change events kept in a capped Redis stream. Writers ``publish``;
+    each worker runs a single ``XREAD`` loop and fans events out to in-process
+    subscribers by user id, so idle SSE clients cost a small queue each and no
+    Redis connection.
+    """
+
+    def __init__(self, stream: str = "contacts:changes"):
+        self.stream = stream
+        self.redis = None
+        self.subscribers: dict[str, set[Subscriber]] = {}
+        self.count = 0
+        self._tasks: list[asyncio.Task] = []
+
+    async def init(self, redis, stream: str | None = None):
+        self.redis = redis
+        if stream is not None:
+            self.stream = stream
+        self._tasks = [asyncio.create_task(self._listen()), asyncio.create_task(self._heartbeat())]
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for subscribers in self.subscribers.values():
+            for subscriber in subscribers:
+                subscriber.push(None)
+        self.redis = None
+
+    def _fields(self, user_id, op: str, contact_id, data: dict | None) -> dict:
+        payload = json.dumps({"op": op, "id": str(contact_id), "contact": data})
+        return {"user_id": str(user_id), "data": payload}
+
+    async def publish(self, user_id, op: str, contact_id, data: dict | None = None) -> str | None:
+        if self.redis is None:
+            return None
+        try:
+            return await self.redis.xadd(
+                self.stream,
+                self._fields(user_id, op, contact_id, data),
+                maxlen=config.CHANGE_FEED_RETENTION,
+                approximate=True,
+            )
+        except (RedisError, OSError) as err:
+            print(err)
+            return None
+
+    async def publish_many(self, user_id, events: list[tuple[str, object, dict | None]]) -> None:
+        """Publish ``(op, contact_id, data)`` events in one pipelined round trip."""
+        if self.redis is None or not events:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for op, contact_id, data in events:
+                    pipe.xadd(
+                        self.stream,
+                        self._fields(user_id, op, contact_id, data),
+                        maxlen=config.CHANGE_FEED_RETENTION,
+                        approximate=True,
+                    )
+                await pipe.execute()
+        except (RedisError, OSError) as err:
+            print(err)
+
+    async def _listen(self):
+        # resolve "$" once: passing it on every XREAD would skip events
+        # published between two blocking reads
+        last_id = None
+        while True:
+            try:
+                if last_id is None:
+                    newest = await self.redis.xrevrange(self.stream, "+", "-", count=1)
+                    last_id = newest[0][0] if newest else "0-0"
+                entries = await self.redis.xread(
+                    {self.stream: last_id}, block=config.CHANGE_FEED_BLOCK_MS, count=500
+                )
+            except (RedisError, OSError) as err:
+                print(err)
+                await asyncio.sleep(1)
+                continue
+            for _, messages in entries or []:
+                for event_id, fields in messages:
+                    last_id = event_id
+                    self._dispatch(event_id, fields)
+
+    async def _heartbeat(self):
+        # one timer for every subscriber instead of a timeout per connection
+        while True:
+            await asyncio.sleep(config.CHANGE_FEED_HEARTBEAT)
+            for subscribers in self.subscribers.values():
+                for subscriber in subscribers:
+                    subscriber.ping()
+
+    def _dispatch(self, event_id: str, fields: dict):
+        for subscriber in self.subscribers.get(fields["user_id"], ()):
+            subscriber.push((event_id, fields["data"]))
+
+    def _register(self, user_id: str) -> Subscriber:
+        subscriber = Subscriber(config.CHANGE_FEED_QUEUE_SIZE)
+        self.subscribers.setdefault(user_id, set()).add(subscriber)
+        self.count += 1
+        return subscriber
+
+    def _unregister(self, user_id: str, subscriber: Subscriber):
+        subscribers = self.subscribers.get(user_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.subscribers[user_id]
+        self.count -= 1
+
+    async def _backlog(self, user_id: str, last_id: str) -> list[tuple[str, str]] | None:
+        """
+        Events for ``user_id`` after ``last_id``, or ``None`` when the client
+        must refetch instead: its position fell out of the stream, it missed
+        more than ``CHANGE_FEED_QUEUE_SIZE`` events, or catching up would read
+        more than ``CHANGE_FEED_BACKLOG_SCAN`` entries of the shared stream.
+        The stream is read in pages, so a reconnect storm after a restart
+        costs each client a bounded read rather than the whole retention.
+        """
+        oldest = await self.redis.xrange(self.stream, "-", "+", count=1)
+        if oldest and parse_id(oldest[0][0]) > parse_id(last_id):
+            return None
+        events, scanned, start = [], 0, f"({last_id}"
+        while True:
+            page = await self.redis.xrange(self.stream, start, "+", count=BACKLOG_PAGE)
+            events.extend((event_id, fields["data"]) for event_id, fields in page if fields["user_id"] == user_id)
+            scanned += len(page)
+            if len(page) < BACKLOG_PAGE:
+                return events
+            if scanned >= config.CHANGE_FEED_BACKLOG_SCAN or len(events) > config.CHANGE_FEED_QUEUE_SIZE:
+                return None
+            start = f"({page[-1][0]}"
+
+    async def subscribe(self, user_id, last_id: str | None = None) -> AsyncIterator[tuple[str, str] | None]:
+        """
+        Yield ``(event_id, data)`` for the user's changes, starting after
+        ``last_id`` when given, and ``HEARTBEAT`` every
+        ``CHANGE_FEED_HEARTBEAT`` seconds while idle. Yields ``None`` when the
+        client must refetch (its position was trimmed, or it fell behind),
+        then stops.
+        """
+        user_id = str(user_id)
+        subscriber = self._register(user_id)
+        try:
+            seen = (0, 0)
+            if last_id:
+                try:
+                    seen = parse_id(last_id)
+                    backlog = await self._backlog(user_id, last_id)
+                except (ValueError, RedisError, OSError) as err:
+                    print(err)
+                    backlog = None
+                if backlog is None:
+                    yield None
+                    return
+                for event in backlog:
+                    seen = parse_id(event[0])
+                    yield event
+            while True:
+                event = await subscriber.queue.get()
+                if event is None:
+                    yield None
+                    return
+                if event is HEARTBEAT or parse_id(event[0]) > seen:
+                    yield event
+        finally:
+            self._unregister(user_id, subscriber)
+
+
+async def sse(events: AsyncIterator) -> AsyncIterator[str]:
+    """Format ``ChangeFeed.subscribe`` output as Server-Sent Events."""
+    yield "retry: 3000\n\n"
+    async for event in events:
+        if event is None:
+            yield "event: reset\ndata: {}\n\n"
+            return
+        if event is HEARTBEAT:
+            yield ": ping\n\n"
+            continue
+        event_id, data = event
+        yield f"id: {event_id}\nevent: contact\ndata: {data}\n\n"
+
+
+change_feed = ChangeFeed()
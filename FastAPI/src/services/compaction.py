@@ -0,0 +1,21 @@
+from src.repository.contacts import compact_tombstones
+from src.services.jobs import PeriodicJob
+
+
+class TombstoneCompactor(PeriodicJob):
+    """
+    Purges contact tombstones older than ``CHANGES_TOMBSTONE_TTL_DAYS`` every
+    ``interval`` seconds. With ``redis`` set, a lock lets only one worker run
+    per interval.
+    """
+
+    def __init__(self, session_maker, interval: float = 3600.0, redis=None):
+        super().__init__("contacts:compaction", interval, self.compact, redis)
+        self.session_maker = session_maker
+
+    async def compact(self) -> int:
+        async with self.session_maker() as db:
+            purged = await compact_tombstones(db)
+        if purged:
+            print(f"Compacted {purged} contact tombstones")
+        return purged
@@ -0,0 +1,237 @@
+"""
+Duplicate detection for a user's contacts.
+
+Contacts are grouped into blocks by normalized phone, e-mail local part and a
+phonetic key of the name; only pairs sharing a block are scored, so the work
+grows with the block sizes rather than with the square of the address book.
+Blocks larger than ``DEDUP_MAX_BLOCK`` (a shared switchboard number, a very
+common surname) carry no signal and are skipped. Scored pairs above
+``DEDUP_THRESHOLD`` are joined into groups with a union-find.
+"""
+import asyncio
+import json
+import re
+from collections import defaultdict
+from functools import lru_cache
+from itertools import combinations
+from uuid import UUID
+
+from redis.exceptions import RedisError
+
+from src.config.config import config
+from src.database.db import async_session
+from src.entity.models import User
+from src.repository import contacts as repository_contacts
+from src.schemas.contacts import BATCH_LIMIT, ContactOut
+from src.services.auth import auth_service
+
+REPORT_PREFIX = "dedup:report:"
+JOB_PREFIX = "dedup:job:"
+
+_SOUNDEX = str.maketrans("bfpvcgjkqsxzdtlmnr", "111122222222334556")
+_NON_DIGITS = re.compile(r"\D+")
+
+
+def normalize_phone(phone: str) -> str:
+    digits = _NON_DIGITS.sub("", phone)
+    # compare the subscriber part so "+380 67..." and "067..." meet
+    return digits[-9:] if len(digits) >= 7 else ""
+
+
+def email_local(email: str) -> str:
+    local = email.lower().partition("@")[0]
+    return local.partition("+")[0].replace(".", "")
+
+
+@lru_cache(maxsize=65536)
+def soundex(word: str) -> str:
+    word = "".join(ch for ch in word.lower() if ch.isalpha())
+    if not word or not word.isascii():
+        return word
+    codes = word.translate(_SOUNDEX)
+    key, last = word[0], codes[0]
+    for ch, code in zip(word[1:], codes[1:]):
+        if code.isdigit() and code != last:
+            key += code
+            if len(key) == 4:
+                break
+        if ch not in "hw":
+            last = code
+    return key.ljust(4, "0")
+
+
+def trigrams(text: str) -> frozenset:
+    text = f"  {' '.join(text.lower().split())} "
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+class Candidate:
+    __slots__ = ("id", "phone", "email", "name", "birthday", "full_name", "_grams")
+
+    def __init__(self, contact_id, first_name, last_name, email, phone, birthday):
+        self.id = contact_id
+        self.phone = normalize_phone(phone)
+        self.email = email_local(email)
+        self.name = soundex(last_name) + first_name[:1].lower()
+        self.birthday = birthday
+        self.full_name = f"{first_name} {last_name}"
+        self._grams = None
+
+    @property
+    def grams(self) -> frozenset:
+        # built on first use: most contacts are never part of a scored pair
+        if self._grams is None:
+            self._grams = trigrams(self.full_name)
+        return self._grams
+
+    def keys(self):
+        if self.phone:
+            yield "p" + self.phone
+        if self.email:
+            yield "e" + self.email
+        if self.name:
+            yield "n" + self.name
+
+
+def score(a: Candidate, b: Candidate) -> tuple[float, list[str]]:
+    """Match score in ``[0, 1]`` and the fields that agree."""
+    total, reasons = 0.0, []
+    if a.phone and a.phone == b.phone:
+        total += 0.5
+        reasons.append("phone")
+    if a.email and a.email == b.email:
+        total += 0.4
+        reasons.append("email")
+    union = len(a.grams | b.grams)
+    name = len(a.grams & b.grams) / union if union else 0.0
+    total += 0.4 * name
+    if name >= 0.8:
+        reasons.append("name")
+    if a.birthday == b.birthday:
+        total += 0.2
+        reasons.append("birthday")
+    return min(total, 1.0), reasons
+
+
+def candidate_pairs(candidates: list[Candidate], max_block: int) -> set[tuple[int, int]]:
+    blocks = defaultdict(list)
+    for index, candidate in enumerate(candidates):
+        for key in candidate.keys():
+            blocks[key].append(index)
+    pairs = set()
+    for members in blocks.values():
+        if 1 < len(members) <= max_block:
+            pairs.update(combinations(members, 2))
+    return pairs
+
+
+def find_duplicates(rows, threshold: float = 0.6, max_block: int = 50) -> list[dict]:
+    """
+    Group ``(id, first_name, last_name, email, phone, birthday)`` rows into
+    likely duplicates, best match first: ``{"ids", "score", "reasons"}``.
+    """
+    candidates = [Candidate(*row) for row in rows]
+    parent = list(range(len(candidates)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    matches = []
+    for i, j in candidate_pairs(candidates, max_block):
+        value, reasons = score(candidates[i], candidates[j])
+        if value >= threshold:
+            matches.append((i, value, reasons))
+            parent[find(i)] = find(j)
+
+    groups = {}
+    for i, value, reasons in matches:
+        group = groups.setdefault(find(i), {"score": 0.0, "reasons": set()})
+        group["score"] = max(group["score"], value)
+        group["reasons"].update(reasons)
+    members = defaultdict(list)
+    for i in range(len(candidates)):
+        root = find(i)
+        if root in groups:
+            members[root].append(candidates[i].id)
+    result = [
+        {"ids": members[root], "score": round(group["score"], 3), "reasons": sorted(group["reasons"])}
+        for root, group in groups.items()
+    ]
+    result.sort(key=lambda group: (-group["score"], -len(group["ids"])))
+    return result
+
+
+async def analyse(db, user: User) -> dict:
+    rows = [tuple(row) for row in await repository_contacts.get_dedup_rows(db, user)]
+    # CPU-bound: keep it off the event loop
+    groups = await asyncio.to_thread(find_duplicates, rows, config.DEDUP_THRESHOLD, config.DEDUP_MAX_BLOCK)
+    groups = groups[:config.DEDUP_MAX_GROUPS]
+    ids = [contact_id for group in groups for contact_id in group["ids"]]
+    found = {}
+    for start in range(0, len(ids), BATCH_LIMIT):
+        found.update(await repository_contacts.get_contacts_by_ids(db, ids[start:start + BATCH_LIMIT], user))
+    return {
+        "status": "done",
+        "contacts_scanned": len(rows),
+        "groups": [
+            {
+                "score": group["score"],
+                "reasons": group["reasons"],
+                "contacts": [
+                    ContactOut.model_validate(found[contact_id], from_attributes=True).model_dump(mode="json")
+                    for contact_id in group["ids"] if contact_id in found
+                ],
+            }
+            for group in groups
+        ],
+    }
+
+
+async def cached_report(user_id) -> dict | None:
+    try:
+        report = await auth_service.cache.get(REPORT_PREFIX + str(user_id))
+    except (RedisError, OSError) as err:
+        print(err)
+        return None
+    return json.loads(report) if report else None
+
+
+async def store_report(user_id, report: dict) -> None:
+    try:
+        await auth_service.cache.set(REPORT_PREFIX + str(user_id), json.dumps(report), ex=config.DEDUP_RESULT_TTL)
+    except (RedisError, OSError) as err:
+        print(err)
+
+
+async def forget_report(user_id) -> None:
+    try:
+        await auth_service.cache.delete(REPORT_PREFIX + str(user_id))
+    except (RedisError, OSError) as err:
+        print(err)
+
+
+async def claim_job(user_id) -> bool:
+    """``False`` while a job for the user is already running."""
+    try:
+        return bool(await auth_service.cache.set(JOB_PREFIX + str(user_id), 1, nx=True, ex=config.DEDUP_JOB_TIMEOUT))
+    except (RedisError, OSError) as err:
+        print(err)
+        return True
+
+
+async def run_job(user_id: UUID) -> None:
+    """Background analysis for large address books; the report lands in the cache."""
+    try:
+        async with async_session() as db:
+            report = await analyse(db, User(id=user_id))
+        await store_report(user_id, report)
+    except Exception as err:
+        print(err)
+    finally:
+        try:
+            await auth_service.cache.delete(JOB_PREFIX + str(user_id))
+        except (RedisError, OSError) as err:
+            print(err)
@@ -1,28 +1,40 @@
+from functools import lru_cache
 from pathlib import Path
+from typing import Awaitable, Callable
 
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
+from fastapi import BackgroundTasks
 from pydantic import EmailStr
 
 from src.services.auth import auth_service
 from src.config.config import config
+from src.services.metrics import EMAIL_QUEUE
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=config.MAIL_USERNAME,
-    MAIL_PASSWORD=config.MAIL_PASSWORD,
-    MAIL_FROM=config.MAIL_USERNAME,
-    MAIL_PORT=config.MAIL_PORT,
-    MAIL_SERVER=config.MAIL_SERVER,
-    MAIL_FROM_NAME="Contact Systems",
-    MAIL_STARTTLS=False,
-    MAIL_SSL_TLS=True,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True,
-    TEMPLATE_FOLDER=Path(__file__).parent / 'templates',
-)
+
+@lru_cache
+def get_mail():
+    """Build the mail client on first send; fastapi_mail is slow to import."""
+    from fastapi_mail import FastMail, ConnectionConfig
+
+    conf = ConnectionConfig(
+        MAIL_USERNAME=config.MAIL_USERNAME,
+        MAIL_PASSWORD=config.MAIL_PASSWORD,
+        MAIL_FROM=config.MAIL_USERNAME,
+        MAIL_PORT=config.MAIL_PORT,
+        MAIL_SERVER=config.MAIL_SERVER,
+        MAIL_FROM_NAME="Contact Systems",
+        MAIL_STARTTLS=False,
+        MAIL_SSL_TLS=True,
+        USE_CREDENTIALS=True,
+        VALIDATE_CERTS=True,
+        TEMPLATE_FOLDER=Path(__file__).parent / 'templates',
+    )
+    return FastMail(conf)
 
 
 async def send_email(email: EmailStr, username: str, host: str):
+    from fastapi_mail import MessageSchema, MessageType
+    from fastapi_mail.errors import ConnectionErrors
+
     try:
         token_verification = auth_service.create_email_token({"sub": email})
         message = MessageSchema(
@@ -32,12 +44,13 @@ async def send_email(email: EmailStr, username: str, host: str):
             subtype=MessageType.html
         )
 
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name="verify_email.html")
+        await get_mail().send_message(message, template_name="verify_email.html")
     except ConnectionErrors as err:
         print(err)
 
 async def send_reset_password_email(email: str, username: str, host: str):
+    from fastapi_mail import MessageSchema, MessageType
+
     token = auth_service.create_password_reset_token({"sub": email})
     message = MessageSchema(
         subject="Reset Your Password",
@@ -45,5 +58,16 @@ async def send_reset_password_email(email: str, username: str, host: str):
         template_body={"host": host, "username": username, "token": token},
         subtype=MessageType.html,
     )
-    fm = FastMail(conf)
-    await fm.send_message(message, template_name="reset_password.html")
\ No newline at end of file
+    await get_mail().send_message(message, template_name="reset_password.html")
+
+
+async def _send_queued(send: Callable[..., Awaitable], *args):
+    try:
+        await send(*args)
+    finally:
+        EMAIL_QUEUE.dec()
+
+
+def queue_email(bt: BackgroundTasks, send: Callable[..., Awaitable], *args) -> None:
+    EMAIL_QUEUE.inc()
+    bt.add_task(_send_queued, send, *args)
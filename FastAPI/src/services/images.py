@@ -0,0 +1,53 @@
+from io import BytesIO
+
+ALLOWED_FORMATS = {"PNG", "JPEG", "GIF", "WEBP"}
+AVATAR_SIZE = (250, 250)
+
+
+class InvalidImageError(ValueError):
+    pass
+
+
+def _decode_errors() -> tuple:
+    from PIL import Image, UnidentifiedImageError
+
+    return UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError
+
+
+def validate_image(data: bytes) -> str:
+    """
+    Check that ``data`` is an image in one of the allowed formats without
+    decoding its pixels. Returns the detected format.
+    """
+    from PIL import Image
+
+    try:
+        with Image.open(BytesIO(data)) as probe:
+            image_format = probe.format
+            probe.verify()
+    except _decode_errors() as err:
+        raise InvalidImageError("File is not a valid image") from err
+    if image_format not in ALLOWED_FORMATS:
+        raise InvalidImageError(f"Unsupported image format: {image_format}")
+    return image_format
+
+
+def prepare_avatar(data: bytes, size: tuple[int, int] = AVATAR_SIZE) -> bytes:
+    """
+    Validate an uploaded image and downscale it to the avatar size as JPEG.
+
+    CPU bound, so callers on the event loop should hand it to an executor.
+    """
+    from PIL import Image, ImageOps
+
+    validate_image(data)
+    try:
+        with Image.open(BytesIO(data)) as image:
+            image.draft("RGB", (size[0] * 2, size[1] * 2))
+            image = ImageOps.exif_transpose(image)
+            image = ImageOps.fit(image.convert("RGB"), size, Image.Resampling.LANCZOS)
+            out = BytesIO()
+            image.save(out, format="JPEG", quality=85, optimize=True)
+            return out.getvalue()
+    except _decode_errors() as err:
+        raise InvalidImageError("File is not a valid image") from err
@@ -0,0 +1,55 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+
+
+class PeriodicJob:
+    """
+    Awaits ``tick()`` every ``interval`` seconds in a background task. With
+    ``redis`` set, a lock on ``lock_key`` lets only one worker run per
+    interval; without Redis, or when it fails, every worker runs.
+    """
+
+    def __init__(self, lock_key: str, interval: float, tick: Callable[[], Awaitable[int]], redis=None):
+        self.lock_key = lock_key
+        self.interval = interval
+        self.tick = tick
+        self.redis = redis
+        self._task = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _acquire(self) -> bool:
+        if self.redis is None:
+            return True
+        try:
+            # expires a little before the next tick, so a dead holder cannot skip it
+            return bool(await self.redis.set(self.lock_key, "1", nx=True, px=int(self.interval * 900)))
+        except (RedisError, OSError) as err:
+            print(err)
+            return True
+
+    async def run_once(self) -> int:
+        if not await self._acquire():
+            return 0
+        return await self.tick()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except (SQLAlchemyError, OSError) as err:
+                print(err)
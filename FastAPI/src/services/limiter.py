@@ -0,0 +1,167 @@
+import math
+import time
+import uuid
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from redis.exceptions import NoScriptError, RedisError
+
+from src.config.config import config
+from src.entity.models import User
+from src.services.auth import auth_service
+from src.services.metrics import RATE_LIMIT_REJECTIONS
+
+# Sliding window over a sorted set of grant timestamps (ms, server clock).
+# Grants up to ARGV[3] tokens at once so callers can lease a local batch.
+# Returns {granted, retry_after_ms}.
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local want = tonumber(ARGV[3])
+local token = ARGV[4]
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+local used = redis.call('ZCARD', key)
+local granted = math.min(want, limit - used)
+if granted <= 0 then
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    return {0, tonumber(oldest[2]) + window - now}
+end
+for i = 1, granted do
+    redis.call('ZADD', key, now, token .. ':' .. i)
+end
+redis.call('PEXPIRE', key, window)
+return {granted, 0}
+"""
+
+
+class Limiter:
+    prefix = "ratelimit"
+
+    def __init__(self):
+        self.redis = None
+        self.sha = None
+        self.fail_open = config.RATE_LIMIT_FAIL_OPEN
+        self.leases: dict[str, tuple[int, float]] = {}
+        self._next_prune = 0.0
+
+    async def init(self, redis, prefix: str = "ratelimit", fail_open: bool | None = None):
+        self.redis = redis
+        self.prefix = prefix
+        if fail_open is not None:
+            self.fail_open = fail_open
+        try:
+            self.sha = await redis.script_load(SLIDING_WINDOW_LUA)
+        except (RedisError, OSError) as err:
+            print(err)
+
+    async def close(self):
+        self.redis = None
+        self.sha = None
+        self.leases.clear()
+
+    async def _eval(self, key: str, milliseconds: int, times: int, want: int) -> tuple[int, int]:
+        args = (1, key, milliseconds, times, want, uuid.uuid4().hex)
+        if self.sha is None:
+            self.sha = await self.redis.script_load(SLIDING_WINDOW_LUA)
+        try:
+            granted, retry_after = await self.redis.evalsha(self.sha, *args)
+        except NoScriptError:
+            self.sha = await self.redis.script_load(SLIDING_WINDOW_LUA)
+            granted, retry_after = await self.redis.evalsha(self.sha, *args)
+        return int(granted), int(retry_after)
+
+    def _prune(self, now: float) -> None:
+        """
+        Drop expired leases of keys that were not hit again. Runs at most once
+        per ``RATE_LIMIT_LEASE_MS``, the longest a lease lives, so only keys
+        leased within the last two of those periods are kept.
+        """
+        if now < self._next_prune:
+            return
+        self._next_prune = now + config.RATE_LIMIT_LEASE_MS / 1000
+        for key in [key for key, (_, expires) in self.leases.items() if expires < now]:
+            del self.leases[key]
+
+    def _take_lease(self, key: str) -> bool:
+        lease = self.leases.get(key)
+        if lease is None:
+            return False
+        tokens, expires = lease
+        if expires < time.monotonic():
+            del self.leases[key]
+            return False
+        if tokens <= 1:
+            del self.leases[key]
+        else:
+            self.leases[key] = (tokens - 1, expires)
+        return True
+
+    async def hit(self, key: str, times: int, milliseconds: int, lease: int = 0) -> int:
+        """
+        Consume one token for ``key``. Returns 0 when allowed, otherwise the
+        number of milliseconds until the next token frees up.
+
+        With ``lease`` > 1 a batch of tokens is reserved in Redis and spent
+        locally, so a hot key only reaches Redis once per batch. Leased tokens
+        count against the window even if they go unused.
+        """
+        if lease > 1 and self._take_lease(key):
+            return 0
+        if self.redis is None:
+            raise RedisError("Rate limiter is not initialized")
+        want = min(lease, times) if lease > 1 else 1
+        granted, retry_after = await self._eval(key, milliseconds, times, want)
+        if granted == 0:
+            return max(retry_after, 1)
+        if granted > 1:
+            now = time.monotonic()
+            self._prune(now)
+            self.leases[key] = (granted - 1, now + min(milliseconds, config.RATE_LIMIT_LEASE_MS) / 1000)
+        return 0
+
+
+limiter = Limiter()
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        times: int = 1,
+        milliseconds: int = 0,
+        seconds: int = 0,
+        minutes: int = 0,
+        hours: int = 0,
+        lease: int = 0,
+    ):
+        self.times = times
+        self.milliseconds = milliseconds + 1000 * seconds + 60000 * minutes + 3600000 * hours
+        self.lease = lease
+
+    async def __call__(
+        self,
+        request: Request,
+        response: Response,
+        user: User = Depends(auth_service.get_current_user),
+    ):
+        route = request.scope.get("route")
+        path = route.path if route is not None else request.url.path
+        key = f"{limiter.prefix}:{user.id}:{request.method}:{path}"
+        try:
+            retry_after = await limiter.hit(key, self.times, self.milliseconds, self.lease)
+        except (RedisError, OSError) as err:
+            print(err)
+            if limiter.fail_open:
+                return
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Rate limiter unavailable",
+            )
+        if retry_after:
+            RATE_LIMIT_REJECTIONS.labels(path).inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too Many Requests",
+                headers={"Retry-After": str(math.ceil(retry_after / 1000))},
+            )
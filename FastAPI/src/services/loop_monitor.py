@@ -0,0 +1,92 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from src.services.metrics import BLOCKING_CALLS, EVENT_LOOP_LAG
+
+
+def route_of(frame) -> str:
+    """
+    Walk a stack from the innermost frame outwards and return the route of
+    the first ASGI ``scope`` found in the frame locals.
+    """
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and scope.get("type") == "http":
+            route = scope.get("route")
+            return getattr(route, "path", None) or scope.get("path", "unknown")
+        frame = frame.f_back
+    return "unknown"
+
+
+class LoopMonitor:
+    """
+    Samples event-loop lag into the ``event_loop_lag_seconds`` histogram.
+
+    With ``debug`` on, a watchdog thread also checks that the sampler keeps
+    ticking. When the loop stalls for longer than ``threshold`` it captures
+    the loop thread's stack, so the blocking callback and the route that
+    scheduled it can be identified.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.1, debug: bool = False):
+        self.interval = interval
+        self.threshold = threshold
+        self.debug = debug
+        self.reports: deque[dict] = deque(maxlen=100)
+        self._task = None
+        self._watchdog = None
+        self._stopped = threading.Event()
+        self._heartbeat = time.monotonic()
+        self._loop_thread = None
+
+    def start(self) -> None:
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._sample())
+        if self.debug:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+
+    async def _sample(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            EVENT_LOOP_LAG.observe(max(0.0, now - started - self.interval))
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stopped.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled < self.threshold or reported == heartbeat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            reported = heartbeat
+            self._report(frame, stalled)
+
+    def _report(self, frame, stalled: float) -> None:
+        route = route_of(frame)
+        stack = "".join(traceback.format_stack(frame))
+        BLOCKING_CALLS.labels(route).inc()
+        self.reports.append({"route": route, "stalled": stalled, "stack": stack})
+        print(f"Event loop blocked for {stalled * 1000:.0f}ms+ in {route}:\n{stack}")
@@ -0,0 +1,131 @@
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status", ["method", "route", "status"]
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+USER_CACHE = Counter("user_cache_requests_total", "Redis user cache lookups", ["result"])
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total", "Requests rejected by the rate limiter", ["route"]
+)
+EMAIL_QUEUE = Gauge(
+    "email_queue_depth", "E-mails queued in background tasks and not yet sent", multiprocess_mode="livesum"
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between a scheduled and actual event-loop wakeup",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+BLOCKING_CALLS = Counter(
+    "event_loop_blocking_calls_total", "Event-loop stalls caught by the watchdog", ["route"]
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "Open DB connections held by the pool", multiprocess_mode="livesum"
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "DB connections currently checked out", multiprocess_mode="livesum"
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured DB pool size", multiprocess_mode="livesum")
+BREAKER_STATE = Gauge(
+    "circuit_breaker_state", "Circuit breaker state: 0 closed, 1 half-open, 2 open", ["name"],
+    multiprocess_mode="livemax",
+)
+BREAKER_FAILURES = Counter("circuit_breaker_failures_total", "Failed or timed-out dependency calls", ["name"])
+BREAKER_REJECTIONS = Counter(
+    "circuit_breaker_rejections_total", "Calls refused without trying while a breaker was open", ["name"]
+)
+AUTH_DB_FALLBACK = Counter(
+    "auth_db_fallback_total", "User lookups sent to the database while Redis was unavailable", ["result"]
+)
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+def render() -> bytes:
+    """
+    Render all metrics. When ``PROMETHEUS_MULTIPROC_DIR`` is set every worker
+    writes its samples there and the values are aggregated across workers.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the multiprocess directory on exit."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def instrument_pool(engine) -> None:
+    pool = engine.sync_engine.pool
+    if hasattr(pool, "size"):
+        DB_POOL_SIZE.set(pool.size())
+
+    @event.listens_for(pool, "connect")
+    def _connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTIONS.inc()
+
+    @event.listens_for(pool, "close")
+    def _close(dbapi_connection, connection_record):
+        DB_POOL_CONNECTIONS.dec()
+
+    @event.listens_for(pool, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(pool, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request counts and latency per route
+    template, so path parameters do not blow up label cardinality.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            LATENCY.labels(method, path).observe(time.perf_counter() - started)
+            REQUESTS.labels(method, path, str(status_code)).inc()
@@ -0,0 +1,82 @@
+import asyncio
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.config.config import config
+from src.repository import users as repository_users
+
+PIXEL = (Path(__file__).resolve().parent.parent / "static" / "open_check.png").read_bytes()
+# the URL is per user, so a client or mail proxy that keeps the image counts
+# one open per recipient instead of one per view
+PIXEL_HEADERS = {"Cache-Control": "private, max-age=31536000, immutable"}
+
+
+class OpenTracker:
+    """
+    Counts e-mail tracking-pixel hits in memory and writes them to
+    ``email_opens`` every ``EMAIL_OPENS_FLUSH_INTERVAL`` seconds in one
+    batched upsert, so a hit costs a dict update instead of a DB round trip.
+    Each worker keeps its own buffer; the upsert adds to the stored counts.
+    """
+
+    def __init__(self):
+        self.session_maker = None
+        self.buffer: dict[str, list] = {}
+        self.dropped = 0
+        self._task = None
+
+    def init(self, session_maker) -> None:
+        self.session_maker = session_maker
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def record(self, username: str, count: int = 1, first_at: datetime | None = None, last_at: datetime | None = None):
+        now = datetime.utcnow()
+        first_at, last_at = first_at or now, last_at or now
+        entry = self.buffer.get(username)
+        if entry is None:
+            if len(self.buffer) >= config.EMAIL_OPENS_MAX_KEYS:
+                # bounded memory under a flood of made-up usernames
+                self.dropped += count
+                return
+            self.buffer[username] = [count, first_at, last_at]
+            return
+        entry[0] += count
+        entry[1] = min(entry[1], first_at)
+        entry[2] = max(entry[2], last_at)
+
+    async def flush(self) -> int:
+        if not self.buffer or self.session_maker is None:
+            return 0
+        opens, self.buffer = self.buffer, {}
+        if self.dropped:
+            print(f"Dropped {self.dropped} e-mail opens: buffer full")
+            self.dropped = 0
+        try:
+            async with self.session_maker() as db:
+                return await repository_users.add_email_opens(opens, db)
+        except (SQLAlchemyError, OSError) as err:
+            print(err)
+            # keep the hits for the next flush
+            for username, (count, first_at, last_at) in opens.items():
+                self.record(username, count, first_at, last_at)
+            return 0
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(config.EMAIL_OPENS_FLUSH_INTERVAL)
+            await self.flush()
+
+
+open_tracker = OpenTracker()
@@ -0,0 +1,53 @@
+"""
+Phone numbers in E.164 (``+380671234567``), the form ``contacts.phone_e164``
+is indexed and looked up by.
+
+Numbers without an international prefix (``+`` or ``00``) are national
+numbers of ``PHONE_DEFAULT_COUNTRY_CODE``: the trunk ``0`` is dropped and the
+country code added, unless the digits already start with it and are too long
+to be a national number. There is no per-country numbering plan; anything of
+8 to 15 digits is accepted.
+"""
+import re
+
+from src.config.config import config
+
+_NON_DIGITS = re.compile(r"\D+")
+MIN_DIGITS = 8
+MAX_DIGITS = 15
+# longer digit strings that start with the country code already carry it
+NATIONAL_MAX_DIGITS = 10
+
+
+def to_e164(phone: str | None, country_code: str | None = None) -> str | None:
+    """``phone`` in E.164, or ``None`` when it cannot be one."""
+    if not phone:
+        return None
+    country_code = country_code or config.PHONE_DEFAULT_COUNTRY_CODE
+    digits = _NON_DIGITS.sub("", phone)
+    if phone.lstrip().startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif not (digits.startswith(country_code) and len(digits) > NATIONAL_MAX_DIGITS):
+        digits = country_code + digits.removeprefix("0")
+    if not MIN_DIGITS <= len(digits) <= MAX_DIGITS or digits.startswith("0"):
+        return None
+    return "+" + digits
+
+
+def e164_sql(column: str = "phone", country_code: str | None = None) -> str:
+    """``to_e164`` as a PostgreSQL expression, for backfilling in a migration."""
+    country_code = country_code or config.PHONE_DEFAULT_COUNTRY_CODE
+    digits = f"regexp_replace({column}, '[^0-9]', '', 'g')"
+    number = (
+        f"(CASE WHEN ltrim({column}) LIKE '+%' THEN {digits} "
+        f"WHEN {digits} LIKE '00%' THEN substr({digits}, 3) "
+        f"WHEN {digits} LIKE '{country_code}%' AND length({digits}) > {NATIONAL_MAX_DIGITS} THEN {digits} "
+        f"WHEN {digits} LIKE '0%' THEN '{country_code}' || substr({digits}, 2) "
+        f"ELSE '{country_code}' || {digits} END)"
+    )
+    return (
+        f"CASE WHEN length({number}) BETWEEN {MIN_DIGITS} AND {MAX_DIGITS} "
+        f"AND {number} NOT LIKE '0%' THEN '+' || {number} END"
+    )
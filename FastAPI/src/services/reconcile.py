@@ -0,0 +1,28 @@
+from src.repository.contacts import reconcile_month_counts
+from src.services.jobs import PeriodicJob
+
+
+class ContactCountReconciler(PeriodicJob):
+    """
+    Recounts every user's per-month contact counts every ``interval`` seconds,
+    ``batch`` users per transaction, correcting drift the incremental updates
+    missed (writes from before the counters existed, failed deploys, manual
+    SQL). With ``redis`` set, a lock lets only one worker run per interval.
+    """
+
+    def __init__(self, session_maker, interval: float = 21600.0, redis=None, batch: int = 500):
+        super().__init__("contacts:reconcile-counts", interval, self.reconcile, redis)
+        self.session_maker = session_maker
+        self.batch = batch
+
+    async def reconcile(self) -> int:
+        after, corrected = None, 0
+        while True:
+            async with self.session_maker() as db:
+                after, fixed = await reconcile_month_counts(db, after, self.batch)
+            corrected += fixed
+            if after is None:
+                break
+        if corrected:
+            print(f"Corrected {corrected} contact counts")
+        return corrected
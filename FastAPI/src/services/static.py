@@ -0,0 +1,144 @@
+"""
+Static assets served from precompressed variants, and response compression
+for everything else.
+
+``compress_static.py`` writes ``name.gz`` (and ``name.br`` when ``brotli`` is
+installed) next to each text asset at build time; ``PrecompressedStaticFiles``
+picks the best variant the client accepts, so nothing is compressed per
+request.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+from functools import lru_cache
+from importlib.util import find_spec
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+# preferred first
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE = {".css", ".js", ".mjs", ".html", ".svg", ".json", ".txt", ".xml", ".map", ".ico", ".webmanifest"}
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, max-age=0, must-revalidate"
+
+
+def accepted_encodings(header: str) -> set[str]:
+    accepted = set()
+    for item in header.split(","):
+        name, *params = item.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip() and quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+@lru_cache(maxsize=1024)
+def asset_version(path: str, mtime: float) -> str:
+    with open(STATIC_DIR / path, "rb") as file:
+        return hashlib.md5(file.read()).hexdigest()[:12]
+
+
+def static_url(path: str) -> str:
+    """``/static/<path>?v=<content hash>``: safe to cache forever, changes with the file."""
+    return f"/static/{path}?v={asset_version(path, os.stat(STATIC_DIR / path).st_mtime)}"
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    ``StaticFiles`` that serves ``.br``/``.gz`` siblings by content
+    negotiation. Versioned URLs (``?v=``, see ``static_url``) are cached as
+    immutable; other URLs revalidate with their ETag.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        variants = []
+        for encoding, suffix in ENCODINGS:
+            try:
+                variant_stat = os.stat(f"{full_path}{suffix}")
+            except OSError:
+                continue
+            # a variant older than its source is stale: ignore it
+            if variant_stat.st_mtime >= stat_result.st_mtime:
+                variants.append((encoding, f"{full_path}{suffix}", variant_stat))
+
+        chosen = next((variant for variant in variants if variant[0] in accepted), None)
+        if chosen is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        else:
+            encoding, path, variant_stat = chosen
+            response = FileResponse(
+                path,
+                status_code=status_code,
+                stat_result=variant_stat,
+                media_type=mimetypes.guess_type(str(full_path))[0] or "application/octet-stream",
+                headers={"Content-Encoding": encoding},
+            )
+        if variants:
+            response.headers["Vary"] = "Accept-Encoding"
+        versioned = "v" in parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        response.headers["Cache-Control"] = IMMUTABLE if versioned else REVALIDATE
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+class CompressionMiddleware:
+    """
+    gzip for dynamic responses of at least ``minimum_size`` bytes (JSON,
+    HTML, metrics). Paths under ``skip_prefixes`` are passed through:
+    static files bring their own precompressed variants.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, compresslevel: int = 6, skip_prefixes=("/static",)):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.skip_prefixes = tuple(skip_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not scope["path"].startswith(self.skip_prefixes):
+            await self.gzip(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+def precompress(directory: Path, min_size: int = 256) -> list[str]:
+    """
+    Write ``.gz`` (and ``.br`` with ``brotli`` installed) next to every
+    compressible file of at least ``min_size`` bytes, keeping a variant only
+    when it saves at least 10%. Returns the files written.
+    """
+    brotli = None
+    if find_spec("brotli"):
+        import brotli
+    written = []
+    for path in sorted(Path(directory).rglob("*")):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE or path.stat().st_size < min_size:
+            continue
+        data = path.read_bytes()
+        variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants[".br"] = brotli.compress(data, quality=11)
+        for suffix, compressed in variants.items():
+            target = path.with_name(path.name + suffix)
+            if len(compressed) <= len(data) * 0.9:
+                target.write_bytes(compressed)
+                written.append(str(target))
+            elif target.exists():
+                target.unlink()
+    return written
@@ -0,0 +1,81 @@
+import asyncio
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from src.config.config import config
+
+# the project directory, which also holds the ``src/static`` tree main.py serves
+BASE_DIR = Path(__file__).resolve().parents[2]
+
+_executor = ThreadPoolExecutor(
+    max_workers=config.UPLOAD_WORKERS, thread_name_prefix="avatar-upload"
+)
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call on the bounded upload executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
+
+
+class AvatarStorage(ABC):
+    @abstractmethod
+    async def save(self, key: str, data: bytes) -> str:
+        """Store the avatar under ``key`` and return its public URL."""
+
+
+class CloudinaryStorage(AvatarStorage):
+    def __init__(self):
+        import cloudinary
+
+        cloudinary.config(
+            cloud_name=config.CLD_NAME,
+            api_key=config.CLD_API_KEY,
+            api_secret=config.CLD_API_SECRET,
+            secure=True,
+        )
+
+    async def save(self, key: str, data: bytes) -> str:
+        import cloudinary
+        import cloudinary.uploader
+
+        public_id = f"Web16/{key}"
+        res = await run_blocking(
+            cloudinary.uploader.upload, data, public_id=public_id, overwrite=True
+        )
+        return cloudinary.CloudinaryImage(public_id).build_url(
+            width=250, height=250, crop="fill", version=res.get("version")
+        )
+
+
+class LocalStorage(AvatarStorage):
+    def __init__(self, root: Path, base_url: str = "/static/avatars"):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+
+    def _write(self, name: str, data: bytes) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f"{name}.tmp"
+        tmp.write_bytes(data)
+        tmp.replace(self.root / name)
+
+    async def save(self, key: str, data: bytes) -> str:
+        name = f"{key.replace('/', '_')}.jpg"
+        await run_blocking(self._write, name, data)
+        return f"{self.base_url}/{name}"
+
+
+_storage: AvatarStorage | None = None
+
+
+def get_storage() -> AvatarStorage:
+    global _storage
+    if _storage is None:
+        if config.AVATAR_STORAGE == "local":
+            # relative to the project, not the working directory
+            _storage = LocalStorage(BASE_DIR / config.AVATAR_LOCAL_DIR)
+        else:
+            _storage = CloudinaryStorage()
+    return _storage
@@ -0,0 +1,138 @@
+"""
+Typeahead suggestions: contacts whose first name, last name or e-mail starts
+with what the user has typed so far.
+
+Each keystroke is one query of three range scans over the
+``ix_contacts_user_id_*_prefix`` indexes. Users who keep typing get a sorted
+in-process index of their address book instead (``SUGGEST_CACHE_USERS`` users,
+least recently used evicted, ``SUGGEST_CACHE_MAX_ROWS`` contacts in total),
+answered with a binary search. An entry is built in the background after a
+miss and is only trusted while the latest ``updated_at`` of the user's
+contacts is the one it was built at; that check is a single index lookup, so
+writes from any process invalidate it without a message bus. Address books
+written to within ``CHANGES_SETTLE_SECONDS`` are served from the database, so
+a late-committing transaction cannot be missed by an entry stamped past it.
+"""
+import asyncio
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from fastapi import BackgroundTasks
+
+from src.config.config import config
+from src.database.db import async_session
+from src.entity.models import User
+from src.repository import contacts as repository_contacts
+
+
+class SuggestIndex:
+    """The live contacts of one user as ``(id, first_name, last_name, email)``, sorted by lowercased field."""
+
+    __slots__ = ("stamp", "rows", "names", "name_rows", "emails", "email_rows")
+
+    def __init__(self, stamp: datetime | None, rows: list[tuple]):
+        self.stamp = stamp
+        self.rows = rows
+        names = sorted(
+            (field.lower(), position) for position, row in enumerate(rows) for field in (row[1], row[2])
+        )
+        emails = sorted((row[3].lower(), position) for position, row in enumerate(rows))
+        self.names = [key for key, _ in names]
+        self.name_rows = [position for _, position in names]
+        self.emails = [key for key, _ in emails]
+        self.email_rows = [position for _, position in emails]
+
+    def lookup(self, prefix: str, limit: int) -> list[tuple]:
+        """The same rows, in the same order, as ``suggest_contacts``."""
+        found, seen = [], set()
+        for keys, positions in ((self.names, self.name_rows), (self.emails, self.email_rows)):
+            start = bisect_left(keys, prefix)
+            for index in range(start, len(keys)):
+                if not keys[index].startswith(prefix):
+                    break
+                position = positions[index]
+                if position not in seen:
+                    seen.add(position)
+                    found.append(self.rows[position])
+                    if len(found) == limit:
+                        return found
+        return found
+
+
+class SuggestCache:
+    def __init__(self, max_users: int, max_rows: int):
+        self.max_users = max_users
+        self.max_rows = max_rows
+        self.entries: OrderedDict[UUID, SuggestIndex] = OrderedDict()
+        self.rows = 0
+        self.building: set[UUID] = set()
+
+    def get(self, user_id: UUID, stamp: datetime | None) -> SuggestIndex | None:
+        entry = self.entries.get(user_id)
+        if entry is None:
+            return None
+        if entry.stamp != stamp:
+            self.discard(user_id)
+            return None
+        self.entries.move_to_end(user_id)
+        return entry
+
+    def put(self, user_id: UUID, entry: SuggestIndex) -> None:
+        self.discard(user_id)
+        while self.entries and (
+            len(self.entries) >= self.max_users or self.rows + len(entry.rows) > self.max_rows
+        ):
+            _, evicted = self.entries.popitem(last=False)
+            self.rows -= len(evicted.rows)
+        self.entries[user_id] = entry
+        self.rows += len(entry.rows)
+
+    def discard(self, user_id: UUID) -> None:
+        entry = self.entries.pop(user_id, None)
+        if entry is not None:
+            self.rows -= len(entry.rows)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.rows = 0
+
+
+cache = SuggestCache(config.SUGGEST_CACHE_USERS, config.SUGGEST_CACHE_MAX_ROWS)
+
+
+def _settled(stamp: datetime | None) -> bool:
+    return stamp is None or stamp <= datetime.utcnow() - timedelta(seconds=config.CHANGES_SETTLE_SECONDS)
+
+
+async def suggest(db, user: User, prefix: str, limit: int, background_tasks: BackgroundTasks) -> list[tuple]:
+    prefix = prefix.lower()
+    if not cache.max_users:
+        return await repository_contacts.suggest_contacts(db, user, prefix, limit)
+    stamp = await repository_contacts.get_contacts_stamp(db, user)
+    if _settled(stamp):
+        entry = cache.get(user.id, stamp)
+        if entry is not None:
+            return entry.lookup(prefix, limit)
+        if user.id not in cache.building:
+            cache.building.add(user.id)
+            background_tasks.add_task(build, user.id)
+    return await repository_contacts.suggest_contacts(db, user, prefix, limit)
+
+
+async def build(user_id: UUID) -> None:
+    """Load and index the user's contacts; skipped for address books larger than the whole cache."""
+    try:
+        user = User(id=user_id)
+        async with async_session() as db:
+            stamp = await repository_contacts.get_contacts_stamp(db, user)
+            rows = await repository_contacts.get_suggest_rows(db, user, cache.max_rows + 1)
+        if len(rows) > cache.max_rows or not _settled(stamp):
+            return
+        # sorting a large address book is CPU-bound: keep it off the event loop
+        cache.put(user_id, await asyncio.to_thread(SuggestIndex, stamp, rows))
+    except Exception as err:
+        print(err)
+    finally:
+        cache.building.discard(user_id)
@@ -0,0 +1,201 @@
+import asyncio
+import os
+import re
+import select
+import socket
+import socketserver
+import sys
+import threading
+import time
+# Include project root for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+from fakeredis import TcpFakeServer, aioredis as fake_aioredis
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.config.config import config
+from src.database.db import get_db, get_primary
+from src.entity.models import Base
+from src.services.auth import auth_service
+from src.services.query_stats import instrument_engine
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """
+    The real app on a SQLite file database with fakeredis as the user cache,
+    cheap password hashing and background e-mail/avatar tasks disabled.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    instrument_engine(engine)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def _create_all():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(_create_all())
+
+    async def _get_db_override():
+        async with session_maker() as session:
+            yield session
+
+    from starlette.requests import Request
+
+    def dummy_rate_limiter_factory(*args, **kwargs):
+        async def _noop(request: Request, response: None = None):
+            return None
+        return _noop
+
+    with patch("src.services.limiter.limiter.init", new=AsyncMock()), \
+         patch("src.services.limiter.RateLimiter", new=dummy_rate_limiter_factory):
+        from main import app
+        from src.routes import auth as auth_routes
+
+    monkeypatch.setattr(auth_routes, "send_email", AsyncMock())
+    monkeypatch.setattr(auth_routes, "enrich_user_avatar", AsyncMock())
+    monkeypatch.setattr(auth_service, "get_password_hash", lambda password: f"hashed-{password}")
+    monkeypatch.setattr(auth_service, "verify_password", lambda plain, hashed: hashed == f"hashed-{plain}")
+    monkeypatch.setattr(auth_service, "cache", fake_aioredis.FakeRedis())
+    app.dependency_overrides[get_db] = _get_db_override
+    app.dependency_overrides[get_primary] = lambda: session_maker
+    app.state.session_maker = session_maker
+    yield app
+    app.dependency_overrides.clear()
+    asyncio.run(engine.dispose())
+
+
+SERVER_TIMING_QUERIES = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+@pytest.fixture
+def max_queries(monkeypatch):
+    """
+    Turns on DEBUG so responses carry a Server-Timing header, and returns a
+    check that fails when a response ran more SQL statements than allowed.
+    """
+    monkeypatch.setattr(config, "DEBUG", True)
+
+    def check(response, limit: int):
+        header = response.headers.get("server-timing", "")
+        match = SERVER_TIMING_QUERIES.search(header)
+        assert match, f"no query stats in Server-Timing header: {header!r}"
+        count = int(match.group(1))
+        request = response.request
+        assert count <= limit, f"{request.method} {request.url.path} ran {count} queries, limit {limit}"
+        return count
+
+    return check
+
+
+@pytest.fixture
+def contact():
+    """Factory for valid contact payloads; keyword arguments replace fields."""
+
+    def make(i: int, **fields) -> dict:
+        return {
+            "first_name": "John",
+            "last_name": f"Doe{i}",
+            "email": f"john{i}@example.com",
+            "phone": f"067{i:07d}",
+            "birthday": "2000-01-01",
+            **fields,
+        }
+
+    return make
+
+
+@pytest.fixture
+def login():
+    """Signs a user up, logs them in and returns their auth headers."""
+
+    async def signup_and_login(client, email: str = "owner@example.com") -> dict:
+        user = {"username": email.split("@")[0], "email": email, "password": "123456"}
+        await client.post("/api/auth/signup", json=user)
+        response = await client.post("/api/auth/login", data={"username": email, "password": "123456"})
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return signup_and_login
+
+
+@pytest.fixture
+def add_contacts():
+    """Creates the given contact payloads and returns their ids, in order."""
+
+    async def create(client, headers: dict, payloads) -> list[str]:
+        return [(await client.post("/api/contacts/", json=payload, headers=headers)).json()["id"] for payload in payloads]
+
+    return create
+
+
+@pytest.fixture
+def run(app, login):
+    """
+    Runs ``scenario(client, headers)`` on an httpx client for the app, with
+    the headers of a freshly signed-up ``owner@example.com``, and returns
+    what the scenario returns.
+    """
+
+    def run_scenario(scenario):
+        async def main():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await scenario(client, await login(client))
+
+        return asyncio.run(main())
+
+    return run_scenario
+
+
+class _ProxyHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        upstream = socket.create_connection(self.server.upstream)
+        peers = {self.request: upstream, upstream: self.request}
+        try:
+            while True:
+                readable, _, _ = select.select(list(peers), [], [], 0.05)
+                if self.server.stalled:
+                    # hold the bytes: the client sees a server that stopped answering
+                    time.sleep(0.01)
+                    continue
+                for sock in readable:
+                    data = sock.recv(65536)
+                    if not data:
+                        return
+                    peers[sock].sendall(data)
+        except OSError:
+            return
+        finally:
+            upstream.close()
+
+
+class FaultProxy(socketserver.ThreadingTCPServer):
+    """TCP proxy in front of a fakeredis server; set ``stalled`` to freeze all traffic."""
+
+    daemon_threads = True
+
+    def __init__(self, upstream):
+        self.upstream = upstream
+        self.stalled = False
+        super().__init__(("127.0.0.1", 0), _ProxyHandler)
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+
+@pytest.fixture
+def redis_proxy():
+    """A real Redis protocol server (fakeredis over TCP) reached through a ``FaultProxy``."""
+    server = TcpFakeServer(("127.0.0.1", 0))
+    proxy = FaultProxy(server.server_address)
+    threads = [threading.Thread(target=target.serve_forever, daemon=True) for target in (server, proxy)]
+    for thread in threads:
+        thread.start()
+    yield proxy
+    for target in (proxy, server):
+        target.shutdown()
+        target.server_close()
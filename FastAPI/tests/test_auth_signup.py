@@ -0,0 +1,50 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from src.entity.models import User
+from src.services.auth import auth_service
+
+BODY = {"username": "tester", "email": "test@example.com", "password": "123456"}
+
+
+def test_signup_creates_user_and_primes_cache(run):
+    """POST /api/auth/signup returns the user and caches it for get_current_user"""
+
+    async def scenario(client, headers):
+        response = await client.post("/api/auth/signup", json=BODY)
+        return response, await auth_service.cache.exists("test@example.com")
+
+    response, cached = run(scenario)
+    assert response.status_code == 201, response.text
+    assert response.json()["email"] == "test@example.com"
+    assert cached == 1
+
+
+def test_signup_duplicate_email_returns_conflict(run):
+    """A second signup with the same email is a 409, not an IntegrityError"""
+
+    async def scenario(client, headers):
+        return [await client.post("/api/auth/signup", json=BODY) for _ in range(2)]
+
+    first, second = run(scenario)
+    assert first.status_code == 201
+    assert second.status_code == 409, second.text
+
+
+def test_concurrent_signup_same_email(run, app):
+    """200 parallel signups for one email create exactly one user"""
+    body = {**BODY, "email": "race@example.com"}
+
+    async def scenario(client, headers):
+        responses = await asyncio.gather(*[client.post("/api/auth/signup", json=body) for _ in range(200)])
+        async with app.state.session_maker() as session:
+            count = await session.scalar(select(func.count()).select_from(User).where(User.email == body["email"]))
+        return responses, count
+
+    responses, count = run(scenario)
+    statuses = [r.status_code for r in responses]
+
+    assert statuses.count(201) == 1
+    assert statuses.count(409) == 199
+    assert count == 1
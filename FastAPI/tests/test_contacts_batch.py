@@ -0,0 +1,74 @@
+from uuid import uuid4
+
+
+def test_batch_get_returns_per_item_results(run, login, contact, add_contacts, max_queries):
+    """Own contacts are returned, unknown and foreign ids are not_found, in one query"""
+
+    async def scenario(client, mine):
+        other = await login(client, "other@example.com")
+        ids = await add_contacts(client, mine, [contact(i) for i in range(3)])
+        foreign = (await client.post("/api/contacts/", json=contact(9), headers=other)).json()["id"]
+        missing = str(uuid4())
+
+        response = await client.post(
+            "/api/contacts/batch-get", json={"ids": ids + [foreign, missing]}, headers=mine
+        )
+        max_queries(response, 1)
+        return ids, response.json()
+
+    ids, items = run(scenario)
+    assert [item["status"] for item in items] == ["ok", "ok", "ok", "not_found", "not_found"]
+    assert [item["contact"]["id"] for item in items[:3]] == ids
+    assert items[3]["contact"] is None
+
+
+def test_batch_update_applies_patches_and_reports_conflicts(run, contact, add_contacts, max_queries):
+    """Partial patches update in a bounded number of statements; a taken e-mail is a conflict"""
+
+    async def scenario(client, headers):
+        ids = await add_contacts(client, headers, [contact(i) for i in range(3)])
+        patches = [
+            {"id": ids[0], "last_name": "Smith"},
+            {"id": ids[1], "email": "john2@example.com"},
+            {"id": ids[2], "email": "new@example.com", "additional_info": "moved"},
+            {"id": str(uuid4()), "last_name": "Ghost"},
+        ]
+        response = await client.post("/api/contacts/batch-update", json={"patches": patches}, headers=headers)
+        max_queries(response, 3)
+        check = await client.post("/api/contacts/batch-get", json={"ids": ids}, headers=headers)
+        return response.json(), check.json()
+
+    items, check = run(scenario)
+    assert [item["status"] for item in items] == ["updated", "conflict", "updated", "not_found"]
+    assert check[0]["contact"]["last_name"] == "Smith"
+    assert check[1]["contact"]["email"] == "john1@example.com"
+    assert check[2]["contact"]["email"] == "new@example.com"
+    assert check[2]["contact"]["additional_info"] == "moved"
+
+
+def test_batch_delete_only_removes_own_contacts(run, login, contact, add_contacts, max_queries):
+    """One DELETE ... RETURNING removes the caller's contacts and reports the rest"""
+
+    async def scenario(client, mine):
+        other = await login(client, "other@example.com")
+        ids = await add_contacts(client, mine, [contact(i) for i in range(2)])
+        foreign = (await client.post("/api/contacts/", json=contact(9), headers=other)).json()["id"]
+
+        response = await client.post("/api/contacts/batch-delete", json={"ids": ids + [foreign]}, headers=mine)
+        max_queries(response, 2)
+        left = await client.post("/api/contacts/batch-get", json={"ids": [foreign]}, headers=other)
+        return response.json(), left.json()
+
+    items, left = run(scenario)
+    assert [item["status"] for item in items] == ["deleted", "deleted", "not_found"]
+    assert left[0]["status"] == "ok"
+
+
+def test_batch_limit_is_enforced(run):
+    """More than 1,000 ids is rejected before touching the database"""
+
+    async def scenario(client, headers):
+        ids = [str(uuid4()) for _ in range(1001)]
+        return await client.post("/api/contacts/batch-get", json={"ids": ids}, headers=headers)
+
+    assert run(scenario).status_code == 422
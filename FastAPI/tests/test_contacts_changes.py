@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+
+from src.config.config import config
+from src.entity.models import Contact
+from src.repository.contacts import compact_tombstones
+
+
+def test_changes_returns_only_deltas_and_tombstones(run, contact, add_contacts, monkeypatch):
+    """After a snapshot, only updated and deleted rows come back with a new watermark"""
+    monkeypatch.setattr(config, "CHANGES_SETTLE_SECONDS", 0)
+
+    async def scenario(client, headers):
+        ids = await add_contacts(client, headers, [contact(i) for i in range(4)])
+        snapshot = (await client.get("/api/contacts/changes", headers=headers)).json()
+        await client.put(f"/api/contacts/{ids[0]}", json={**contact(0), "last_name": "Smith"}, headers=headers)
+        await client.delete(f"/api/contacts/{ids[1]}", headers=headers)
+        delta = (await client.get(
+            "/api/contacts/changes", params={"since": snapshot["watermark"]}, headers=headers
+        )).json()
+        empty = (await client.get(
+            "/api/contacts/changes", params={"since": delta["watermark"]}, headers=headers
+        )).json()
+        listed = (await client.get("/api/contacts/", headers=headers)).json()
+        return ids, snapshot, delta, empty, listed
+
+    ids, snapshot, delta, empty, listed = run(scenario)
+    assert sorted(c["id"] for c in snapshot["changed"]) == sorted(ids)
+    assert snapshot["deleted"] == [] and snapshot["has_more"] is False
+    assert [c["id"] for c in delta["changed"]] == [ids[0]]
+    assert delta["changed"][0]["last_name"] == "Smith"
+    assert delta["deleted"] == [ids[1]]
+    assert empty["changed"] == [] and empty["deleted"] == []
+    assert ids[1] not in [c["id"] for c in listed]
+
+
+def test_deleted_email_can_be_added_again(run, contact):
+    """A tombstone does not own its e-mail: only live contacts are unique per user"""
+
+    async def scenario(client, headers):
+        first = (await client.post("/api/contacts/", json=contact(0), headers=headers)).json()["id"]
+        await client.delete(f"/api/contacts/{first}", headers=headers)
+        again = await client.post("/api/contacts/", json=contact(0), headers=headers)
+        duplicate = await client.post("/api/contacts/", json=contact(0), headers=headers)
+        changes = (await client.get("/api/contacts/changes", headers=headers)).json()
+        return first, again, duplicate, changes
+
+    first, again, duplicate, changes = run(scenario)
+    assert again.status_code == 200
+    assert again.json()["id"] != first
+    assert duplicate.status_code == 400
+    assert [c["id"] for c in changes["changed"]] == [again.json()["id"]]
+
+
+def test_changes_pages_with_has_more(run, contact):
+    """A full page sets has_more and its watermark continues after the last row"""
+
+    async def scenario(client, headers):
+        for i in range(5):
+            await client.post("/api/contacts/", json=contact(i), headers=headers)
+        pages, since = [], None
+        while True:
+            params = {"limit": 2, **({"since": since} if since else {})}
+            page = (await client.get("/api/contacts/changes", params=params, headers=headers)).json()
+            pages.append(page)
+            since = page["watermark"]
+            if not page["has_more"]:
+                return pages
+
+    pages = run(scenario)
+    assert [len(page["changed"]) for page in pages] == [2, 2, 1]
+    assert len({c["id"] for page in pages for c in page["changed"]}) == 5
+
+
+def test_recent_rows_are_not_passed_by_the_watermark(run, contact):
+    """Rows younger than the settle window are returned again on the next sync"""
+
+    async def scenario(client, headers):
+        await client.post("/api/contacts/", json=contact(0), headers=headers)
+        first = (await client.get("/api/contacts/changes", headers=headers)).json()
+        again = (await client.get(
+            "/api/contacts/changes", params={"since": first["watermark"]}, headers=headers
+        )).json()
+        return first, again
+
+    first, again = run(scenario)
+    assert [c["id"] for c in again["changed"]] == [c["id"] for c in first["changed"]]
+
+
+def test_expired_or_invalid_watermark(run):
+    """A watermark older than the tombstone TTL is 410, garbage is 422"""
+
+    async def scenario(client, headers):
+        old = (datetime.utcnow() - timedelta(days=config.CHANGES_TOMBSTONE_TTL_DAYS + 1)).isoformat()
+        expired = await client.get(
+            "/api/contacts/changes", params={"since": f"{old}_00000000-0000-0000-0000-000000000000"}, headers=headers
+        )
+        invalid = await client.get("/api/contacts/changes", params={"since": "yesterday"}, headers=headers)
+        return expired.status_code, invalid.status_code
+
+    assert run(scenario) == (410, 422)
+
+
+def test_compaction_purges_only_old_tombstones(run, contact, add_contacts, app):
+    """Tombstones past the TTL are hard-deleted, recent ones are kept for sync"""
+
+    async def scenario(client, headers):
+        ids = await add_contacts(client, headers, [contact(i) for i in range(3)])
+        await client.post("/api/contacts/batch-delete", json={"ids": ids[:2]}, headers=headers)
+        await client.post("/api/contacts/batch-update", json={"patches": [{"id": ids[2], "last_name": "X"}]}, headers=headers)
+        async with app.state.session_maker() as db:
+            old = datetime.utcnow() - timedelta(days=config.CHANGES_TOMBSTONE_TTL_DAYS + 1)
+            await db.execute(
+                update(Contact).where(Contact.email == "john0@example.com").values(deleted_at=old)
+            )
+            await db.commit()
+            purged = await compact_tombstones(db)
+            left = (await db.execute(select(func.count()).select_from(Contact))).scalar_one()
+        return purged, left
+
+    assert run(scenario) == (1, 2)
+
+
+def test_batch_writes_bump_updated_at(run, contact, add_contacts, monkeypatch):
+    """Batch update and batch delete show up in the delta like single writes"""
+    monkeypatch.setattr(config, "CHANGES_SETTLE_SECONDS", 0)
+
+    async def scenario(client, headers):
+        ids = await add_contacts(client, headers, [contact(i) for i in range(3)])
+        watermark = (await client.get("/api/contacts/changes", headers=headers)).json()["watermark"]
+        await client.post("/api/contacts/batch-update", json={"patches": [{"id": ids[0], "last_name": "X"}]}, headers=headers)
+        await client.post("/api/contacts/batch-delete", json={"ids": [ids[1]]}, headers=headers)
+        delta = await client.get("/api/contacts/changes", params={"since": watermark}, headers=headers)
+        return ids, delta.json()
+
+    ids, delta = run(scenario)
+    assert [c["id"] for c in delta["changed"]] == [ids[0]]
+    assert delta["deleted"] == [ids[1]]
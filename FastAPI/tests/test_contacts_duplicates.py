@@ -0,0 +1,63 @@
+from src.services import dedup
+
+CONTACTS = [
+    {"first_name": "John", "last_name": "Doe", "email": "john.doe@example.com",
+     "phone": "+380671234567", "birthday": "1990-01-01"},
+    {"first_name": "Jon", "last_name": "Doe", "email": "johndoe@work.io",
+     "phone": "0671234567", "birthday": "1990-01-01", "additional_info": "met at work"},
+    {"first_name": "Mary", "last_name": "Major", "email": "mary@example.com",
+     "phone": "0509998877", "birthday": "1985-05-05"},
+]
+
+
+def test_duplicates_then_merge(run, add_contacts):
+    """Look-alike contacts are reported together and merging keeps the primary"""
+
+    async def scenario(client, headers):
+        ids = await add_contacts(client, headers, CONTACTS)
+        report = (await client.get("/api/contacts/duplicates", headers=headers)).json()
+        merged = await client.post(
+            "/api/contacts/merge", json={"primary": ids[0], "duplicates": [ids[1]]}, headers=headers
+        )
+        after = (await client.get("/api/contacts/duplicates", headers=headers)).json()
+        listed = (await client.get("/api/contacts/", headers=headers)).json()
+        return ids, report, merged, after, listed
+
+    ids, report, merged, after, listed = run(scenario)
+    assert report["status"] == "done" and report["contacts_scanned"] == 3
+    assert [sorted(c["id"] for c in group["contacts"]) for group in report["groups"]] == [sorted(ids[:2])]
+    assert merged.status_code == 200
+    assert merged.json()["additional_info"] == "met at work"
+    assert after["groups"] == []
+    assert sorted(c["id"] for c in listed) == sorted([ids[0], ids[2]])
+
+
+def test_merge_rejects_unknown_contacts(run, add_contacts):
+    """Merging needs the primary and every duplicate to exist"""
+
+    async def scenario(client, headers):
+        ids = await add_contacts(client, headers, CONTACTS)
+        missing = await client.post(
+            "/api/contacts/merge",
+            json={"primary": ids[0], "duplicates": ["00000000-0000-0000-0000-000000000000"]},
+            headers=headers,
+        )
+        itself = await client.post("/api/contacts/merge", json={"primary": ids[0], "duplicates": [ids[0]]}, headers=headers)
+        return missing.status_code, itself.status_code
+
+    assert run(scenario) == (404, 422)
+
+
+def test_background_job_mode(run, add_contacts, app, monkeypatch):
+    """Large books get 202 first and the cached report once the job has run"""
+    monkeypatch.setattr(dedup, "async_session", app.state.session_maker)
+
+    async def scenario(client, headers):
+        ids = await add_contacts(client, headers, CONTACTS)
+        pending = await client.get("/api/contacts/duplicates", params={"background": True}, headers=headers)
+        done = await client.get("/api/contacts/duplicates", headers=headers)
+        return pending, done.json()
+
+    pending, done = run(scenario)
+    assert pending.status_code == 202 and pending.json()["status"] == "pending"
+    assert done["status"] == "done" and len(done["groups"]) == 1
@@ -0,0 +1,54 @@
+from sqlalchemy import event
+
+CONTACT = {
+    "first_name": "John",
+    "last_name": "Doe",
+    "email": "john@example.com",
+    "phone": "1234567890",
+    "birthday": "2000-01-01",
+}
+
+
+def test_email_is_unique_per_user(run, login):
+    """Two users may store the same e-mail; one user may not store it twice"""
+
+    async def scenario(client, owner):
+        other = await login(client, "other@example.com")
+        return [
+            (await client.post("/api/contacts/", json=CONTACT, headers=owner)).status_code,
+            (await client.post("/api/contacts/", json=CONTACT, headers=other)).status_code,
+            (await client.post("/api/contacts/", json=CONTACT, headers=owner)).status_code,
+        ]
+
+    assert run(scenario) == [200, 200, 400]
+
+
+def test_contact_queries_filter_on_partition_key(run, app):
+    """Every statement the contact routes send filters on user_id, so partition pruning applies"""
+    engine = app.state.session_maker.kw["bind"].sync_engine
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async def scenario(client, headers):
+        event.listen(engine, "before_cursor_execute", _record)
+        contact_id = (await client.post("/api/contacts/", json=CONTACT, headers=headers)).json()["id"]
+        await client.get("/api/contacts/", headers=headers)
+        await client.get(f"/api/contacts/{contact_id}", headers=headers)
+        await client.get("/api/contacts/search/", params={"query": "Doe"}, headers=headers)
+        await client.get("/api/contacts/upcoming_birthdays/", headers=headers)
+        await client.get("/api/contacts/changes", headers=headers)
+        await client.put(f"/api/contacts/{contact_id}", json=CONTACT, headers=headers)
+        await client.post("/api/contacts/batch-get", json={"ids": [contact_id]}, headers=headers)
+        patch = {"id": contact_id, "email": "doe@example.com"}
+        await client.post("/api/contacts/batch-update", json={"patches": [patch]}, headers=headers)
+        await client.delete(f"/api/contacts/{contact_id}", headers=headers)
+        await client.post("/api/contacts/batch-delete", json={"ids": [contact_id]}, headers=headers)
+        event.remove(engine, "before_cursor_execute", _record)
+
+    run(scenario)
+    touched = [s for s in statements if "contacts" in s and not s.startswith("INSERT")]
+    assert len(touched) >= 10
+    for statement in touched:
+        assert "contacts.user_id" in statement.split("WHERE", 1)[-1], statement
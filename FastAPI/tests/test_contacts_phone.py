@@ -0,0 +1,48 @@
+def test_lookup_by_phone_in_any_format(run, contact, add_contacts, max_queries):
+    """Numbers are normalized on create, update and batch update, and looked up in E.164"""
+
+    async def scenario(client, headers):
+        phones = ["067 123 45 67", "+38 (050) 111-22-33", "12"]
+        ids = await add_contacts(client, headers, [contact(i, phone=phone) for i, phone in enumerate(phones)])
+        response = await client.get("/api/contacts/by-phone/+380671234567", headers=headers)
+        max_queries(response, 1)
+        found = response.json()
+        invalid = await client.get("/api/contacts/by-phone/12", headers=headers)
+
+        await client.put(f"/api/contacts/{ids[0]}", json=contact(0, phone="0991234567"), headers=headers)
+        await client.post("/api/contacts/batch-update", json={"patches": [{"id": ids[1], "phone": "0671234567"}]},
+                          headers=headers)
+        moved = (await client.get("/api/contacts/by-phone/0671234567", headers=headers)).json()
+        updated = (await client.get("/api/contacts/by-phone/00380991234567", headers=headers)).json()
+        return ids, found, invalid, moved, updated
+
+    ids, found, invalid, moved, updated = run(scenario)
+    assert [c["id"] for c in found] == [ids[0]]
+    assert found[0]["phone"] == "067 123 45 67"
+    assert invalid.status_code == 422
+    assert [c["id"] for c in moved] == [ids[1]]
+    assert [c["id"] for c in updated] == [ids[0]]
+
+
+def test_batch_lookup(run, contact, add_contacts, max_queries):
+    """One query answers every number; misses and invalid numbers keep their place"""
+
+    async def scenario(client, headers):
+        phones = ["0671234567", "+380671234567", "0501112233"]
+        ids = await add_contacts(client, headers, [contact(i, phone=phone) for i, phone in enumerate(phones)])
+        await client.delete(f"/api/contacts/{ids[2]}", headers=headers)
+        response = await client.post(
+            "/api/contacts/by-phone",
+            json={"numbers": ["+38 067 123 45 67", "0501112233", "abc", "0671234567"]},
+            headers=headers,
+        )
+        max_queries(response, 1)
+        too_many = await client.post("/api/contacts/by-phone", json={"numbers": ["1"] * 1001}, headers=headers)
+        return ids, response.json(), too_many
+
+    ids, matches, too_many = run(scenario)
+    assert [m["number"] for m in matches] == ["+38 067 123 45 67", "0501112233", "abc", "0671234567"]
+    assert [m["e164"] for m in matches] == ["+380671234567", "+380501112233", None, "+380671234567"]
+    assert sorted(c["id"] for c in matches[0]["contacts"]) == sorted(ids[:2])
+    assert matches[1]["contacts"] == [] and matches[2]["contacts"] == []
+    assert too_many.status_code == 422
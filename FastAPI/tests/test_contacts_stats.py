@@ -0,0 +1,61 @@
+from datetime import date
+
+from sqlalchemy import update
+
+from src.entity.models import ContactMonthCount
+from src.services.reconcile import ContactCountReconciler
+
+
+def test_stats_follow_every_write(run, contact, add_contacts, max_queries):
+    """Creates, updates, deletes, batch writes and merges keep the counters exact"""
+    this_month = date.today().replace(year=1990, day=1).isoformat()
+    other_month = date(1990, date.today().month % 12 + 1, 1).isoformat()
+
+    async def scenario(client, headers):
+        snapshots = []
+
+        async def stats():
+            response = await client.get("/api/contacts/stats", headers=headers)
+            max_queries(response, 1)
+            snapshots.append(response.json())
+
+        birthdays = [this_month, this_month, other_month, other_month, other_month]
+        ids = await add_contacts(client, headers, [contact(i, birthday=birthday) for i, birthday in enumerate(birthdays)])
+        await stats()
+        await client.put(f"/api/contacts/{ids[0]}", json=contact(0, birthday=other_month), headers=headers)
+        await client.post("/api/contacts/batch-update", json={"patches": [{"id": ids[2], "birthday": this_month}]},
+                          headers=headers)
+        await stats()
+        await client.delete(f"/api/contacts/{ids[1]}", headers=headers)
+        await client.post("/api/contacts/batch-delete", json={"ids": [ids[3]]}, headers=headers)
+        await client.post("/api/contacts/merge", json={"primary": ids[0], "duplicates": [ids[4]]}, headers=headers)
+        await stats()
+        return snapshots
+
+    first, updated, deleted = run(scenario)
+    month = date.today().month - 1
+    assert (first["total"], first["birthdays_this_month"]) == (5, 2)
+    assert sum(first["birthdays_by_month"]) == 5 and first["birthdays_by_month"][month] == 2
+    assert (updated["total"], updated["birthdays_this_month"]) == (5, 2)
+    assert (deleted["total"], deleted["birthdays_this_month"]) == (2, 1)
+
+
+def test_reconciliation_corrects_drift(run, contact, add_contacts, app):
+    """A recount restores counters that drifted from the contacts"""
+    birthday = date(1990, 3, 1).isoformat()
+
+    async def scenario(client, headers):
+        await add_contacts(client, headers, [contact(i, birthday=birthday) for i in range(3)])
+        async with app.state.session_maker() as db:
+            await db.execute(update(ContactMonthCount).values(count=ContactMonthCount.count + 7))
+            await db.commit()
+        drifted = (await client.get("/api/contacts/stats", headers=headers)).json()
+        corrected = await ContactCountReconciler(app.state.session_maker, batch=1).run_once()
+        again = await ContactCountReconciler(app.state.session_maker).run_once()
+        fixed = (await client.get("/api/contacts/stats", headers=headers)).json()
+        return drifted, corrected, again, fixed
+
+    drifted, corrected, again, fixed = run(scenario)
+    assert drifted["total"] == 10
+    assert (corrected, again) == (1, 0)
+    assert fixed["total"] == 3 and fixed["birthdays_by_month"][2] == 3
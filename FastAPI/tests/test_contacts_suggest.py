@@ -0,0 +1,90 @@
+from src.config.config import config
+from src.services import suggest
+from src.services.suggest import SuggestCache, SuggestIndex
+
+PEOPLE = [
+    ("Anna", "Smith", "anna@example.com"),
+    ("andrew", "Anders", "drew@example.com"),
+    ("Bob", "Annis", "bob@example.com"),
+    ("Carl", "Brown", "ann.c@example.com"),
+    ("Anton", "Cole", "tony@example.com"),
+    ("Dana", "Stone", "dana@example.com"),
+]
+
+
+def people(contact) -> list[dict]:
+    return [
+        contact(i, first_name=first_name, last_name=last_name, email=email)
+        for i, (first_name, last_name, email) in enumerate(PEOPLE)
+    ]
+
+
+def names(response) -> list[str]:
+    return [f"{item['first_name']} {item['last_name']}" for item in response.json()]
+
+
+def test_suggest_from_prefix_indexes(run, contact, add_contacts, max_queries, monkeypatch):
+    """Names first in key order, then e-mails; case-insensitive, live contacts only, one query"""
+    monkeypatch.setattr(suggest, "cache", SuggestCache(0, 0))
+
+    async def scenario(client, headers):
+        ids = await add_contacts(client, headers, people(contact))
+        await client.delete(f"/api/contacts/{ids[4]}", headers=headers)
+        found = await client.get("/api/contacts/suggest", params={"prefix": "AN"}, headers=headers)
+        max_queries(found, 1)
+        limited = await client.get("/api/contacts/suggest", params={"prefix": "an", "limit": 2}, headers=headers)
+        nothing = await client.get("/api/contacts/suggest", params={"prefix": "zz"}, headers=headers)
+        empty = await client.get("/api/contacts/suggest", params={"prefix": ""}, headers=headers)
+        return found, limited, nothing, empty
+
+    found, limited, nothing, empty = run(scenario)
+    # andrew (Anders) once, by its smaller key "anders"; Carl Brown by e-mail only
+    assert names(found) == ["andrew Anders", "Anna Smith", "Bob Annis", "Carl Brown"]
+    assert names(limited) == ["andrew Anders", "Anna Smith"]
+    assert nothing.json() == []
+    assert empty.status_code == 422
+
+
+def test_warm_cache_answers_like_the_database(run, contact, add_contacts, app, max_queries, monkeypatch):
+    """After the background build only the freshness check hits the database; a write invalidates"""
+    monkeypatch.setattr(suggest, "cache", SuggestCache(4, 1000))
+    monkeypatch.setattr(suggest, "async_session", app.state.session_maker)
+    monkeypatch.setattr(config, "CHANGES_SETTLE_SECONDS", 0)
+    prefixes = ["a", "an", "ann", "anna@", "d", "dr", "s", "x"]
+
+    async def scenario(client, headers):
+        ids = await add_contacts(client, headers, people(contact))
+        async def ask(prefix):
+            return await client.get("/api/contacts/suggest", params={"prefix": prefix, "limit": 3}, headers=headers)
+
+        cold = [names(await ask(prefix)) for prefix in prefixes]
+        user_id = next(iter(suggest.cache.entries))
+        cached = []
+        for prefix in prefixes:
+            response = await ask(prefix)
+            max_queries(response, 1)
+            cached.append(names(response))
+        renamed = contact(5, first_name="Ann", last_name="Stone", email="dana@example.com")
+        await client.put(f"/api/contacts/{ids[5]}", json=renamed, headers=headers)
+        changed = names(await ask("ann"))
+        return cold, cached, suggest.cache.get(user_id, suggest.cache.entries[user_id].stamp), changed
+
+    cold, cached, entry, changed = run(scenario)
+    assert cached == cold
+    assert entry is not None and len(entry.rows) == len(PEOPLE)
+    assert changed == ["Ann Stone", "Anna Smith", "Bob Annis"]
+
+
+def test_cache_evicts_least_recently_used():
+    cache = SuggestCache(max_users=2, max_rows=5)
+    rows = [(i, f"First{i}", f"Last{i}", f"e{i}@example.com") for i in range(3)]
+    cache.put("a", SuggestIndex(None, rows))
+    cache.put("b", SuggestIndex(None, rows[:1]))
+    cache.get("a", None)
+    cache.put("c", SuggestIndex(None, rows[:1]))
+    assert list(cache.entries) == ["a", "c"] and cache.rows == 4
+    # over the row budget: evicts until the newcomer fits
+    cache.put("d", SuggestIndex(None, rows))
+    assert list(cache.entries) == ["c", "d"] and cache.rows == 4
+    assert cache.get("c", "stale") is None and cache.rows == 3
+    assert SuggestIndex(None, rows).lookup("last1", 10) == [rows[1]]
@@ -0,0 +1,56 @@
+async def counts(client, headers) -> dict:
+    response = await client.get("/api/contacts/tags", headers=headers)
+    return {item["tag"]: item["count"] for item in response.json()}
+
+
+def test_filter_by_tags(run, contact, add_contacts):
+    """Tags are normalized and the list filter matches contacts carrying all given tags"""
+
+    async def scenario(client, headers):
+        ids = await add_contacts(
+            client, headers, [contact(i, tags=tags) for i, tags in enumerate([["Work", " family"], ["work"], []])]
+        )
+        work = (await client.get("/api/contacts/", params={"tag": "work"}, headers=headers)).json()
+        both = (await client.get("/api/contacts/", params={"tag": ["work", "FAMILY"]}, headers=headers)).json()
+        return ids, work, both
+
+    ids, work, both = run(scenario)
+    assert sorted(c["id"] for c in work) == sorted(ids[:2])
+    assert [c["id"] for c in both] == [ids[0]]
+    assert both[0]["tags"] == ["work", "family"]
+
+
+def test_tag_counts_follow_every_write(run, contact, add_contacts):
+    """Create, bulk tag/untag, update, delete and batch delete keep the counts in step"""
+
+    async def scenario(client, headers):
+        ids = await add_contacts(client, headers, [contact(i, tags=["a"]) for i in range(3)])
+        steps = [await counts(client, headers)]
+        tagged = await client.post("/api/contacts/tags/add", json={"ids": ids, "tags": ["b", "a"]}, headers=headers)
+        steps.append(await counts(client, headers))
+        await client.post("/api/contacts/tags/remove", json={"ids": [ids[0]], "tags": ["a"]}, headers=headers)
+        await client.put(f"/api/contacts/{ids[1]}", json=contact(1, tags=["c"]), headers=headers)
+        steps.append(await counts(client, headers))
+        # no "tags" in the payload: the contact keeps its tags
+        await client.put(f"/api/contacts/{ids[2]}", json=contact(2), headers=headers)
+        await client.delete(f"/api/contacts/{ids[2]}", headers=headers)
+        await client.post("/api/contacts/batch-delete", json={"ids": [ids[0]]}, headers=headers)
+        steps.append(await counts(client, headers))
+        return tagged.json(), steps
+
+    tagged, steps = run(scenario)
+    assert [item["status"] for item in tagged] == ["updated"] * 3
+    assert steps == [{"a": 3}, {"a": 3, "b": 3}, {"a": 1, "b": 2, "c": 1}, {"c": 1}]
+
+
+def test_bulk_tagging_query_budget(run, contact, add_contacts, max_queries):
+    """Tagging a batch costs one SELECT, one UPDATE and one count upsert"""
+
+    async def scenario(client, headers):
+        ids = await add_contacts(client, headers, [contact(i) for i in range(20)])
+        response = await client.post("/api/contacts/tags/add", json={"ids": ids, "tags": ["vip"]}, headers=headers)
+        max_queries(response, 3)
+        max_queries(await client.get("/api/contacts/", params={"tag": "vip"}, headers=headers), 1)
+        return await counts(client, headers)
+
+    assert run(scenario) == {"vip": 20}
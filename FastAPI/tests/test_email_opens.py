@@ -0,0 +1,53 @@
+import asyncio
+
+from sqlalchemy import update
+from sqlalchemy.exc import OperationalError
+
+from src.config.config import config
+from src.entity.models import Role, User
+from src.services.opens import OpenTracker, PIXEL, open_tracker
+
+
+def test_pixel_hits_are_buffered_and_flushed(run, login, app, monkeypatch):
+    """Hits are served from memory, counted in the buffer and flushed as one upsert per batch"""
+    monkeypatch.setattr(open_tracker, "buffer", {})
+    monkeypatch.setattr(open_tracker, "session_maker", app.state.session_maker)
+
+    async def scenario(client, headers):
+        async with app.state.session_maker() as db:
+            await db.execute(update(User).values(role=Role.admin))
+            await db.commit()
+        # logging in again caches the user with the new role
+        headers = await login(client)
+        pixels = [await client.get(f"/api/auth/check-email-open/{name}") for name in ["owner"] * 3 + ["nobody"]]
+        written = await open_tracker.flush()
+        await client.get("/api/auth/check-email-open/owner")
+        await open_tracker.flush()
+        stats = await client.get("/api/auth/email-opens", headers=headers)
+        return pixels, written, stats
+
+    pixels, written, stats = run(scenario)
+    assert all(p.content == PIXEL and p.headers["content-type"] == "image/png" for p in pixels)
+    assert "max-age=31536000" in pixels[0].headers["cache-control"]
+    assert written == 1
+    assert stats.status_code == 200
+    body = stats.json()
+    assert body["total_opens"] == 4
+    assert [(u["username"], u["opens"]) for u in body["users"]] == [("owner", 4)]
+
+
+def test_buffer_is_bounded_and_kept_on_failure(monkeypatch):
+    """New usernames past the cap are dropped; a failed flush keeps the hits"""
+    monkeypatch.setattr(config, "EMAIL_OPENS_MAX_KEYS", 2)
+    tracker = OpenTracker()
+    for name in ["a", "b", "a", "c"]:
+        tracker.record(name)
+    assert {name: entry[0] for name, entry in tracker.buffer.items()} == {"a": 2, "b": 1}
+    assert tracker.dropped == 1
+
+    def broken_session():
+        raise OperationalError("INSERT", {}, Exception("down"))
+
+    tracker.session_maker = broken_session
+    assert asyncio.run(tracker.flush()) == 0
+    assert {name: entry[0] for name, entry in tracker.buffer.items()} == {"a": 2, "b": 1}
@@ -0,0 +1,54 @@
+from uuid import uuid4
+from unittest.mock import AsyncMock
+
+from prometheus_client import REGISTRY
+
+from src.services import metrics
+
+
+def test_metrics_endpoint_reports_route_templates(run):
+    """/metrics exposes per-route counts and latency labelled by route template"""
+    labels = {"method": "GET", "route": "/api/users/me", "status": "200"}
+    before = REGISTRY.get_sample_value("http_requests_total", labels) or 0
+
+    async def scenario(client, headers):
+        assert (await client.get("/api/users/me", headers=headers)).status_code == 200
+        assert (await client.get(f"/api/contacts/{uuid4()}x")).status_code in (401, 422)
+        return await client.get("/metrics")
+
+    response = run(scenario)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert REGISTRY.get_sample_value("http_requests_total", labels) == before + 1
+    assert 'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/api/users/me"}' in response.text
+    assert "db_pool_checked_out" in response.text
+
+
+def test_metrics_unmatched_paths_share_one_label(run):
+    """Unknown paths are counted under a single label"""
+    labels = {"method": "GET", "route": "unmatched", "status": "404"}
+    before = REGISTRY.get_sample_value("http_requests_total", labels) or 0
+
+    async def scenario(client, headers):
+        await client.get("/no/such/path/1")
+        await client.get("/no/such/path/2")
+
+    run(scenario)
+    assert REGISTRY.get_sample_value("http_requests_total", labels) == before + 2
+
+
+def test_queue_email_tracks_depth():
+    """queue_email raises the queue gauge until the background send finishes"""
+    import asyncio
+    from fastapi import BackgroundTasks
+    from src.services.email import queue_email
+
+    send = AsyncMock()
+    bt = BackgroundTasks()
+    before = metrics.EMAIL_QUEUE._value.get()
+    queue_email(bt, send, "test@example.com")
+    assert metrics.EMAIL_QUEUE._value.get() == before + 1
+
+    asyncio.run(bt())
+    send.assert_awaited_once_with("test@example.com")
+    assert metrics.EMAIL_QUEUE._value.get() == before
@@ -0,0 +1,65 @@
+CONTACT = {
+    "first_name": "John",
+    "last_name": "Doe",
+    "email": "john@example.com",
+    "phone": "1234567890",
+    "birthday": "2000-01-01",
+}
+
+
+def test_route_query_budgets(run, max_queries):
+    """Each route stays within its SQL statement budget (user served from cache)"""
+
+    async def scenario(client, owner):
+        user = {"username": "tester", "email": "test@example.com", "password": "123456"}
+        max_queries(await client.post("/api/auth/signup", json=user), 1)
+
+        response = await client.post(
+            "/api/auth/login", data={"username": user["email"], "password": user["password"]}
+        )
+        max_queries(response, 2)
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        response = await client.post("/api/contacts/", json=CONTACT, headers=headers)
+        assert response.status_code == 200, response.text
+        # e-mail check, insert + birth-month count upsert, refresh
+        max_queries(response, 4)
+        contact_id = response.json()["id"]
+
+        max_queries(await client.get("/api/contacts/", headers=headers), 1)
+        max_queries(await client.get(f"/api/contacts/{contact_id}", headers=headers), 1)
+        max_queries(await client.get("/api/contacts/search/", params={"query": "Doe"}, headers=headers), 1)
+        max_queries(await client.get("/api/contacts/upcoming_birthdays/", headers=headers), 1)
+        max_queries(await client.put(f"/api/contacts/{contact_id}", json=CONTACT, headers=headers), 2)
+        max_queries(await client.delete(f"/api/contacts/{contact_id}", headers=headers), 3)
+
+    run(scenario)
+
+
+def test_server_timing_only_in_debug(run, monkeypatch):
+    """Without DEBUG no Server-Timing header is added"""
+    from src.config.config import config
+
+    monkeypatch.setattr(config, "DEBUG", False)
+
+    async def scenario(client, owner):
+        user = {"username": "tester", "email": "test@example.com", "password": "123456"}
+        return await client.post("/api/auth/signup", json=user)
+
+    response = run(scenario)
+    assert response.status_code == 201
+    assert "server-timing" not in response.headers
+
+
+def test_repeated_statements_are_flagged():
+    """Statements repeated past the threshold are reported as N+1 suspects"""
+    from src.services.query_stats import QueryStats
+
+    stats = QueryStats()
+    for _ in range(5):
+        stats.record("SELECT * FROM users WHERE id = ?", 0.001)
+    stats.record("SELECT * FROM contacts", 0.002)
+
+    assert stats.count == 6
+    assert stats.repeated(5) == [("SELECT * FROM users WHERE id = ?", 5)]
+    assert stats.server_timing() == 'db;dur=7.00;desc="6 queries"'
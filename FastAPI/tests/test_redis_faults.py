@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+
+from src.config.config import config
+from src.services.auth import auth_service
+from src.services.changes import change_feed
+from src.services.breaker import CLOSED, OPEN, CircuitBreaker, CircuitOpenError, GuardedRedis
+
+
+def test_timeouts_open_the_breaker_and_it_recovers(redis_proxy):
+    """A stalled Redis costs one timeout per call until the breaker opens, then nothing"""
+
+    async def scenario():
+        breaker = CircuitBreaker("redis-faults", failure_threshold=2, reset_timeout=0.3)
+        client = GuardedRedis(host="127.0.0.1", port=redis_proxy.port, breaker=breaker, timeout=0.1)
+        await client.set("key", "value")
+        redis_proxy.stalled = True
+        for _ in range(2):
+            with pytest.raises(TimeoutError):
+                await client.get("key")
+        assert breaker.state == OPEN
+        started = time.perf_counter()
+        with pytest.raises(CircuitOpenError):
+            await client.get("key")
+        rejected_in = time.perf_counter() - started
+
+        redis_proxy.stalled = False
+        await asyncio.sleep(0.3)
+        value = await client.get("key")
+        await client.aclose()
+        return breaker, rejected_in, value
+
+    breaker, rejected_in, value = asyncio.run(scenario())
+    assert rejected_in < 0.01
+    assert value == b"value"
+    assert breaker.state == CLOSED
+
+
+def test_auth_falls_back_to_database_with_a_cap(run, redis_proxy, monkeypatch):
+    """With Redis stalled requests authenticate from the database, up to the fallback cap"""
+
+    async def scenario(client, headers):
+        breaker = CircuitBreaker("redis-auth", failure_threshold=1, reset_timeout=60)
+        auth_service.cache = GuardedRedis(host="127.0.0.1", port=redis_proxy.port, breaker=breaker, timeout=0.1)
+        redis_proxy.stalled = True
+        timed_out = await client.get("/api/contacts/", headers=headers)
+        started = time.perf_counter()
+        degraded = await client.get("/api/contacts/", headers=headers)
+        degraded_in = time.perf_counter() - started
+
+        monkeypatch.setattr(auth_service, "_db_fallback", asyncio.Semaphore(0))
+        monkeypatch.setattr(config, "AUTH_DB_FALLBACK_WAIT", 0.05)
+        shed = await client.get("/api/contacts/", headers=headers)
+        metrics = (await client.get("/metrics")).text
+        await auth_service.cache.aclose()
+        return timed_out, degraded, degraded_in, shed, metrics
+
+    timed_out, degraded, degraded_in, shed, metrics = run(scenario)
+    assert timed_out.status_code == 200
+    assert degraded.status_code == 200
+    # the breaker is open: no Redis timeout on the way
+    assert degraded_in < 0.1
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "1"
+    assert 'circuit_breaker_state{name="redis-auth"} 2.0' in metrics
+    assert 'auth_db_fallback_total{result="shed"}' in metrics
+
+
+def test_batch_writes_do_not_hang_on_a_stalled_change_feed(run, add_contacts, contact, redis_proxy, monkeypatch):
+    """The change feed's pipelined publish is bounded by the Redis timeout like any other command"""
+    breaker = CircuitBreaker("redis-feed", failure_threshold=5, reset_timeout=60)
+
+    async def scenario(client, headers):
+        ids = await add_contacts(client, headers, [contact(i) for i in range(3)])
+        monkeypatch.setattr(
+            change_feed, "redis", GuardedRedis(host="127.0.0.1", port=redis_proxy.port, breaker=breaker, timeout=0.1)
+        )
+        redis_proxy.stalled = True
+        started = time.perf_counter()
+        response = await client.post("/api/contacts/batch-delete", json={"ids": ids}, headers=headers)
+        elapsed = time.perf_counter() - started
+        await change_feed.redis.aclose()
+        return response, elapsed
+
+    response, elapsed = run(scenario)
+    assert response.status_code == 200
+    assert elapsed < 1
+    assert breaker.failures == 1
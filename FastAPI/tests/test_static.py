@@ -0,0 +1,69 @@
+import os
+
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from src.services.static import PrecompressedStaticFiles, precompress
+
+CSS = b"body { color: #333; }\n" * 100
+
+
+def test_precompressed_variants_are_negotiated(tmp_path):
+    """gzip clients get the .gz sibling; others the original; versioned URLs are immutable"""
+    (tmp_path / "style.css").write_bytes(CSS)
+    assert precompress(tmp_path) == [str(tmp_path / "style.css.gz")]
+    client = TestClient(Starlette(routes=[Mount("/static", PrecompressedStaticFiles(directory=tmp_path))]))
+
+    encoded = client.get("/static/style.css?v=1", headers={"Accept-Encoding": "br;q=0, gzip"})
+    assert encoded.headers["content-encoding"] == "gzip"
+    assert encoded.headers["content-type"].startswith("text/css")
+    assert encoded.headers["vary"] == "Accept-Encoding"
+    assert encoded.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert encoded.content == CSS
+
+    plain = client.get("/static/style.css", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.content == CSS
+    assert "must-revalidate" in plain.headers["cache-control"]
+    assert plain.headers["etag"] != encoded.headers["etag"]
+
+    again = client.get("/static/style.css", headers={"Accept-Encoding": "identity", "If-None-Match": plain.headers["etag"]})
+    assert again.status_code == 304
+
+    # the source changed after the build: the stale variant is not served
+    os.utime(tmp_path / "style.css", (1e10, 1e10))
+    stale = client.get("/static/style.css", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in stale.headers
+
+
+def test_index_is_rendered_once_and_revalidated(run):
+    """The home page is rendered once per process and answers If-None-Match with 304"""
+    from main import render_page
+
+    async def scenario(client, headers):
+        render_page.cache_clear()
+        first = await client.get("/")
+        return first, await client.get("/", headers={"If-None-Match": first.headers["etag"]})
+
+    first, second = run(scenario)
+    assert first.status_code == 200 and "Build group WebPython #16" in first.text
+    assert "/static/style.css?v=" in first.text
+    assert second.status_code == 304
+    assert render_page.cache_info().misses == 1
+
+
+def test_api_responses_are_compressed_above_threshold(run, contact, add_contacts):
+    """JSON responses past COMPRESS_MIN_SIZE are gzipped; small ones are not"""
+
+    async def scenario(client, headers):
+        headers = {**headers, "Accept-Encoding": "gzip"}
+        empty = await client.get("/api/contacts/", headers=headers)
+        await add_contacts(client, headers, [contact(i) for i in range(20)])
+        full = await client.get("/api/contacts/", headers=headers)
+        return empty, full
+
+    empty, full = run(scenario)
+    assert "content-encoding" not in empty.headers
+    assert full.headers["content-encoding"] == "gzip"
+    assert len(full.json()) == 20
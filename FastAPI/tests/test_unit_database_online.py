@@ -0,0 +1,89 @@
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine, text
+
+from src.database.online import backfill, create_index_concurrently, drop_index_concurrently, index_sql
+
+
+class Interrupted(Exception):
+    pass
+
+
+class TestOnlineMigrations(unittest.TestCase):
+    """SQLite stands in for PostgreSQL: same batching, plain index statements."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{self.tmp.name}/online.db")
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name VARCHAR(20), slug VARCHAR(20))"))
+            conn.execute(text("INSERT INTO items (id, name) VALUES (:id, :name)"),
+                         [{"id": i, "name": f"Item {i}"} for i in range(1, 26)])
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def run_backfill(self, report, **options):
+        with self.engine.connect() as conn:
+            return backfill("items", "slug = lower(replace(name, ' ', '-'))", pending="slug IS NULL",
+                            name="items_slug", batch_size=10, pause=0, connection=conn, report=report, **options)
+
+    def test_backfill_batches_and_resumes(self):
+        lines = []
+
+        def fail_after_two(line):
+            lines.append(line)
+            if len(lines) == 2:
+                raise Interrupted
+
+        with self.assertRaises(Interrupted):
+            self.run_backfill(fail_after_two)
+        with self.engine.connect() as conn:
+            # batches committed before the interruption stay
+            self.assertEqual(conn.execute(text("SELECT count(*) FROM items WHERE slug IS NOT NULL")).scalar(), 20)
+            # a row behind the cursor that is still pending is not revisited
+            conn.execute(text("UPDATE items SET slug = NULL WHERE id = 3"))
+            conn.commit()
+
+        lines = []
+        self.assertEqual(self.run_backfill(lines.append), 5)
+        self.assertIn("resuming after id=20", lines[0])
+        self.assertEqual(lines[-1], "items_slug: done, 25 rows")
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT slug FROM items WHERE id = 25")).scalar(), "item-25")
+            self.assertEqual(conn.execute(text("SELECT count(*) FROM items WHERE slug IS NULL")).scalar(), 1)
+
+        lines = []
+        self.assertEqual(self.run_backfill(lines.append), 0)
+        self.assertEqual(lines, ["items_slug: already done (25 rows)"])
+
+    def test_backfill_params(self):
+        with self.engine.connect() as conn:
+            updated = backfill("items", "slug = :slug", pending="slug IS NULL AND id > :first", name="items_tail",
+                               batch_size=4, pause=0, params={"slug": "x", "first": 15}, connection=conn,
+                               report=lambda line: None)
+            self.assertEqual(updated, 10)
+            self.assertEqual(conn.execute(text("SELECT min(id) FROM items WHERE slug = 'x'")).scalar(), 16)
+
+    def test_index_falls_back_and_is_idempotent(self):
+        with self.engine.connect() as conn:
+            for _ in range(2):
+                create_index_concurrently("ix_items_slug", "items", ["slug"], where="slug IS NOT NULL",
+                                          connection=conn)
+            self.assertEqual(conn.execute(text(
+                "SELECT sql FROM sqlite_master WHERE name = 'ix_items_slug'"
+            )).scalar(), "CREATE INDEX ix_items_slug ON items (slug) WHERE slug IS NOT NULL")
+            drop_index_concurrently("ix_items_slug", connection=conn)
+            self.assertIsNone(conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'ix_items_slug'")).scalar())
+
+    def test_index_sql(self):
+        self.assertEqual(
+            index_sql("ix_contacts_tags", "contacts", ["tags"], using="gin", concurrently=True),
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_contacts_tags ON contacts USING gin (tags)",
+        )
+        self.assertEqual(
+            index_sql("ix_contacts_tags", "contacts", ["tags"], unique=True, only=True),
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_contacts_tags ON ONLY contacts (tags)",
+        )
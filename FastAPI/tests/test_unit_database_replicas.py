@@ -0,0 +1,111 @@
+import asyncio
+import pickle
+import tempfile
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+from uuid import uuid4
+
+from fakeredis import aioredis as fake_aioredis
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.database import db as db_module, routing
+from src.database.replicas import ReplicaRouter
+from src.entity.models import Base, User
+from src.services.auth import STICKY_PREFIX, auth_service
+
+
+class TestReplicaRouter(IsolatedAsyncioTestCase):
+    """Primary and replica are two SQLite files; only the replica has the user."""
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.primary_engine = create_async_engine(f"sqlite+aiosqlite:///{self.tmp.name}/primary.db")
+        self.replica_engine = create_async_engine(f"sqlite+aiosqlite:///{self.tmp.name}/replica.db")
+        for engine in (self.primary_engine, self.replica_engine):
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        async with self.replica_engine.begin() as conn:
+            await conn.execute(insert(User).values(
+                id=uuid4(), username="replica", email="replica@example.com", password="x"
+            ))
+        self.primary = async_sessionmaker(self.primary_engine, expire_on_commit=False)
+        self.router = ReplicaRouter(retry_after=30, sticky_ms=50)
+        self.router.add(async_sessionmaker(self.replica_engine, expire_on_commit=False))
+
+    async def asyncTearDown(self):
+        await self.primary_engine.dispose()
+        await self.replica_engine.dispose()
+        self.tmp.cleanup()
+
+    async def read_emails(self, session):
+        result = await session.execute(select(User.email))
+        return result.scalars().all()
+
+    async def test_reads_go_to_replica(self):
+        async with self.primary() as db:
+            async with self.router.session(fallback=db) as session:
+                self.assertIsNot(session, db)
+                self.assertEqual(await self.read_emails(session), ["replica@example.com"])
+
+    async def test_without_replicas_reads_use_primary(self):
+        router = ReplicaRouter()
+        async with self.primary() as db:
+            async with router.session(fallback=db) as session:
+                self.assertIs(session, db)
+
+    async def test_unreachable_replica_fails_over_and_is_skipped(self):
+        broken = create_async_engine(f"sqlite+aiosqlite:///{self.tmp.name}/missing/dir.db")
+        router = ReplicaRouter(retry_after=30)
+        router.add(async_sessionmaker(broken))
+        async with self.primary() as db:
+            async with router.session(fallback=db) as session:
+                self.assertIs(session, db)
+                self.assertEqual(await self.read_emails(session), [])
+        self.assertEqual(router.candidates(), [])
+        await broken.dispose()
+
+    async def test_sticky_window_expires(self):
+        self.router.stick("user")
+        self.assertTrue(self.router.is_sticky("user"))
+        await asyncio.sleep(0.06)
+        self.assertFalse(self.router.is_sticky("user"))
+
+    def unused_primary(self):
+        self.fail("the primary was opened")
+
+    async def test_read_db_stays_on_primary_after_write(self):
+        user = SimpleNamespace(id=uuid4(), email="owner@example.com")
+        request = SimpleNamespace(state=SimpleNamespace(read_sticky=False))
+        cache = fake_aioredis.FakeRedis()
+        with patch.object(db_module, "replicas", self.router), patch.object(routing, "replicas", self.router), \
+             patch.object(routing.auth_service, "_cache", cache):
+            # a replica serves the read; the primary (and its breaker) is never touched
+            reads = routing.get_read_db(request, user, self.unused_primary)
+            self.assertIn("replica", (await anext(reads)).info)
+            await reads.aclose()
+
+            writes = routing.read_your_writes(user)
+            await anext(writes)
+            self.router.sticky.clear()
+            # the local window is gone; the marker next to the cached user still pins the reads
+            _, sticky = await cache.mget(user.email, STICKY_PREFIX + user.email)
+            request.state.read_sticky = sticky is not None
+            reads = routing.get_read_db(request, user, self.primary)
+            self.assertNotIn("replica", (await anext(reads)).info)
+            await reads.aclose()
+
+    async def test_cached_user_and_sticky_marker_in_one_round_trip(self):
+        user = User(id=uuid4(), username="owner", email="owner@example.com", password="x")
+        cache = fake_aioredis.FakeRedis()
+        await cache.set(user.email, pickle.dumps(user))
+        await cache.set(STICKY_PREFIX + user.email, 1)
+        token = await auth_service.create_access_token(data={"sub": user.email})
+        request = SimpleNamespace(state=SimpleNamespace())
+        with patch.object(auth_service, "_cache", cache), \
+             patch.object(cache, "exists", side_effect=AssertionError("extra round trip")):
+            found = await auth_service.get_current_user(request, token, self.unused_primary)
+
+        self.assertEqual(found.email, user.email)
+        self.assertTrue(request.state.read_sticky)
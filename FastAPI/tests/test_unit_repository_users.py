@@ -39,9 +39,23 @@ class TestUserRepository(IsolatedAsyncioTestCase):
             email="test@example.com",
             password="12345678"
         )
+        self.db.execute = AsyncMock(return_value=self.mock_result)
         result = await users.create_user(body, self.db)
         self.assertEqual(result.email, body.email)
-        self.db.add.assert_called_once()
+        self.db.execute.assert_called_once()
+        self.db.commit.assert_called_once()
+
+    async def test_create_user_conflict_returns_none(self):
+        body = UserSchema(
+            username="tester",
+            email="test@example.com",
+            password="12345678"
+        )
+        self.mock_result.scalar_one_or_none.return_value = None
+        self.db.execute = AsyncMock(return_value=self.mock_result)
+        result = await users.create_user(body, self.db)
+        self.assertIsNone(result)
+        self.db.add.assert_not_called()
 
     async def test_update_token(self):
         token = "new_refresh_token"
@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import serve
+
+
+class TestServe(unittest.TestCase):
+
+    def test_workers_default_to_cpu_count(self):
+        args = serve.argparse.Namespace(
+            host="127.0.0.1", port=8000, workers=0, keepalive=5, graceful_timeout=30, backlog=2048, access_log=False
+        )
+        with patch("serve.os.cpu_count", return_value=3):
+            options = serve.uvicorn_options(args)
+        self.assertEqual(options["workers"], 3)
+        self.assertEqual(options["timeout_graceful_shutdown"], 30)
+        self.assertIn(options["loop"], ("uvloop", "asyncio"))
+
+    def test_single_worker_has_no_multiprocess_dir(self):
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+            self.assertIsNone(serve.prepare_multiprocess_dir(1))
+
+    def test_multiprocess_dir_is_created_and_cleaned(self):
+        with tempfile.TemporaryDirectory() as directory, patch.dict(
+            os.environ, {"PROMETHEUS_MULTIPROC_DIR": directory}
+        ):
+            stale = Path(directory) / "counter_123.db"
+            stale.write_bytes(b"x")
+            self.assertEqual(serve.prepare_multiprocess_dir(4), directory)
+            self.assertFalse(stale.exists())
+
+    def test_multiprocess_dir_is_exported_for_workers(self):
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+            directory = serve.prepare_multiprocess_dir(4)
+            self.assertEqual(os.environ["PROMETHEUS_MULTIPROC_DIR"], directory)
+            os.rmdir(directory)
@@ -0,0 +1,75 @@
+import http.client
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.entity.models import User
+from src.services import avatars
+
+
+class TestAvatarEnrichment(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        avatars.gravatar_url.cache_clear()
+        avatars._missing.clear()
+
+    async def test_resolve_avatar_memoizes_url(self):
+        with patch.object(avatars, "Gravatar", wraps=avatars.Gravatar) as gravatar:
+            first = await avatars.resolve_avatar("test@example.com")
+            second = await avatars.resolve_avatar("test@example.com")
+
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith("https://www.gravatar.com/avatar/"))
+        gravatar.assert_called_once()
+
+    async def test_resolve_avatar_caches_negative_result(self):
+        with patch.object(avatars.config, "GRAVATAR_VERIFY", True), \
+             patch.object(avatars, "_gravatar_exists", return_value=False) as exists:
+            self.assertIsNone(await avatars.resolve_avatar("missing@example.com"))
+            self.assertIsNone(await avatars.resolve_avatar("missing@example.com"))
+
+        exists.assert_called_once()
+
+    async def test_enrich_user_avatar_keeps_uploaded_avatar(self):
+        user = User(email="test@example.com", avatar="https://dummy.url/avatar.png")
+        db = MagicMock()
+        db.commit = AsyncMock()
+        session = MagicMock()
+        session.return_value.__aenter__ = AsyncMock(return_value=db)
+        session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+        with patch.object(avatars, "async_session", session), \
+             patch.object(avatars.repository_users, "get_user_by_email", AsyncMock(return_value=user)):
+            await avatars.enrich_user_avatar(user.email)
+
+        self.assertEqual(user.avatar, "https://dummy.url/avatar.png")
+        db.commit.assert_not_called()
+
+    async def test_enrich_user_avatar_sets_gravatar(self):
+        user = User(email="test@example.com", avatar=None)
+        db = MagicMock()
+        db.commit = AsyncMock()
+        session = MagicMock()
+        session.return_value.__aenter__ = AsyncMock(return_value=db)
+        session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+        with patch.object(avatars, "async_session", session), \
+             patch.object(avatars.repository_users, "get_user_by_email", AsyncMock(return_value=user)), \
+             patch.object(avatars.auth_service, "cache_user", AsyncMock()) as cache_user:
+            await avatars.enrich_user_avatar(user.email)
+
+        self.assertEqual(user.avatar, avatars.gravatar_url(user.email))
+        db.commit.assert_called_once()
+        # /me must not keep serving the avatar-less user cached at signup
+        cache_user.assert_awaited_once_with(user.email, user)
+
+    def test_gravatar_check_treats_timeouts_as_missing(self):
+        for error in (TimeoutError("read timed out"), http.client.BadStatusLine("garbage")):
+            with patch.object(avatars.urllib.request, "urlopen", side_effect=error):
+                self.assertFalse(avatars._gravatar_exists("https://www.gravatar.com/avatar/x"))
+
+    async def test_enrich_user_avatar_survives_resolve_errors(self):
+        with patch.object(avatars, "resolve_avatar", AsyncMock(side_effect=ValueError("bad email"))), \
+             patch.object(avatars, "async_session") as session:
+            await avatars.enrich_user_avatar("test@example.com")
+
+        session.assert_not_called()
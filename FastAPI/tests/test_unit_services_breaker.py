@@ -0,0 +1,113 @@
+import asyncio
+import tempfile
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from redis.exceptions import TimeoutError as RedisTimeoutError
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.database import db as db_module
+from src.services.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class TestCircuitBreaker(TestCase):
+
+    def test_state_machine(self):
+        breaker = CircuitBreaker("unit", failure_threshold=2, reset_timeout=0.05)
+        breaker.failure()
+        breaker.success()
+        breaker.failure()
+        # failures must be consecutive
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.failure()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+        with self.assertRaises(CircuitOpenError) as caught:
+            breaker.check()
+        self.assertIsInstance(caught.exception, OSError)
+
+        asyncio.run(asyncio.sleep(0.05))
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        # one probe at a time
+        self.assertFalse(breaker.allow())
+        breaker.failure()
+        self.assertEqual(breaker.state, OPEN)
+
+        asyncio.run(asyncio.sleep(0.05))
+        self.assertTrue(breaker.allow())
+        breaker.success()
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertTrue(breaker.allow())
+
+
+class TestGetDbBreaker(IsolatedAsyncioTestCase):
+    """``get_db`` against a database file that cannot be opened, then a working one."""
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.broken = create_async_engine(f"sqlite+aiosqlite:///{self.tmp.name}/missing/dir/db.sqlite")
+        self.working = create_async_engine(f"sqlite+aiosqlite:///{self.tmp.name}/db.sqlite")
+        self.breaker = CircuitBreaker("db-unit", failure_threshold=2, reset_timeout=0.1)
+        patches = [
+            patch.object(db_module, "init_engine", lambda: None),
+            patch.object(db_module, "db_breaker", self.breaker),
+            patch.object(db_module, "async_session", async_sessionmaker(self.broken)),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    async def asyncTearDown(self):
+        await self.broken.dispose()
+        await self.working.dispose()
+        self.tmp.cleanup()
+
+    async def request(self):
+        """One request's use of the session, as FastAPI drives the dependency."""
+        dependency = db_module.get_db()
+        session = await anext(dependency)
+        try:
+            await session.execute(text("SELECT 1"))
+        except OperationalError as err:
+            with self.assertRaises(OperationalError):
+                await dependency.athrow(err)
+            return False
+        with self.assertRaises(StopAsyncIteration):
+            await anext(dependency)
+        return True
+
+    async def test_opens_on_connection_errors_and_probes(self):
+        self.assertFalse(await self.request())
+        self.assertFalse(await self.request())
+        self.assertEqual(self.breaker.state, OPEN)
+        with self.assertRaises(HTTPException) as caught:
+            await anext(db_module.get_db())
+        self.assertEqual(caught.exception.status_code, 503)
+        self.assertEqual(caught.exception.headers["Retry-After"], "1")
+
+        # the probe after the reset timeout still fails: open again, still a 503
+        await asyncio.sleep(0.1)
+        with self.assertRaises(HTTPException):
+            await anext(db_module.get_db())
+        self.assertEqual(self.breaker.state, OPEN)
+
+        db_module.async_session = async_sessionmaker(self.working)
+        await asyncio.sleep(0.1)
+        self.assertTrue(await self.request())
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    async def test_redis_errors_inside_a_request_do_not_count(self):
+        db_module.async_session = async_sessionmaker(self.working)
+        # what a GuardedRedis call in a route raises: all OSErrors but the middle one
+        for err in (TimeoutError(), RedisTimeoutError("Timeout reading from socket"), CircuitOpenError("redis", 1.0)):
+            dependency = db_module.get_db()
+            session = await anext(dependency)
+            await session.execute(text("SELECT 1"))
+            with self.assertRaises(type(err)):
+                await dependency.athrow(err)
+        self.assertEqual(self.breaker.failures, 0)
+        self.assertEqual(self.breaker.state, CLOSED)
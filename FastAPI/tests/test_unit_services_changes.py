@@ -0,0 +1,114 @@
+import asyncio
+import json
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+from uuid import uuid4
+
+from fakeredis import aioredis as fake_aioredis
+
+from src.services.changes import HEARTBEAT, ChangeFeed, Subscriber, sse
+
+
+class TestChangeFeed(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.redis = fake_aioredis.FakeRedis(decode_responses=True)
+        self.feed = ChangeFeed(stream=f"test:{uuid4().hex}")
+        for name, value in (("CHANGE_FEED_BLOCK_MS", 50), ("CHANGE_FEED_HEARTBEAT", 0.2)):
+            patcher = patch(f"src.services.changes.config.{name}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        await self.feed.init(self.redis)
+        self.user = uuid4()
+
+    async def asyncTearDown(self):
+        await self.feed.close()
+
+    async def next_event(self, events, timeout=1.0):
+        return await asyncio.wait_for(anext(events), timeout)
+
+    async def next_change(self, events, timeout=2.0):
+        async def skip_heartbeats():
+            event = await anext(events)
+            while event is HEARTBEAT:
+                event = await anext(events)
+            return event
+
+        return await asyncio.wait_for(skip_heartbeats(), timeout)
+
+    async def test_event_reaches_only_its_user(self):
+        mine = self.feed.subscribe(self.user)
+        other = self.feed.subscribe(uuid4())
+        first = asyncio.ensure_future(self.next_change(mine))
+        second = asyncio.ensure_future(self.next_event(other))
+        await asyncio.sleep(0.05)
+
+        contact_id = uuid4()
+        event_id = await self.feed.publish(self.user, "deleted", contact_id)
+
+        received_id, data = await first
+        self.assertEqual(received_id, event_id)
+        self.assertEqual(json.loads(data), {"op": "deleted", "id": str(contact_id), "contact": None})
+        self.assertIs(await second, HEARTBEAT)
+        await mine.aclose()
+        await other.aclose()
+        self.assertEqual(self.feed.count, 0)
+        self.assertEqual(self.feed.subscribers, {})
+
+    async def test_resume_replays_missed_events(self):
+        seen = await self.feed.publish(self.user, "created", uuid4(), {"first_name": "A"})
+        await self.feed.publish(uuid4(), "created", uuid4(), {"first_name": "B"})
+        missed = await self.feed.publish(self.user, "updated", uuid4(), {"first_name": "C"})
+
+        events = self.feed.subscribe(self.user, last_id=seen)
+        event_id, data = await self.next_change(events)
+        self.assertEqual(event_id, missed)
+        self.assertEqual(json.loads(data)["op"], "updated")
+        await events.aclose()
+
+    async def test_trimmed_position_asks_for_reset(self):
+        await self.feed.publish(self.user, "created", uuid4())
+        events = self.feed.subscribe(self.user, last_id="1-0")
+        self.assertIsNone(await self.next_event(events))
+
+    async def test_backlog_is_read_in_pages_and_bounded(self):
+        seen = await self.feed.publish(self.user, "created", uuid4())
+        others = [(uuid4(), "created", uuid4(), None) for _ in range(5)]
+        for user_id, op, contact_id, data in others:
+            await self.feed.publish(user_id, op, contact_id, data)
+        missed = await self.feed.publish(self.user, "updated", uuid4())
+
+        with patch("src.services.changes.BACKLOG_PAGE", 2), \
+             patch("src.services.changes.config.CHANGE_FEED_BACKLOG_SCAN", 10), \
+             patch.object(self.redis, "xrange", wraps=self.redis.xrange) as xrange:
+            self.assertEqual([event_id for event_id, _ in await self.feed._backlog(str(self.user), seen)], [missed])
+        # the oldest-entry check, then pages of two
+        self.assertTrue(all(call.kwargs["count"] <= 2 for call in xrange.call_args_list))
+        self.assertEqual(xrange.call_count, 1 + 4)
+
+        # farther behind than the scan budget: refetch instead of reading on
+        with patch("src.services.changes.BACKLOG_PAGE", 2), \
+             patch("src.services.changes.config.CHANGE_FEED_BACKLOG_SCAN", 4):
+            self.assertIsNone(await self.feed._backlog(str(self.user), seen))
+
+    async def test_slow_subscriber_is_reset_instead_of_buffering(self):
+        subscriber = Subscriber(size=2)
+        for i in range(3):
+            subscriber.push((f"{i + 1}-0", "{}"))
+        self.assertEqual(subscriber.queue.qsize(), 1)
+        self.assertIsNone(subscriber.queue.get_nowait())
+
+    async def test_sse_format(self):
+        async def events():
+            yield HEARTBEAT
+            yield ("5-0", '{"op": "deleted"}')
+            yield None
+            yield ("6-0", "{}")
+
+        chunks = [chunk async for chunk in sse(events())]
+        self.assertEqual(chunks, [
+            "retry: 3000\n\n",
+            ": ping\n\n",
+            'id: 5-0\nevent: contact\ndata: {"op": "deleted"}\n\n',
+            "event: reset\ndata: {}\n\n",
+        ])
@@ -0,0 +1,36 @@
+from datetime import date
+from unittest import TestCase
+from uuid import uuid4
+
+from src.services.dedup import candidate_pairs, Candidate, email_local, find_duplicates, normalize_phone, soundex
+
+
+def row(first, last, email, phone, birthday=date(1990, 1, 1)):
+    return uuid4(), first, last, email, phone, birthday
+
+
+class TestDedup(TestCase):
+
+    def test_normalizers(self):
+        self.assertEqual(normalize_phone("+38 (067) 123-45-67"), normalize_phone("0671234567"))
+        self.assertEqual(normalize_phone("12-34"), "")
+        self.assertEqual(email_local("John.Doe+work@Example.com"), "johndoe")
+        self.assertEqual([soundex(w) for w in ("Robert", "Rupert", "Ashcraft", "Tymczak")], ["r163", "r163", "a261", "t522"])
+        self.assertEqual(soundex("Шевченко"), "шевченко")
+
+    def test_groups_matching_contacts(self):
+        rows = [
+            row("John", "Doe", "john.doe@example.com", "+380671234567"),
+            row("Jon", "Doe", "johndoe@work.io", "0671234567"),
+            row("John", "Doe", "jd@other.io", "0501112233"),
+            row("Mary", "Major", "mary@example.com", "0509998877", date(1985, 5, 5)),
+        ]
+        groups = find_duplicates(rows)
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(set(groups[0]["ids"]), {rows[0][0], rows[1][0], rows[2][0]})
+        self.assertEqual(groups[0]["reasons"], ["birthday", "email", "name", "phone"])
+
+    def test_oversized_blocks_are_skipped(self):
+        candidates = [Candidate(*row(f"N{i}", f"S{i}", f"u{i}@x.io", "0441234567")) for i in range(5)]
+        self.assertEqual(len(candidate_pairs(candidates, max_block=5)), 10)
+        self.assertEqual(candidate_pairs(candidates, max_block=4), set())
@@ -0,0 +1,42 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from fakeredis import aioredis as fake_aioredis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from src.services.jobs import PeriodicJob
+
+
+class TestPeriodicJob(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.ticks = 0
+        self.redis = fake_aioredis.FakeRedis()
+
+    async def tick(self) -> int:
+        self.ticks += 1
+        return self.ticks
+
+    async def test_lock_lets_one_worker_run_per_interval(self):
+        workers = [PeriodicJob("jobs:test", 60, self.tick, self.redis) for _ in range(3)]
+        results = [await worker.run_once() for worker in workers]
+        self.assertEqual(results, [1, 0, 0])
+        self.assertLessEqual(await self.redis.pttl("jobs:test"), 54000)
+
+    async def test_runs_without_redis_or_when_it_fails(self):
+        class BrokenRedis:
+            async def set(self, *args, **kwargs):
+                raise RedisConnectionError("down")
+
+        self.assertEqual(await PeriodicJob("jobs:test", 60, self.tick).run_once(), 1)
+        self.assertEqual(await PeriodicJob("jobs:test", 60, self.tick, BrokenRedis()).run_once(), 2)
+
+    async def test_ticks_in_the_background_until_stopped(self):
+        job = PeriodicJob("jobs:test", 0.01, self.tick)
+        job.start()
+        await asyncio.sleep(0.1)
+        await job.stop()
+        ticked = self.ticks
+        await asyncio.sleep(0.05)
+        self.assertGreater(ticked, 1)
+        self.assertEqual(self.ticks, ticked)
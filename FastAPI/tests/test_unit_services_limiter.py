@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from fakeredis import aioredis as fake_aioredis
+from fastapi import HTTPException
+from redis.exceptions import ConnectionError
+
+from src.entity.models import User
+from src.services.limiter import Limiter, RateLimiter, limiter
+
+
+class TestLimiter(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.redis = fake_aioredis.FakeRedis()
+        self.limiter = Limiter()
+        await self.limiter.init(self.redis)
+
+    async def test_sliding_window_rejects_over_limit(self):
+        results = [await self.limiter.hit("key", times=3, milliseconds=60000) for _ in range(4)]
+        self.assertEqual(results[:3], [0, 0, 0])
+        self.assertGreater(results[3], 0)
+        self.assertLessEqual(results[3], 60000)
+
+    async def test_lease_spends_tokens_locally(self):
+        evalsha = self.redis.evalsha
+
+        async def _evalsha(*args):
+            return await evalsha(*args)
+
+        self.redis.evalsha = AsyncMock(side_effect=_evalsha)
+        results = [await self.limiter.hit("key", times=10, milliseconds=60000, lease=5) for _ in range(5)]
+        self.assertEqual(results, [0] * 5)
+        self.redis.evalsha.assert_awaited_once()
+
+    async def test_lease_never_exceeds_limit(self):
+        results = [await self.limiter.hit("key", times=4, milliseconds=60000, lease=3) for _ in range(6)]
+        self.assertEqual(results[:4], [0] * 4)
+        self.assertTrue(all(r > 0 for r in results[4:]))
+
+    async def test_expired_leases_of_idle_keys_are_pruned(self):
+        now = [1000.0]
+        with patch("src.services.limiter.time.monotonic", side_effect=lambda: now[0]), \
+             patch("src.services.limiter.config.RATE_LIMIT_LEASE_MS", 1000):
+            for i in range(50):
+                await self.limiter.hit(f"idle:{i}", times=10, milliseconds=60000, lease=5)
+            self.assertEqual(len(self.limiter.leases), 50)
+            now[0] += 2
+            await self.limiter.hit("hot", times=10, milliseconds=60000, lease=5)
+        self.assertEqual(list(self.limiter.leases), ["hot"])
+
+
+class TestRateLimiterDependency(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.redis = fake_aioredis.FakeRedis()
+        await limiter.init(self.redis, fail_open=True)
+        self.request = MagicMock()
+        self.request.method = "POST"
+        self.request.scope = {"route": SimpleNamespace(path="/api/contacts/")}
+
+    async def asyncTearDown(self):
+        await limiter.close()
+
+    async def test_limits_are_keyed_per_user(self):
+        dependency = RateLimiter(times=1, seconds=60)
+        first, second = User(id=uuid4()), User(id=uuid4())
+        await dependency(self.request, MagicMock(), first)
+        await dependency(self.request, MagicMock(), second)
+        with self.assertRaises(HTTPException) as ctx:
+            await dependency(self.request, MagicMock(), first)
+        self.assertEqual(ctx.exception.status_code, 429)
+        self.assertIn("Retry-After", ctx.exception.headers)
+
+    async def test_fail_open_when_redis_unavailable(self):
+        self.redis.evalsha = AsyncMock(side_effect=ConnectionError("down"))
+        await RateLimiter(times=1, seconds=60)(self.request, MagicMock(), User(id=uuid4()))
+
+    async def test_fail_closed_when_configured(self):
+        limiter.fail_open = False
+        self.redis.evalsha = AsyncMock(side_effect=ConnectionError("down"))
+        with self.assertRaises(HTTPException) as ctx:
+            await RateLimiter(times=1, seconds=60)(self.request, MagicMock(), User(id=uuid4()))
+        self.assertEqual(ctx.exception.status_code, 503)
@@ -0,0 +1,43 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+
+from prometheus_client import REGISTRY
+from src.services.loop_monitor import LoopMonitor
+
+
+async def blocking_handler(scope, receive, send):
+    time.sleep(0.3)
+
+
+class TestLoopMonitor(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.monitor = LoopMonitor(interval=0.01, threshold=0.05, debug=True)
+        self.monitor.start()
+
+    async def asyncTearDown(self):
+        await self.monitor.stop()
+
+    async def test_lag_is_sampled(self):
+        before = REGISTRY.get_sample_value("event_loop_lag_seconds_count") or 0
+        await asyncio.sleep(0.1)
+        after = REGISTRY.get_sample_value("event_loop_lag_seconds_count")
+        self.assertGreater(after, before)
+
+    async def test_blocking_call_is_attributed_to_route(self):
+        scope = {"type": "http", "path": "/api/contacts/1", "route": SimpleNamespace(path="/api/contacts/{contact_id}")}
+        await asyncio.sleep(0.03)
+        await blocking_handler(scope, None, None)
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(len(self.monitor.reports), 1)
+        report = self.monitor.reports[0]
+        self.assertEqual(report["route"], "/api/contacts/{contact_id}")
+        self.assertIn("blocking_handler", report["stack"])
+        self.assertGreaterEqual(report["stalled"], 0.05)
+
+    async def test_no_reports_without_stalls(self):
+        await asyncio.sleep(0.15)
+        self.assertEqual(len(self.monitor.reports), 0)
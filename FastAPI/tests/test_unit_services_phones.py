@@ -0,0 +1,20 @@
+from unittest import TestCase
+
+from src.services.phones import e164_sql, to_e164
+
+
+class TestPhones(TestCase):
+
+    def test_to_e164(self):
+        for phone in ("+380671234567", "+38 (067) 123-45-67", "0671234567", "067 123 45 67", "380671234567",
+                      "00380671234567", "671234567"):
+            self.assertEqual(to_e164(phone), "+380671234567", phone)
+        self.assertEqual(to_e164("+1 (202) 555-0123"), "+12025550123")
+        self.assertEqual(to_e164("(202) 555-0123", country_code="1"), "+12025550123")
+        for phone in ("", None, "12-34", "n/a", "+1234567890123456", "+0671234567"):
+            self.assertIsNone(to_e164(phone), phone)
+
+    def test_sql_expression(self):
+        sql = e164_sql("phone", country_code="380")
+        self.assertTrue(sql.startswith("CASE WHEN length("))
+        self.assertIn("'380' || substr(regexp_replace(phone, '[^0-9]', '', 'g'), 2)", sql)
@@ -33,7 +33,7 @@ def client(mock_user_response):
     """
     TestClient with overridden dependencies:
       - Bypass RateLimiter
-      - Mock FastAPILimiter.init
+      - Mock limiter.init
       - Override get_db and auth_service.get_current_user
     """
     from starlette.requests import Request
@@ -43,8 +43,8 @@ def client(mock_user_response):
             return None
         return _noop
 
-    with patch("fastapi_limiter.FastAPILimiter.init", new=AsyncMock()), \
-         patch("fastapi_limiter.depends.RateLimiter", new=dummy_rate_limiter_factory), \
+    with patch("src.services.limiter.limiter.init", new=AsyncMock()), \
+         patch("src.services.limiter.RateLimiter", new=dummy_rate_limiter_factory), \
          patch("src.routes.users.RateLimiter", new=dummy_rate_limiter_factory):
         from main import app
 
@@ -74,12 +74,15 @@ def test_get_current_user(client, mock_user_response):
     assert data["avatar"] == mock_user_response.avatar
     assert data["role"] == mock_user_response.role.value
 
-def test_update_avatar(client, mock_user_response, monkeypatch):
-    """PATCH /api/users/avatar updates and returns new avatar URL"""
-    from src.routes.users import cloudinary, repositories_users
-    # Patch Cloudinary upload and image URL builder
-    monkeypatch.setattr(cloudinary.uploader, 'upload', MagicMock(return_value={"version": "123"}))
-    monkeypatch.setattr(cloudinary.CloudinaryImage, 'build_url', lambda *args, **kwargs: "https://dummy.url/avatar.png")
+def test_update_avatar(client, mock_user_response, monkeypatch, tmp_path):
+    """PATCH /api/users/avatar resizes, stores and returns new avatar URL"""
+    from main import app
+    from src.routes.users import repositories_users
+    from src.services.storage import LocalStorage, get_storage
+
+    storage = LocalStorage(tmp_path, base_url="https://dummy.url")
+    app.dependency_overrides[get_storage] = lambda: storage
+    monkeypatch.setattr(auth_service, "cache_user", AsyncMock())
 
     # Fake repository update to set avatar on mock_user_response
     async def fake_update_avatar(email, url, db):
@@ -88,19 +91,71 @@ def test_update_avatar(client, mock_user_response, monkeypatch):
 
     monkeypatch.setattr(repositories_users, 'update_avatar_url', fake_update_avatar)
 
-    # Prepare dummy image file
-    os.makedirs("tests", exist_ok=True)
-    img_path = "tests/test_image.png"
-    if not os.path.exists(img_path):
-        with open(img_path, "wb") as f:
-            # Write minimal valid PNG header
-            f.write(b".PNG")
-
-    with open(img_path, "rb") as f:
+    with open("tests/test_image.png", "rb") as f:
         files = {"file": ("test_image.png", f, "image/png")}
         response = client.patch("/api/users/avatar", files=files)
 
     assert response.status_code == 200, response.text
     data = response.json()
     assert data["id"] == str(mock_user_response.id)
-    assert data["avatar"] == "https://dummy.url/avatar.png"
+    assert data["avatar"] == "https://dummy.url/test@example.com.jpg"
+
+    from PIL import Image
+    with Image.open(tmp_path / "test@example.com.jpg") as stored:
+        assert stored.size == (250, 250)
+
+
+def test_update_avatar_rejects_invalid_image(client, tmp_path):
+    """PATCH /api/users/avatar returns 422 for files that are not images"""
+    from main import app
+    from src.services.storage import LocalStorage, get_storage
+
+    app.dependency_overrides[get_storage] = lambda: LocalStorage(tmp_path)
+    files = {"file": ("test_image.png", b".PNG", "image/png")}
+    response = client.patch("/api/users/avatar", files=files)
+
+    assert response.status_code == 422, response.text
+    assert not list(tmp_path.iterdir())
+
+
+def test_update_avatar_large_file_is_accepted(client, mock_user_response, monkeypatch, tmp_path):
+    """PATCH /api/users/avatar returns 202 and finishes large uploads in the background"""
+    from main import app
+    from src.routes import users as users_routes
+    from src.services.storage import LocalStorage, get_storage
+
+    app.dependency_overrides[get_storage] = lambda: LocalStorage(tmp_path)
+    monkeypatch.setattr(users_routes.config, "AVATAR_ASYNC_THRESHOLD", 100)
+    background = AsyncMock()
+    monkeypatch.setattr(users_routes, "store_avatar_background", background)
+
+    with open("tests/test_image.png", "rb") as f:
+        files = {"file": ("test_image.png", f, "image/png")}
+        response = client.patch("/api/users/avatar", files=files)
+
+    assert response.status_code == 202, response.text
+    assert response.json()["id"] == str(mock_user_response.id)
+    background.assert_awaited_once()
+
+
+def test_storage_backend_must_implement_save():
+    """A storage backend without save() fails when it is created, not on the first upload"""
+    from src.services.storage import AvatarStorage
+
+    class Incomplete(AvatarStorage):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_local_storage_is_under_the_served_static_dir(monkeypatch, tmp_path):
+    """Local avatars go to src/static/avatars of the project whatever the working directory"""
+    import main
+    from src.services import storage
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(storage.config, "AVATAR_STORAGE", "local")
+    monkeypatch.setattr(storage, "_storage", None)
+
+    assert storage.get_storage().root == main.BASE_DIR / "src" / "static" / "avatars"